@@ -1,149 +1,12 @@
 import random
+from wumpus_core import KnowledgeBase, WumpusWorld
 
 # -----------------------------------------------------------------------------
-# CLASE 1: EL MUNDO DE WUMPUS (EL SIMULADOR)
-# - NO MODIFICAR ESTA CLASE -
+# CLASES 1 Y 2: EL MUNDO DE WUMPUS (EL SIMULADOR) Y LA BASE DE CONOCIMIENTO (KB)
+# - NO MODIFICAR ESTAS CLASES -
 # -----------------------------------------------------------------------------
-class WumpusWorld:
-    """
-    Simula el entorno del Mundo de Wumpus.
-    Maneja el tablero, la ubicación de los peligros y las percepciones.
-    """
-    def __init__(self, size=4):
-        self.size = size
-        self.agent_location = (1, 1)
-        self.agent_has_gold = False
-        self.agent_is_alive = True
-
-        # Inicializa un tablero vacío
-        # (W: Wumpus, P: Pozo, G: Oro, A: Agente)
-        self.board = { (x,y): [] for x in range(1, size+1) for y in range(1, size+1) }
-
-        # Colocar Oro
-        self.gold_location = self._get_random_empty_cell()
-        self.board[self.gold_location].append('G')
-
-        # Colocar Wumpus
-        self.wumpus_location = self._get_random_empty_cell()
-        self.board[self.wumpus_location].append('W')
-
-        # Colocar Pozos (Pits) - 20% de probabilidad por casilla
-        for x in range(1, size + 1):
-            for y in range(1, size + 1):
-                if (x, y) != (1, 1) and (x, y) not in [self.gold_location, self.wumpus_location]:
-                    if random.random() < 0.20:
-                        self.board[(x, y)].append('P')
-
-    def _get_random_empty_cell(self):
-        """ Obtiene una celda aleatoria que no sea (1,1). """
-        while True:
-            x, y = random.randint(1, self.size), random.randint(1, self.size)
-            if (x, y) != (1, 1) and not self.board[(x, y)]:
-                return (x, y)
-
-    def _is_valid_location(self, x, y):
-        """ Comprueba si una coordenada está dentro del tablero. """
-        return 1 <= x <= self.size and 1 <= y <= self.size
-
-    def get_neighbors(self, x, y):
-        """ Obtiene los vecinos válidos de una casilla. """
-        neighbors = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if self._is_valid_location(nx, ny):
-                neighbors.append((nx, ny))
-        return neighbors
-
-    def get_percepts_at(self, location):
-        """ Devuelve lo que el agente percibe en una ubicación. """
-        x, y = location
-        percepts = {
-            'stench': False, # Hedor (Wumpus)
-            'breeze': False, # Brisa (Pozo)
-            'glitter': False # Brillo (Oro)
-        }
-
-        # Comprobar si hay Oro
-        if 'G' in self.board[location]:
-            percepts['glitter'] = True
-
-        # Comprobar si hay peligros adyacentes
-        for nx, ny in self.get_neighbors(x, y):
-            if 'W' in self.board[(nx, ny)]:
-                percepts['stench'] = True
-            if 'P' in self.board[(nx, ny)]:
-                percepts['breeze'] = True
-
-        return percepts
-
-    def execute_action(self, action):
-        """ Ejecuta la acción del agente y devuelve el estado. """
-        if not self.agent_is_alive:
-            return "El agente está muerto."
-
-        x, y = self.agent_location
-
-        if action == 'move_up':
-            self.agent_location = (x, y + 1) if self._is_valid_location(x, y + 1) else (x, y)
-        elif action == 'move_down':
-            self.agent_location = (x, y - 1) if self._is_valid_location(x, y - 1) else (x, y)
-        elif action == 'move_left':
-            self.agent_location = (x - 1, y) if self._is_valid_location(x - 1, y) else (x, y)
-        elif action == 'move_right':
-            self.agent_location = (x + 1, y) if self._is_valid_location(x + 1, y) else (x, y)
-        elif action == 'grab_gold':
-            if 'G' in self.board[self.agent_location]:
-                self.agent_has_gold = True
-                self.board[self.agent_location].remove('G')
-                return "¡El agente encontró el oro!"
-            else:
-                return "No hay oro aquí."
-        elif action == 'climb_out':
-            if self.agent_location == (1, 1):
-                if self.agent_has_gold:
-                    return "¡VICTORIA! El agente escapó con el oro."
-                else:
-                    return "El agente escapó sin el oro."
-            else:
-                return "Solo se puede salir desde (1, 1)."
-
-        # Comprobar si el agente muere después de moverse
-        if 'W' in self.board[self.agent_location] or 'P' in self.board[self.agent_location]:
-            self.agent_is_alive = False
-            return "¡MUERTE! El agente cayó en un pozo o fue comido por el Wumpus."
-
-        return f"Agente se movió a {self.agent_location}"
-
-# -----------------------------------------------------------------------------
-# CLASE 2: LA BASE DE CONOCIMIENTO (KB)
-# - NO MODIFICAR ESTA CLASE -
-# -----------------------------------------------------------------------------
-class KnowledgeBase:
-    """
-    Una Base de Conocimiento (KB) simple basada en hechos.
-    Almacena 'hechos' (oraciones) como cadenas de texto.
-    """
-    def __init__(self):
-        self.facts = set()
-
-    def tell(self, fact):
-        """ Añade un nuevo hecho a la KB. (Diapositiva 6: Representación) """
-        self.facts.add(fact)
-
-    def ask(self, fact):
-        """ Comprueba si un hecho ya existe en la KB. (Diapositiva 6: Razonamiento) """
-        return fact in self.facts
-
-    def get_facts_starting_with(self, prefix):
-        """ Devuelve una lista de hechos que comienzan con un prefijo. """
-        return [f for f in self.facts if f.startswith(prefix)]
-
-    def print_facts(self):
-        """ Imprime todos los hechos conocidos. """
-        print("--- Hechos Conocidos (KB) ---")
-        for f in sorted(list(self.facts)):
-            print(f)
-        print("-------------------------------")
+# Se comparten con wumpus_GUI.py desde wumpus_core.py. El mundo admite las
+# acciones en texto ('move_up', 'grab_gold', ...) que usa este agente.
 
 # -----------------------------------------------------------------------------
 # CLASE 3: EL AGENTE LÓGICO
@@ -0,0 +1,50 @@
+import os
+import random
+import sys
+
+import pytest
+
+# Los módulos del juego están en la raíz del repositorio
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wumpus_barrido import crear_partida  # noqa: E402
+from wumpus_core import observacion  # noqa: E402
+
+
+@pytest.fixture
+def en_paralelo():
+    """
+    en_paralelo(semilla, config, opciones): juega la semilla con y sin
+    'opciones' a la vez y comprueba que tras cada paso las dos KB tienen los
+    mismos hechos y los agentes eligen la misma acción.
+    """
+    return _en_paralelo
+
+
+def _en_paralelo(semilla, config, opciones):
+    partidas = []
+    for extra in ({}, opciones):
+        world, agent = crear_partida(dict(config, **extra), semilla)
+        agent.azar = random.Random(semilla)
+        agent.log = lambda *args, **kwargs: None
+        episodio = agent.episodio(config['max_steps'])
+        next(episodio)
+        partidas.append([world, agent, episodio, episodio.send(observacion(world, 0, config['max_steps']))])
+    pasos = 0
+    while True:
+        pasos += 1
+        vivos = 0
+        for partida in partidas:
+            world, agent, episodio, action = partida
+            result = world.execute_action(action)
+            try:
+                partida[3] = episodio.send((result, observacion(world, pasos, config['max_steps'])))
+                vivos += 1
+            except StopIteration:
+                partida[3] = None
+        (_, base, _, accion_base), (_, otro, _, accion_otro) = partidas
+        assert otro.kb.facts == base.kb.facts, f"semilla {semilla}, paso {pasos}"
+        assert accion_otro == accion_base
+        if vivos < 2:
+            assert vivos == 0
+            return pasos
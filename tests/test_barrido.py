@@ -0,0 +1,55 @@
+import pickle
+import random
+
+import pytest
+
+from wumpus_barrido import SecuenciaConfianza, rango_puntuacion
+from wumpus_core import percentil
+from wumpus_metricas import Histograma, HistogramaLatencias
+
+
+def test_histograma_de_latencias_aproxima_los_percentiles():
+    rng = random.Random(0)
+    latencias = [rng.lognormvariate(-8, 1.5) for _ in range(5000)]
+    mitad = HistogramaLatencias(latencias[:2500])
+    mitad.sumar(pickle.loads(pickle.dumps(HistogramaLatencias(latencias[2500:]))))
+    assert mitad.n == 5000
+    for p in (50, 90, 99):
+        exacto = percentil(latencias, p)
+        assert abs(mitad.percentil(p) - exacto) <= 0.05 * exacto
+    assert HistogramaLatencias().percentil(50) is None
+
+    prometheus = Histograma('h', 'ayuda', (1e-4, 1e-3))
+    prometheus.observar_histograma(mitad)
+    assert prometheus.n == 5000 and sum(prometheus.cuentas) == 5000
+
+
+def test_secuencia_de_confianza_no_se_cierra_sobre_medias_falsas():
+    # Mirando tras cada valor, el intervalo sigue conteniendo la media real
+    rng = random.Random(1)
+    puntuaciones = (980, -1030, -50, -40, -50)
+    real = sum(puntuaciones) / len(puntuaciones)
+    secuencia = SecuenciaConfianza(alfa=0.01, rango=rango_puntuacion(50))
+    for _ in range(3000):
+        secuencia.anotar(rng.choice(puntuaciones))
+        lo, hi = secuencia.intervalo()
+        assert lo <= real <= hi
+    assert hi - lo < 200.0
+
+
+def test_secuencia_de_confianza_con_valores_identicos_no_degenera():
+    # Con la varianza estimada de los propios valores, unos primeros valores
+    # iguales dejaban el intervalo en un punto
+    secuencia = SecuenciaConfianza(alfa=0.05, rango=(-1.0, 1.0))
+    anchos = []
+    for n in range(1, 201):
+        secuencia.anotar(0.0)
+        lo, hi = secuencia.intervalo()
+        assert lo <= 0.0 <= hi
+        if n in (2, 40, 200):
+            anchos.append(hi - lo)
+    assert anchos[0] == 2.0 and anchos[1] > 0.2 and anchos[2] > 0.04
+    assert anchos == sorted(anchos, reverse=True)
+
+    with pytest.raises(ValueError):
+        secuencia.anotar(1.5)
@@ -0,0 +1,57 @@
+from wumpus_barrido import crear_partida
+from wumpus_core import HashCreencias, KnowledgeBase, clave_zobrist
+
+CONFIG = {'size': 6, 'max_steps': 100}
+
+
+def _jugar(semilla, **opciones):
+    world, agent = crear_partida(dict(CONFIG, **opciones), semilla)
+    agent.log = lambda *args, **kwargs: None
+    return world, agent, agent.run_agent(CONFIG['max_steps'])
+
+
+def test_la_deteccion_de_ciclos_es_opcional():
+    _, agent, _ = _jugar(0)
+    assert agent.hash_creencias is None and not agent.estados_vistos
+
+
+def test_romper_ciclos_termina_los_episodios_que_deambulan():
+    atascados = rotos = 0
+    for semilla in range(40):
+        _, _, pasos = _jugar(semilla)
+        if pasos < CONFIG['max_steps']:
+            continue
+        atascados += 1
+        world, _, pasos = _jugar(semilla, detectar_ciclos=True)
+        if pasos < CONFIG['max_steps'] and (world.agent_has_exited or not world.agent_is_alive):
+            rotos += 1
+    assert atascados and rotos >= atascados * 0.9
+
+
+def test_el_hash_solo_depende_de_los_hechos():
+    a, b = KnowledgeBase(), KnowledgeBase()
+    ha, hb = HashCreencias(a), HashCreencias(b)
+    for fact in ("No Pit at (1, 1)", "Breeze at (1, 2)", "Stench at (2, 1)"):
+        a.tell(fact)
+    for fact in ("Stench at (2, 1)", "No Pit at (1, 1)", "Breeze at (1, 2)", "Glitter at (3, 3)"):
+        b.tell(fact)
+    b.retract("Glitter at (3, 3)")
+    assert ha.valor == hb.valor
+    assert ha.estado((1, 2), False, True) == hb.estado((1, 2), False, True)
+    assert ha.estado((1, 2), False, True) != ha.estado((1, 2), False, False)
+    assert ha.estado((1, 2), False, True) != ha.estado((2, 1), False, True)
+
+    antes = ha.valor
+    with a.hypothesis():
+        a.tell("Pit at (1, 3)")
+        assert ha.valor != antes
+    assert ha.valor == antes
+
+
+def test_las_claves_son_de_cada_instancia():
+    kb = KnowledgeBase()
+    h = HashCreencias(kb)
+    kb.tell("Breeze at (4, 4)")
+    assert h.valor == clave_zobrist("Breeze at (4, 4)")
+    assert set(h._claves) == {"Breeze at (4, 4)"}
+    assert not HashCreencias(KnowledgeBase())._claves
@@ -0,0 +1,38 @@
+import contextlib
+import io
+
+import pytest
+
+from wumpus_barrido import crear_partida
+
+CONFIG = {'size': 8, 'pit_probability': 0.15, 'max_steps': 80}
+
+
+def _jugar(semilla, **opciones):
+    world, agent = crear_partida(dict(CONFIG, **opciones), semilla)
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.run_agent(CONFIG['max_steps'])
+    return world, agent
+
+
+@pytest.mark.parametrize('semilla', range(12))
+def test_la_kb_compactada_juega_igual(semilla):
+    _, normal = _jugar(semilla)
+    world, compactada = _jugar(semilla, compactar_kb=True)
+    assert compactada.kb.facts == normal.kb.facts
+    assert set(compactada.visited_squares) == set(normal.visited_squares)
+    assert world.agent_location == normal.world.agent_location
+
+
+def test_compactar_archiva_las_premisas_agotadas():
+    sin_brisa = archivados = 0
+    for semilla in range(12):
+        _, agent = _jugar(semilla, compactar_kb=True)
+        kb = agent.kb
+        # Tras cada paso las "No Breeze at" ya han dicho lo suyo y se archivan
+        assert not kb.get_active_facts_starting_with("No Breeze at")
+        sin_brisa += kb.count("No Breeze")
+        archivados += sum(kb.is_archived(f) for f in kb.get_facts_starting_with("Breeze at"))
+        for c in agent.pozos_archivados:
+            assert not agent.seguridad.sin_pozo(c)
+    assert sin_brisa and archivados
@@ -0,0 +1,22 @@
+from wumpus_comparacion import ComparacionAB
+
+
+def test_variantes_distintas_no_paran_por_futilidad_sin_diferencias_vistas():
+    # En 5x5 los umbrales 0 y 5 juegan igual los 124 primeros mundos y luego
+    # difieren (unos -15 puntos de media): cero diferencias vistas no bastan
+    # para declarar futilidad
+    spec = {'a': {'size': 5, 'umbral_riesgo': 0}, 'b': {'size': 5, 'umbral_riesgo': 5},
+            'efecto_minimo': 10, 'minimo_episodios': 100, 'max_episodios': 120, 'lote': 20}
+    r = ComparacionAB(spec).ejecutar()
+    assert r['diferencia'] == 0.0
+    assert r['decision'] == 'sin decidir'
+    lo, hi = r['intervalo']
+    assert lo < -10 and hi > 10
+
+
+def test_variantes_iguales_acaban_en_futilidad():
+    spec = {'a': {'size': 4}, 'b': {'size': 4}, 'metrica': 'victoria', 'efecto_minimo': 0.02,
+            'minimo_episodios': 100, 'max_episodios': 1000, 'lote': 50}
+    r = ComparacionAB(spec).ejecutar()
+    assert r['decision'] == 'futilidad'
+    assert 100 < r['episodios'] < 1000
@@ -0,0 +1,88 @@
+import asyncio
+
+from wumpus_barrido import crear_partida, jugar_lote
+from wumpus_cooperativo import PlanificadorCooperativo, jugar_lote_cooperativo
+from wumpus_core import observacion
+
+CONFIG = {'size': 6, 'pit_probability': 0.15, 'max_steps': 60}
+
+
+def _sin_tiempos(resultados):
+    # Latencias y segundos dependen del reloj
+    return [(r[0], r[1], r[2], r[3], r[5], r[6]) for r in resultados]
+
+
+def test_intercalados_juegan_como_de_uno_en_uno():
+    semillas = range(40)
+    assert (_sin_tiempos(jugar_lote_cooperativo(CONFIG, semillas, max_activos=7))
+            == _sin_tiempos(jugar_lote(CONFIG, semillas)))
+
+
+class _SoloGeometria:
+    """ Mundo visto por el agente: la geometría sí, el estado no. """
+    def __init__(self, world):
+        self._world = world
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('agent_') or nombre in ('get_percepts_at', 'wumpus_locations', 'subscribe',
+                                                      'execute_action', 'eventos'):
+            raise AssertionError(f"El agente lee world.{nombre}")
+        return getattr(self._world, nombre)
+
+
+def test_el_agente_solo_recibe_lo_que_se_le_envia():
+    for semilla in range(20):
+        world, agent = crear_partida(CONFIG, semilla)
+        agent.world = _SoloGeometria(world)
+        agent.log = lambda *args, **kwargs: None
+        episodio = agent.episodio(CONFIG['max_steps'])
+        next(episodio)
+        pasos = 0
+        try:
+            action = episodio.send(observacion(world, pasos, CONFIG['max_steps']))
+            while True:
+                result = world.execute_action(action)
+                pasos += 1
+                action = episodio.send((result, observacion(world, pasos, CONFIG['max_steps'])))
+        except StopIteration as fin:
+            assert fin.value == pasos
+        assert agent.tiene_oro == world.agent_has_gold and agent.vivo == world.agent_is_alive
+
+
+def test_no_redirige_la_salida_de_otras_tareas(capsys):
+    async def principal():
+        planificador = PlanificadorCooperativo(CONFIG, range(10), max_activos=4)
+
+        async def otra_tarea():
+            for i in range(5):
+                print(f"latido {i}")
+                await asyncio.sleep(0)
+
+        resultados, _ = await asyncio.gather(planificador.ejecutar_async(), otra_tarea())
+        return resultados
+
+    resultados = asyncio.run(principal())
+    assert len(resultados) == 10
+    salida = capsys.readouterr().out
+    # Los latidos se ven y los agentes no escriben nada
+    assert salida == "".join(f"latido {i}\n" for i in range(5))
+
+
+def test_el_presupuesto_del_episodio_solo_cuenta_al_agente(monkeypatch):
+    # Reloj compartido que avanza 1 ms en cada lectura: intercalados, las
+    # lecturas de los demás episodios no deben gastar el presupuesto de uno
+    ahora = [0.0]
+
+    def reloj():
+        ahora[0] += 0.001
+        return ahora[0]
+
+    monkeypatch.setattr('time.perf_counter', reloj)
+    config = dict(CONFIG, presupuesto_episodio=0.05)
+    semillas = range(60)
+    serie = jugar_lote(config, semillas)
+    intercalados = jugar_lote_cooperativo(config, semillas, max_activos=20)
+    assert _sin_tiempos(intercalados) == _sin_tiempos(serie)
+    # El presupuesto llega a agotarse en algunos, pero no al empezar
+    pasos = [r[3] for r in serie]
+    assert sum(pasos) / len(pasos) > 5
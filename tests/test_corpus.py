@@ -0,0 +1,63 @@
+import pytest
+
+from wumpus_core import WumpusWorld
+from wumpus_corpus import Corpus, rasgos_mundo
+
+
+@pytest.fixture
+def corpus():
+    corpus = Corpus(':memory:')
+    assert corpus.construir([4, 5], 60) == 120
+    yield corpus
+    corpus.cerrar()
+
+
+def test_rasgos_de_mundos_conocidos():
+    assert rasgos_mundo(WumpusWorld.from_layout(4, (1, 3))) == {
+        'pozos': 0, 'camino_seguro': 2, 'adivinanzas': 0, 'oro_sin_riesgo': 1}
+    # Brisa en (2, 1) y en (1, 2): ninguna casilla nueva es demostrablemente segura
+    assert rasgos_mundo(WumpusWorld.from_layout(4, (4, 4), pits=[(2, 2)])) == {
+        'pozos': 1, 'camino_seguro': 6, 'adivinanzas': 1, 'oro_sin_riesgo': 0}
+    # Oro encerrado por pozos
+    assert rasgos_mundo(WumpusWorld.from_layout(4, (4, 4), pits=[(3, 4), (4, 3)])) == {
+        'pozos': 2, 'camino_seguro': None, 'adivinanzas': None, 'oro_sin_riesgo': 0}
+
+
+def test_columnas_de_rasgos(corpus):
+    filas = corpus.seleccionar()
+    assert len(filas) == 120
+    for fila in filas:
+        world = corpus.mundo(fila)
+        assert {k: fila[k] for k in ('pozos', 'camino_seguro', 'adivinanzas', 'oro_sin_riesgo')} \
+            == rasgos_mundo(world)
+        assert fila['pozos'] == len(world.pit_locations)
+        # Sin camino seguro el agente que solo se arriesga con acierto tampoco llega
+        assert (fila['camino_seguro'] is None) == (fila['adivinanzas'] is None)
+        assert fila['oro_sin_riesgo'] == (fila['adivinanzas'] == 0)
+        if fila['camino_seguro'] is not None:
+            oro = world.gold_location
+            assert fila['camino_seguro'] >= oro[0] + oro[1] - 2
+    # Hay de todo en el corte
+    assert {f['adivinanzas'] for f in filas} >= {None, 0, 1, 2}
+
+    # Reconstruir no añade nada
+    assert corpus.construir([4, 5], 60) == 0
+
+
+def test_seleccion_por_rasgos(corpus):
+    todas = corpus.seleccionar()
+    for filtros in ({'size': 4, 'adivinanzas': 1}, {'size': 5, 'oro_sin_riesgo': 1},
+                    {'size': 4, 'pozos': 2}, {'size': 5, 'camino_seguro': None}):
+        filas = corpus.seleccionar(**filtros)
+        esperadas = [f for f in todas if all(f[k] == v for k, v in filtros.items())]
+        assert filas and sorted(f['semilla'] for f in filas) == sorted(f['semilla'] for f in esperadas)
+        assert [f['semilla'] for f in filas] == sorted(f['semilla'] for f in filas)
+    primeras = corpus.seleccionar(limite=3, size=4, adivinanzas=0)
+    assert [f['semilla'] for f in primeras] == [f['semilla'] for f in corpus.seleccionar(size=4, adivinanzas=0)][:3]
+    with pytest.raises(ValueError):
+        corpus.seleccionar(dificultad=1)
+
+    # El corte se busca por índice, sin recorrer la tabla
+    plan = corpus.conexion.execute("EXPLAIN QUERY PLAN SELECT * FROM mundos WHERE size = ? AND adivinanzas = ?",
+                                   (4, 1)).fetchall()
+    assert any('USING INDEX mundos_adivinanzas' in fila[3] for fila in plan)
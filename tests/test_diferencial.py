@@ -0,0 +1,54 @@
+import pytest
+
+import wumpus_diferencial as diferencial
+import wumpus_referencia as referencia
+from wumpus_core import KnowledgeBase
+
+
+class _KBSinBrisa(KnowledgeBase):
+    """ KB rota a propósito: olvida las brisas. """
+    def tell(self, fact, justification=None):
+        if not fact.startswith("Breeze at"):
+            super().tell(fact, justification)
+
+
+@pytest.fixture
+def rota(monkeypatch):
+    monkeypatch.setitem(diferencial.IMPLEMENTACIONES, 'rota', {'kb': _KBSinBrisa})
+    return 'rota'
+
+
+def test_todas_las_implementaciones_coinciden_con_la_referencia():
+    nombres = list(diferencial.IMPLEMENTACIONES)
+    assert diferencial.probar(120, nombres, semilla=1000) == []
+
+
+def test_la_referencia_es_independiente():
+    # Ni wumpus_core ni pygame: el oráculo no comparte código con lo que prueba
+    assert referencia.WumpusWorld.__module__ == referencia.KnowledgeBase.__module__ == 'wumpus_referencia'
+    assert 'wumpus_core' not in vars(referencia) and 'pygame' not in vars(referencia)
+
+
+def test_la_referencia_juega_el_caso_a_mano():
+    caso = {'size': 4, 'oro': (1, 2), 'wumpus': [(3, 1)], 'pozos': [(1, 3)], 'acciones': []}
+    caso['acciones'] = [diferencial.MOVE_ACTIONS[0]] * 3
+    traza = diferencial.jugar_referencia(caso)
+    assert traza and "No Pit at (1, 1)" in traza[0]['hechos']
+    assert traza == diferencial.jugar_caso(caso, 'bucle')
+
+
+def test_detecta_una_implementacion_rota(rota):
+    fallos = diferencial.probar(200, [rota], max_fallos=1)
+    assert fallos and fallos[0][1] == rota
+
+
+def test_reducir_encoge_el_caso_y_sigue_fallando(rota):
+    semilla, _, _ = diferencial.probar(200, [rota], max_fallos=1)[0]
+    caso = diferencial.generar_caso(semilla)
+    minimo = diferencial.reducir(caso, rota)
+    assert diferencial.diferencia(minimo, rota) is not None
+    assert minimo['size'] <= caso['size']
+    assert len(minimo['acciones']) <= len(caso['acciones'])
+    # Basta con un pozo y ningún Wumpus para que se note la brisa olvidada
+    assert len(minimo['pozos']) == 1 and not minimo['wumpus']
+    assert len(minimo['acciones']) <= 3
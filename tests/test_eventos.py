@@ -0,0 +1,96 @@
+import random
+
+from wumpus_acciones import SHOOT_ACTIONS, MOVE_BY_DELTA
+from wumpus_barrido import crear_partida
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld, observacion, parse_fact
+
+DISPARO_DERECHA = SHOOT_ACTIONS[MOVE_BY_DELTA[(1, 0)]]
+
+
+def _agente(wumpus):
+    world = WumpusWorld.from_layout(6, (6, 6), wumpus=wumpus)
+    return world, LogicalAgent(world, KnowledgeBase())
+
+
+def _disparar(world, agent, action):
+    agent.disparo = (agent.location, (1, 0))
+    result = world.execute_action(action)
+    agent.observar(observacion(world))
+    return result
+
+
+def test_grito_con_un_solo_wumpus_retira_todo_el_hedor():
+    world, agent = _agente([(3, 1)])
+    agent.kb.tell("Stench at (2, 1)")
+    agent.kb.tell("Wumpus at (3, 1)", ["Stench at (2, 1)"])
+    agent.kb.tell("Danger at (3, 1)", ["Stench at (2, 1)"])
+    _disparar(world, agent, DISPARO_DERECHA)
+    assert agent.wumpus_killed
+    assert not agent.kb.get_facts_starting_with("Stench at")
+    assert not agent.kb.get_facts_starting_with("Wumpus at")
+    assert not agent.kb.ask("Danger at (3, 1)")
+    assert agent.kb.ask("No Stench at (2, 1)")
+
+
+def test_grito_con_varios_wumpus_solo_retira_el_abatido():
+    world, agent = _agente([(3, 1), (1, 4)])
+    agent.kb.tell("No Wumpus at (2, 1)")
+    agent.kb.tell("Stench at (2, 1)")
+    agent.kb.tell("Stench at (1, 3)")
+    agent.kb.tell("Wumpus at (3, 1)", ["Stench at (2, 1)"])
+    _disparar(world, agent, DISPARO_DERECHA)
+    assert world.wumpus_locations == {(1, 4)}
+    # El hedor puede ser del otro Wumpus: se conserva, y (1, 4) no pasa a ser segura
+    assert agent.kb.ask("Stench at (1, 3)")
+    assert not agent.kb.ask("No Wumpus at (1, 4)")
+    assert not agent.kb.ask("Wumpus at (3, 1)") and agent.kb.ask("No Wumpus at (3, 1)")
+
+
+def test_grito_sin_saber_a_quien_alcanzo():
+    # (2, 1) no se sabe libre de Wumpus: pudo caer uno desconocido allí
+    world, agent = _agente([(2, 1), (1, 4)])
+    agent.kb.tell("Stench at (4, 2)")
+    agent.kb.tell("Wumpus at (4, 1)", ["Stench at (4, 2)"])
+    _disparar(world, agent, DISPARO_DERECHA)
+    assert world.wumpus_locations == {(1, 4)}
+    assert not agent.kb.ask("Wumpus at (4, 1)")
+    assert not agent.kb.ask("No Wumpus at (4, 1)")
+
+
+def test_hedor_rancio_se_corrige_al_volver():
+    world, agent = _agente([(3, 1), (1, 4)])
+    agent.kb.tell("Stench at (1, 1)")
+    agent.procesar_perceptos({'breeze': False, 'stench': False, 'glitter': False})
+    assert not agent.kb.ask("Stench at (1, 1)") and agent.kb.ask("No Stench at (1, 1)")
+
+
+def test_dos_wumpus_tras_el_grito_ninguno_vivo_queda_seguro():
+    config = dict(size=6, num_wumpus=2, pit_probability=0.1, max_steps=200)
+    gritos = 0
+    for semilla in range(300):
+        world, agent = crear_partida(config, semilla)
+        malos = []
+
+        def vigilar(added, fact):
+            if (agent.wumpus_killed and added and fact.startswith("No Wumpus at")
+                    and parse_fact(fact)[1] in world.wumpus_locations):
+                malos.append(fact)
+        agent.kb.subscribe(vigilar)
+        agent.run_agent(200)
+        assert not malos, (semilla, malos)
+        if agent.wumpus_killed:
+            gritos += 1
+            assert world.agent_is_alive or world.agent_location not in world.wumpus_locations, semilla
+    assert gritos > 50
+
+
+def test_coger_el_oro_solo_olvida_el_brillo():
+    # El oro no cambia cómo sigue el agente: decide como antes de cogerlo, sin retirada
+    world = WumpusWorld.from_layout(4, (1, 3))
+    log = []
+    agent = LogicalAgent(world, KnowledgeBase(), log=log.append, azar=random.Random(0))
+    agent.run_agent(30)
+    assert world.agent_has_gold
+    assert agent.retirada is None
+    assert not agent.kb.get_facts_starting_with("Glitter at")
+    assert not any("retirada" in linea for linea in log)
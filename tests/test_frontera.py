@@ -0,0 +1,37 @@
+from wumpus_acciones import MOVE_BY_DELTA
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld
+
+
+def _agente_en_pasillo():
+    # Visitadas (1, 1)..(5, 1); seguras sin visitar (1, 2) y (5, 2); el agente en (5, 1)
+    world = WumpusWorld.from_layout(6, (6, 6))
+    agent = LogicalAgent(world, KnowledgeBase())
+    for x in range(1, 6):
+        agent.visited_squares.add((x, 1))
+    for cell in ((1, 2), (5, 2)):
+        agent.kb.tell(f"No Pit at {cell}")
+        agent.kb.tell(f"No Wumpus at {cell}")
+    agent.location = (5, 1)
+    return agent
+
+
+def test_la_frontera_sigue_los_cambios_de_seguridad_y_visitas():
+    agent = _agente_en_pasillo()
+    assert agent.frontera.celdas == {(1, 2), (5, 2)}
+    agent.kb.retract("No Wumpus at (1, 2)")
+    assert agent.frontera.celdas == {(5, 2)}
+    agent.visited_squares.add((5, 2))
+    assert agent.frontera.celdas == set()
+
+
+def test_va_a_la_casilla_de_la_frontera_mas_cercana_al_agente():
+    agent = _agente_en_pasillo()
+    assert agent._accion_hacia_frontera() == MOVE_BY_DELTA[(0, 1)]
+    assert agent.objetivo == (5, 2)
+
+    # Con el objetivo fuera de la frontera se elige otro desde donde se está
+    agent.visited_squares.add((5, 2))
+    agent.location = (4, 1)
+    assert agent._accion_hacia_frontera() == MOVE_BY_DELTA[(-1, 0)]
+    assert agent.objetivo == (1, 2)
+    assert agent.ruta == [(1, 2), (1, 1), (2, 1)]
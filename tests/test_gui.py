@@ -0,0 +1,97 @@
+import contextlib
+import io
+import os
+import random
+
+import pytest
+
+pytest.importorskip("pygame")
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+from wumpus_GUI import BYTES_POR_PASO, WumpusGUI  # noqa: E402
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld  # noqa: E402
+
+
+def _partida(semilla, num_wumpus=1, **opciones):
+    random.seed(semilla)
+    world = WumpusWorld(size=6, num_wumpus=num_wumpus, pit_probability=0.12)
+    return world, LogicalAgent(world, KnowledgeBase(), log=lambda *args: None, **opciones)
+
+
+def _estado(gui):
+    world, agent = gui.world, gui.agent
+    return (gui.current_step, world.state(), sorted(world.wumpus_locations), sorted(agent.kb.facts),
+            sorted(agent.visited_squares), list(agent.path_stack), agent.modo_degradado,
+            agent.tiene_flecha, agent.wumpus_killed, len(agent.latencias), random.getstate())
+
+
+def _gui(semilla, historial=10 ** 9, **opciones):
+    world, agent = _partida(semilla, **opciones)
+    return WumpusGUI(world, agent, headless=True, historial=historial)
+
+
+def _jugar(gui, pasos):
+    estados, acciones = [], []
+    with contextlib.redirect_stdout(io.StringIO()):
+        while gui.game_state == "Ejecutando" and len(estados) < pasos:
+            antes = _estado(gui)
+            gui.run_step()
+            if gui.current_step > antes[0]:
+                estados.append(antes)
+                acciones.append(gui.message)
+    return estados, acciones
+
+
+@pytest.fixture(autouse=True)
+def _cerrar_pygame():
+    yield
+    import pygame
+    pygame.quit()
+
+
+@pytest.mark.parametrize('opciones', [{}, {'motor_reglas': True}, {'inferencia_local': True},
+                                      {'num_wumpus': 3}, {'detectar_ciclos': True}])
+def test_retroceder_restaura_cada_paso_y_se_vuelve_a_jugar_igual(opciones):
+    for semilla in range(8):
+        gui = _gui(semilla, **opciones)
+        world, agent = gui.world, gui.agent
+        estados, acciones = _jugar(gui, 25)
+        final = _estado(gui)
+        for estado in reversed(estados):
+            gui.step_back()
+            assert _estado(gui) == estado
+        # Se restaura en el sitio, sin copias del mundo ni del agente
+        assert gui.world is world and gui.agent is agent
+        gui.step_back()
+        assert gui.message == "No se puede retroceder más"
+        assert _jugar(gui, 25)[1] == acciones and _estado(gui) == final
+
+
+def test_retroceder_no_depende_del_tiempo_de_los_pasos():
+    gui = _gui(1)
+    gui.agent.presupuesto_paso = 0.0  # Cualquier paso lo supera: modo degradado
+    _jugar(gui, 1)
+    assert gui.agent.modo_degradado
+    gui.step_back()
+    assert not gui.agent.modo_degradado and gui.current_step == 0
+    _jugar(gui, 1)
+    assert gui.current_step == 1 and gui.agent.location == gui.world.agent_location
+
+
+def test_el_historial_se_limita_por_memoria():
+    gui = _gui(3, historial=4 * BYTES_POR_PASO)
+    estados, _ = _jugar(gui, 30)
+    assert len(estados) > 4 and 1 <= len(gui.historial) < 4
+    assert gui.agent.kb.open_snapshots() == len(gui.historial)
+    for estado in reversed(estados[-len(gui.historial):]):
+        gui.step_back()
+        assert _estado(gui) == estado
+    gui.step_back()
+    assert gui.message == "No se puede retroceder más"
+
+
+def test_sin_historial_no_abre_puntos_de_restauracion():
+    gui = _gui(3, historial=0)
+    _jugar(gui, 10)
+    assert not gui.historial and not gui.agent.kb.open_snapshots()
@@ -0,0 +1,71 @@
+import pytest
+
+from wumpus_barrido import crear_partida
+from wumpus_core import CambiosPorCasilla, KnowledgeBase
+
+LOCAL = {'inferencia_local': True}
+
+
+@pytest.mark.parametrize('semilla', range(12))
+def test_deduce_lo_mismo_que_el_bucle(en_paralelo, semilla):
+    en_paralelo(semilla, {'size': 8, 'pit_probability': 0.15, 'max_steps': 80}, LOCAL)
+
+
+@pytest.mark.parametrize('semilla', range(6))
+def test_con_varios_wumpus(en_paralelo, semilla):
+    en_paralelo(semilla, {'size': 8, 'num_wumpus': 3, 'pit_probability': 0.1, 'max_steps': 80}, LOCAL)
+
+
+@pytest.mark.parametrize('semilla', range(6))
+def test_en_modo_degradado(en_paralelo, semilla):
+    # Con presupuesto 0 todos los pasos lo superan: los dos omiten las Reglas 4 y 6
+    en_paralelo(semilla, {'size': 8, 'pit_probability': 0.15, 'max_steps': 60, 'presupuesto_paso': 0.0}, LOCAL)
+
+
+def test_anticipar_no_altera_lo_pendiente():
+    config = {'size': 6, 'pit_probability': 0.15, 'max_steps': 40}
+    for semilla in range(10):
+        agentes = []
+        for extra in ({}, LOCAL):
+            world, agent = crear_partida(dict(config, **extra), semilla)
+            agent.log = lambda *args, **kwargs: None
+            agent.run_agent(3)
+            agentes.append(agent)
+        base, local = agentes
+        hechos = set(local.kb.facts)
+        for cell in ((2, 2), (1, 3), (3, 1)):
+            for breeze in (False, True):
+                percepts = {'breeze': breeze, 'stench': not breeze, 'glitter': False}
+                assert local.anticipar(cell, percepts) == base.anticipar(cell, percepts)
+        assert local.kb.facts == hechos
+        # Lo examinado en la hipótesis se vuelve a examinar con la KB real
+        base.inferir_seguridad()
+        local.inferir_seguridad()
+        assert local.kb.facts == base.kb.facts
+
+
+def test_cambios_por_casilla():
+    kb = KnowledgeBase()
+    kb.tell("No Pit at (1, 1)")
+    cambios = CambiosPorCasilla(kb, ('a', 'b'))
+    kb.tell("Breeze at (1, 2)")
+    assert cambios.casillas('a') == {(1, 1), (1, 2)}
+    assert cambios.casillas('a') == set()
+    kb.retract("Breeze at (1, 2)")
+    assert cambios.casillas('a') == {(1, 2)}
+
+    marcas = cambios.guardar()
+    with kb.hypothesis():
+        kb.tell("Stench at (2, 2)")
+        assert cambios.casillas('a') == {(2, 2)}
+    cambios.restaurar(marcas)
+    assert cambios.casillas('a') == {(2, 2)}  # El rollback también es un cambio
+
+    cambios.compactar()  # 'b' aún no ha visto nada: no se olvida
+    assert cambios.casillas('b') == {(1, 1), (1, 2), (2, 2)}
+    cambios.compactar()
+    assert not cambios._registro
+    cambios.descartar('a')
+    kb.tell("Glitter at (3, 3)")
+    cambios.descartar('b')
+    assert cambios.casillas('b') == set() and cambios.casillas('a') == {(3, 3)}
@@ -0,0 +1,176 @@
+import pytest
+
+from wumpus_core import KnowledgeBase
+
+
+def test_retract_olvida_las_justificaciones_del_hecho():
+    kb = KnowledgeBase()
+    kb.tell("Stench at (1, 2)")
+    kb.tell("Wumpus at (1, 3)", ["Stench at (1, 2)"])
+    kb.retract("Wumpus at (1, 3)")
+
+    # Vuelve a decirse con otra premisa: al retirarla no debe quedar por la antigua
+    kb.tell("Stench at (2, 3)")
+    kb.tell("Wumpus at (1, 3)", ["Stench at (2, 3)"])
+    kb.retract("Stench at (2, 3)")
+    assert not kb.ask("Wumpus at (1, 3)")
+    assert kb.ask("Stench at (1, 2)")
+
+
+def test_rollback_restaura_las_justificaciones_retiradas():
+    kb = KnowledgeBase()
+    kb.tell("Breeze at (1, 2)")
+    kb.tell("Pit at (1, 3)", ["Breeze at (1, 2)"])
+    with kb.hypothesis():
+        kb.retract("Pit at (1, 3)")
+        assert not kb.ask("Pit at (1, 3)")
+    assert kb.ask("Pit at (1, 3)")
+
+    # La justificación vuelve con el hecho: retirar la premisa lo arrastra
+    kb.retract("Breeze at (1, 2)")
+    assert not kb.ask("Pit at (1, 3)")
+
+
+def test_cascada_de_retirada():
+    kb = KnowledgeBase()
+    kb.tell("Stench at (2, 1)")
+    kb.tell("Wumpus at (3, 1)", ["Stench at (2, 1)"])
+    kb.tell("Danger at (3, 1)", ["Wumpus at (3, 1)"])
+    kb.tell("No Wumpus at (1, 1)")
+    kb.retract("Stench at (2, 1)")
+    assert kb.facts == {"No Wumpus at (1, 1)"}
+
+
+def test_hecho_con_premisa_propia_no_se_retira_en_cascada():
+    kb = KnowledgeBase()
+    kb.tell("No Stench at (1, 1)")
+    kb.tell("No Wumpus at (1, 2)", ["No Stench at (1, 1)"])
+    kb.tell("No Wumpus at (1, 2)")  # También observado directamente
+    kb.retract("No Stench at (1, 1)")
+    assert kb.ask("No Wumpus at (1, 2)")
+
+
+def test_snapshot_y_rollback():
+    kb = KnowledgeBase()
+    kb.tell("No Pit at (1, 1)")
+    s = kb.snapshot()
+    kb.tell("Breeze at (1, 1)")
+    kb.retract("No Pit at (1, 1)")
+    assert kb.changes_since(s) == ({"Breeze at (1, 1)"}, {"No Pit at (1, 1)"})
+    kb.rollback(s)
+    assert kb.facts == {"No Pit at (1, 1)"}
+    assert kb.count("Breeze") == 0 and kb.count("No Pit") == 1
+
+
+def test_archivar_lo_saca_de_los_activos_pero_no_de_la_kb():
+    kb = KnowledgeBase()
+    kb.tell("Breeze at (1, 2)")
+    kb.tell("Breeze at (2, 1)")
+    kb.archive("Breeze at (1, 2)")
+    assert kb.ask("Breeze at (1, 2)") and kb.is_archived("Breeze at (1, 2)")
+    assert kb.count("Breeze") == 2
+    assert sorted(kb.get_facts_starting_with("Breeze at")) == ["Breeze at (1, 2)", "Breeze at (2, 1)"]
+    assert kb.get_active_facts_starting_with("Breeze at") == ["Breeze at (2, 1)"]
+
+
+def test_no_se_archiva_durante_una_hipotesis():
+    kb = KnowledgeBase()
+    kb.tell("No Breeze at (1, 1)")
+    with kb.hypothesis():
+        with pytest.raises(RuntimeError):
+            kb.archive("No Breeze at (1, 1)")
+    assert not kb.is_archived("No Breeze at (1, 1)")
+
+
+def test_rollback_devuelve_al_archivo_lo_retirado():
+    kb = KnowledgeBase()
+    kb.tell("Stench at (2, 1)")
+    kb.tell("Wumpus at (3, 1)", ["Stench at (2, 1)"])
+    kb.archive("Stench at (2, 1)")
+    s = kb.snapshot()
+    kb.retract("Stench at (2, 1)")
+    assert not kb.ask("Wumpus at (3, 1)")
+    assert kb.changes_since(s) == (set(), {"Stench at (2, 1)", "Wumpus at (3, 1)"})
+    kb.rollback(s)
+    assert kb.facts == {"Stench at (2, 1)", "Wumpus at (3, 1)"}
+    assert kb.is_archived("Stench at (2, 1)") and not kb.is_archived("Wumpus at (3, 1)")
+    assert kb.get_active_facts_starting_with("Stench at") == []
+    assert kb.count("Stench") == 1
+
+    # Y la justificación sigue en pie
+    kb.retract("Stench at (2, 1)")
+    assert kb.facts == set()
+
+
+def test_rollback_anidado_con_hechos_archivados():
+    kb = KnowledgeBase()
+    kb.tell("No Breeze at (1, 1)")
+    kb.archive("No Breeze at (1, 1)")
+    exterior = kb.snapshot()
+    kb.retract("No Breeze at (1, 1)")
+    interior = kb.snapshot()
+    kb.tell("No Breeze at (1, 1)")  # Vuelve, ya activo
+    assert not kb.is_archived("No Breeze at (1, 1)")
+    kb.rollback(interior)
+    assert not kb.ask("No Breeze at (1, 1)")
+    kb.rollback(exterior)
+    assert kb.is_archived("No Breeze at (1, 1)")
+    assert kb.get_active_facts_starting_with("No Breeze at") == []
+
+
+def _peligros(kb, *casillas, because=None):
+    for c in casillas:
+        kb.tell(f"Danger at {c}", because)
+
+
+def test_count_y_recent_vuelven_tras_un_rollback():
+    kb = KnowledgeBase(max_recent=3)
+    _peligros(kb, (1, 2), (2, 2), (3, 2), (4, 2))
+    antes = kb.recent("Danger")
+    assert antes == ["Danger at (2, 2)", "Danger at (3, 2)", "Danger at (4, 2)"]
+    with kb.hypothesis():
+        _peligros(kb, (5, 2))                 # Echa a (2, 2) de los recientes
+        kb.retract("Danger at (3, 2)")        # Y (3, 2) vuelve después, en su sitio
+        kb.retract("Danger at (1, 2)")
+        assert kb.count("Danger") == 3
+        assert kb.recent("Danger") == ["Danger at (2, 2)", "Danger at (4, 2)", "Danger at (5, 2)"]
+    assert kb.count("Danger") == 4 and kb.recent("Danger") == antes
+
+    # Un hecho retirado y vuelto a decir en la hipótesis también vuelve a su sitio
+    with kb.hypothesis():
+        kb.retract("Danger at (2, 2)")
+        _peligros(kb, (2, 2))
+        assert kb.recent("Danger")[-1] == "Danger at (2, 2)"
+    assert kb.recent("Danger") == antes
+
+
+def test_count_y_recent_tras_una_cascada():
+    kb = KnowledgeBase(max_recent=3)
+    kb.tell("Stench at (2, 1)")
+    _peligros(kb, (1, 3), (2, 3), (3, 3))
+    _peligros(kb, (3, 1), (2, 2), because=["Stench at (2, 1)"])
+    assert kb.count("Danger") == 5
+    assert kb.recent("Danger") == ["Danger at (3, 3)", "Danger at (3, 1)", "Danger at (2, 2)"]
+
+    # Deshecha la cascada, todo como estaba
+    with kb.hypothesis():
+        kb.retract("Stench at (2, 1)")
+        assert kb.count("Danger") == 3
+    assert kb.count("Danger") == 5
+    assert kb.recent("Danger") == ["Danger at (3, 3)", "Danger at (3, 1)", "Danger at (2, 2)"]
+
+    # La cascada saca los deducidos y los recientes vuelven a ser los que quedan
+    kb.retract("Stench at (2, 1)")
+    assert kb.count("Danger") == 3
+    assert kb.recent("Danger") == ["Danger at (1, 3)", "Danger at (2, 3)", "Danger at (3, 3)"]
+
+
+def test_recent_con_hechos_archivados():
+    kb = KnowledgeBase(max_recent=2)
+    _peligros(kb, (1, 2), (2, 2))
+    kb.archive("Danger at (2, 2)")
+    with kb.hypothesis():
+        kb.retract("Danger at (2, 2)")
+        assert kb.recent("Danger") == ["Danger at (1, 2)"] and kb.count("Danger") == 1
+    assert kb.recent("Danger") == ["Danger at (1, 2)", "Danger at (2, 2)"] and kb.count("Danger") == 2
+    assert kb.is_archived("Danger at (2, 2)")
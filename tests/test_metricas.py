@@ -0,0 +1,138 @@
+import json
+import math
+import re
+import urllib.error
+import urllib.request
+
+import pytest
+
+from wumpus_metricas import (Exportador, HistogramaLatencias, MetricasEpisodios, Registro,
+                             _escapar)
+
+_MUESTRA = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(?:\{(.*)\})? (\S+)$')
+_ETIQUETA = re.compile(r'([a-zA-Z_]\w*)="((?:[^"\\]|\\.)*)",?')
+
+
+def _desescapar(texto):
+    return re.sub(r'\\(.)', lambda m: '\n' if m.group(1) == 'n' else m.group(1), texto)
+
+
+def _leer_prometheus(texto):
+    """
+    Lee el formato de texto de Prometheus: {nombre: (tipo, ayuda)} y la lista
+    de muestras (nombre, etiquetas, valor). Falla con cualquier línea que no
+    sea un comentario o una muestra válidos.
+    """
+    assert texto.endswith("\n")
+    metricas, muestras = {}, []
+    for linea in texto.splitlines():
+        if linea.startswith("# HELP "):
+            nombre, ayuda = linea[7:].split(" ", 1)
+            metricas[nombre] = [None, _desescapar(ayuda)]
+        elif linea.startswith("# TYPE "):
+            nombre, tipo = linea[7:].split(" ")
+            metricas[nombre][0] = tipo
+        else:
+            m = _MUESTRA.match(linea)
+            assert m, linea
+            etiquetas = {}
+            if m.group(2):
+                pares = _ETIQUETA.findall(m.group(2))
+                assert ''.join(f'{k}="{v}",' for k, v in pares).rstrip(',') == m.group(2)
+                etiquetas = {k: _desescapar(v) for k, v in pares}
+            muestras.append((m.group(1), etiquetas, float(m.group(3))))
+    return {k: tuple(v) for k, v in metricas.items()}, muestras
+
+
+def _registro():
+    registro = Registro()
+    contador = registro.contador('prueba_total', 'Con barra \\ y\nsalto de línea')
+    indicador = registro.indicador('prueba_tasa', 'Una tasa')
+    histograma = registro.histograma('prueba_segundos', 'Latencias', (0.1, 1, 10))
+    contador.inc(3)
+    indicador.set(0.25)
+    histograma.observar_muchos([0.05, 0.1, 0.5, 2.0, 20.0, 30.0])
+    return registro
+
+
+def test_formato_de_texto_de_prometheus():
+    metricas, muestras = _leer_prometheus(_registro().texto_prometheus())
+    assert metricas == {'prueba_total': ('counter', 'Con barra \\ y\nsalto de línea'),
+                        'prueba_tasa': ('gauge', 'Una tasa'),
+                        'prueba_segundos': ('histogram', 'Latencias')}
+    valores = {(n, tuple(e.items())): v for n, e, v in muestras}
+    assert valores[('prueba_total', ())] == 3 and valores[('prueba_tasa', ())] == 0.25
+
+    # Cubos acumulados (el límite incluido en su cubo), +Inf igual al total
+    cubos = [(float(e['le']), v) for n, e, v in muestras if n == 'prueba_segundos_bucket']
+    assert cubos == [(0.1, 2), (1.0, 3), (10.0, 4), (math.inf, 6)]
+    assert valores[('prueba_segundos_count', ())] == 6
+    assert valores[('prueba_segundos_sum', ())] == pytest.approx(52.65)
+
+
+def test_escapado_de_etiquetas():
+    for valor in ('simple', 'con "comillas"', 'barra \\ final\\', 'dos\nlíneas'):
+        escapado = _escapar(valor, True)
+        assert '\n' not in escapado
+        (nombre, texto), = _ETIQUETA.findall(f'x="{escapado}"')
+        assert nombre == 'x' and _desescapar(texto) == valor
+    assert _escapar('sin "comillas" en HELP') == 'sin "comillas" en HELP'
+
+
+def test_exportador_http_y_json(tmp_path):
+    registro = _registro()
+    ruta = tmp_path / "metricas.json"
+    with Exportador(registro, puerto=0, ruta_json=str(ruta), intervalo=60) as exportador:
+        url = f"http://127.0.0.1:{exportador.puerto}"
+        with urllib.request.urlopen(url + "/metrics") as respuesta:
+            assert respuesta.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+            assert respuesta.read().decode() == registro.texto_prometheus()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + "/otra")
+        assert error.value.code == 404
+        registro._metricas['prueba_total'].inc()
+
+    # Al terminar queda la última instantánea, completa y sin el temporal
+    datos = json.loads(ruta.read_text())
+    assert set(datos) == {'tiempo', 'metricas'}
+    assert datos['metricas'] == json.loads(json.dumps(registro.instantanea()))
+    assert datos['metricas']['prueba_total'] == 4
+    assert datos['metricas']['prueba_segundos'] == {'limites': [0.1, 1, 10], 'cuentas': [2, 1, 1, 2],
+                                                    'suma': pytest.approx(52.65), 'n': 6}
+    assert list(tmp_path.iterdir()) == [ruta]
+
+
+def test_cubos_logaritmicos_de_latencias():
+    base = HistogramaLatencias.BASE
+    valores = [0.0, 1e-12, 3e-6, 1e-4, 1.01e-4, 0.02, 1.5]
+    histograma = HistogramaLatencias(valores)
+    assert histograma.n == len(valores) and histograma.suma == pytest.approx(sum(valores))
+    for valor in valores:
+        i = math.floor(math.log(max(valor, HistogramaLatencias.MINIMO), base))
+        assert base ** i <= max(valor, HistogramaLatencias.MINIMO) * (1 + 1e-12) and valor < base ** (i + 1)
+        assert i in histograma.cuentas
+    # 0 y 1e-12 caen en el cubo del mínimo; 1e-4 y 1.01e-4 comparten cubo
+    assert sorted(histograma.cuentas.values()) == [1, 1, 1, 2, 2]
+    representativos = [v for v, _ in histograma.valores()]
+    assert representativos == sorted(representativos)
+    for (v, _), i in zip(histograma.valores(), sorted(histograma.cuentas)):
+        assert base ** i < v < base ** (i + 1)
+
+
+def test_metricas_de_episodios_en_prometheus():
+    registro = Registro()
+    metricas = MetricasEpisodios(registro, procesos=2)
+    latencias = HistogramaLatencias([2e-4, 3e-4, 0.02])
+    metricas.anotar([(980, True, False, 20, latencias, 0, 40, 0.5),
+                     (-1010, False, True, 10, HistogramaLatencias([7e-4]), 0, 30, 0.25)])
+    metricas_leidas, muestras = _leer_prometheus(registro.texto_prometheus())
+    assert metricas_leidas['wumpus_latencia_paso_segundos'][0] == 'histogram'
+    valores = {(n, e.get('le')): v for n, e, v in muestras}
+    assert valores[('wumpus_episodios_total', None)] == 2
+    assert valores[('wumpus_victorias_total', None)] == 1 and valores[('wumpus_pasos_total', None)] == 30
+    assert valores[('wumpus_tasa_victoria', None)] == 0.5
+    assert valores[('wumpus_latencia_paso_segundos_count', None)] == 4
+    assert valores[('wumpus_latencia_paso_segundos_bucket', '0.00025')] == 1
+    assert valores[('wumpus_latencia_paso_segundos_bucket', '0.001')] == 3
+    assert valores[('wumpus_latencia_paso_segundos_bucket', '+Inf')] == 4
+    assert valores[('wumpus_hechos_kb_bucket', '50')] == 2 and valores[('wumpus_hechos_kb_sum', None)] == 70
@@ -0,0 +1,172 @@
+import random
+
+import pytest
+
+from wumpus_acciones import CLIMB_OUT, GRAB_GOLD, MOVE_ACTIONS, MOVE_BY_DELTA, SHOOT_ACTIONS
+from wumpus_core import SCREAM, KnowledgeBase, LogicalAgent, WumpusWorld, observacion
+
+
+@pytest.mark.parametrize("accion", [-1, -10, len(WumpusWorld._ACTION_DISPATCH), 99])
+def test_codigo_de_accion_fuera_de_rango(accion):
+    world = WumpusWorld.from_layout(4, (4, 4))
+    with pytest.raises(ValueError):
+        world.execute_action(accion)
+    assert world.agent_location == (1, 1) and world.agent_has_arrow
+
+
+def test_codigos_validos():
+    world = WumpusWorld.from_layout(4, (1, 2))
+    world.execute_action(MOVE_ACTIONS[0])  # Arriba
+    assert world.agent_location == (1, 2)
+    world.execute_action(GRAB_GOLD)
+    assert world.agent_has_gold
+    world.execute_action(MOVE_ACTIONS[1])  # Abajo
+    world.execute_action(CLIMB_OUT)
+    assert world.agent_has_exited
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_deshacer_disparo_y_oro(lazy):
+    world = WumpusWorld.from_layout(4, (1, 1), wumpus=[(3, 1)], lazy=lazy)
+    inicial = world.state()
+    world.execute_action(GRAB_GOLD)
+    estado = world.state()
+    disparo = SHOOT_ACTIONS[MOVE_BY_DELTA[(1, 0)]]
+    abatido = world.shot_target(disparo)
+    assert abatido == (3, 1)
+    world.execute_action(disparo)
+    assert not world.wumpus_locations and not world.wumpus_is_alive
+
+    world.undo_action(estado, abatido)
+    assert world.state() == estado and world.wumpus_locations == {(3, 1)}
+    assert world.get_percepts_at((2, 1))['stench']
+    world.undo_action(inicial)
+    assert world.state() == inicial and world.get_percepts_at((1, 1))['glitter']
+    if not lazy:
+        assert 'G' in world.board[(1, 1)] and 'W' in world.board[(3, 1)]
+    # Y se puede volver a jugar igual
+    assert world.execute_action(GRAB_GOLD) == "¡El agente encontró el oro!"
+    assert world.execute_action(disparo) == "¡Escuchas un grito! Has matado al Wumpus."
+
+
+def _mundo_perezoso(semilla, size=30, pit_probability=0.2, num_wumpus=3):
+    random.seed(semilla)
+    return WumpusWorld(size, lazy=True, num_wumpus=num_wumpus, pit_probability=pit_probability)
+
+
+def test_pozos_perezosos_reproducibles_con_la_semilla():
+    mundo = _mundo_perezoso(5)
+    otro = _mundo_perezoso(5)
+    assert mundo.pit_locations == otro.pit_locations
+    assert mundo.wumpus_locations == otro.wumpus_locations and mundo.gold_location == otro.gold_location
+    assert mundo.pit_locations != _mundo_perezoso(6).pit_locations
+
+
+@pytest.mark.parametrize("probabilidad", [0.05, 0.2, 0.5])
+def test_densidad_de_pozos_perezosos(probabilidad):
+    # Saltos geométricos: cada casilla candidata tiene pozo con la probabilidad dada
+    pozos = candidatas = 0
+    for semilla in range(20):
+        mundo = _mundo_perezoso(semilla, pit_probability=probabilidad)
+        pozos += len(mundo.pit_locations)
+        candidatas += mundo.size ** 2 - 1 - 1 - len(mundo.wumpus_locations)
+    assert abs(pozos / candidatas - probabilidad) < 0.02
+
+    assert not _mundo_perezoso(0, pit_probability=0).pit_locations
+    lleno = _mundo_perezoso(0, size=6, pit_probability=1)
+    assert len(lleno.pit_locations) == 36 - 1 - 1 - 3
+
+
+def test_pozos_perezosos_respetan_la_salida_el_oro_y_los_wumpus():
+    # Como en el mundo completo, solo la salida queda reservada: sus vecinas
+    # pueden tener pozo (y entonces se nota brisa al empezar)
+    for semilla in range(50):
+        mundo = _mundo_perezoso(semilla, size=6, pit_probability=0.5)
+        peligros = mundo.pit_locations | mundo.wumpus_locations
+        assert (1, 1) not in peligros and mundo.gold_location != (1, 1)
+        assert mundo.gold_location not in peligros
+        assert not mundo.pit_locations & mundo.wumpus_locations
+        assert mundo.get_percepts_at((1, 1))['breeze'] == any(
+            v in mundo.pit_locations for v in mundo.get_neighbors(1, 1))
+
+
+def test_tablero_perezoso_coincide_con_los_conjuntos_de_peligros():
+    mundo = _mundo_perezoso(3, size=8, pit_probability=0.3)
+    assert len(mundo.board) == 64 and set(mundo.board) == {(x, y) for x in range(1, 9) for y in range(1, 9)}
+    for celda in mundo.board:
+        contenido = mundo.board[celda]
+        assert ('P' in contenido) == (celda in mundo.pit_locations)
+        assert ('W' in contenido) == (celda in mundo.wumpus_locations)
+        assert ('G' in contenido) == (celda == mundo.gold_location)
+    assert (0, 1) not in mundo.board and (9, 9) not in mundo.board
+    with pytest.raises(KeyError):
+        mundo.board[(0, 1)]
+
+    # Y las mismas percepciones que el mundo completo con esa disposición
+    completo = WumpusWorld.from_layout(8, mundo.gold_location, mundo.wumpus_locations, mundo.pit_locations)
+    for celda in mundo.board:
+        assert mundo.get_percepts_at(celda) == completo.get_percepts_at(celda)
+        assert sorted(mundo.board[celda]) == sorted(completo.board[celda])
+
+
+# Wumpus en la fila y la columna de (4, 4), dos en cada dirección, y uno fuera de línea
+WUMPUS_EN_CRUZ = [(4, 6), (4, 7), (4, 2), (4, 1), (6, 4), (7, 4), (2, 4), (1, 4), (6, 6)]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+@pytest.mark.parametrize("delta, abatido", [((0, 1), (4, 6)), ((0, -1), (4, 2)),
+                                            ((1, 0), (6, 4)), ((-1, 0), (2, 4))])
+def test_la_flecha_mata_al_primer_wumpus_de_la_linea(lazy, delta, abatido):
+    world = WumpusWorld.from_layout(7, (7, 7), wumpus=WUMPUS_EN_CRUZ, lazy=lazy)
+    world.agent_location = (4, 4)
+    disparo = SHOOT_ACTIONS[MOVE_BY_DELTA[delta]]
+    assert world.shot_target(disparo) == abatido
+    assert world.execute_action(disparo) == "¡Escuchas un grito! Has matado al Wumpus."
+    assert world.wumpus_locations == set(WUMPUS_EN_CRUZ) - {abatido}
+    assert world.wumpus_is_alive and not world.agent_has_arrow
+    assert [e.kind for e in world.eventos] == [SCREAM]
+    if not lazy:
+        assert 'W' not in world.board[abatido]
+
+
+def test_disparo_sin_wumpus_en_la_linea_falla():
+    # Los Wumpus quedan detrás del agente o fuera de su línea de tiro
+    world = WumpusWorld.from_layout(7, (7, 7), wumpus=[(4, 1), (1, 4), (6, 6)])
+    world.agent_location = (4, 4)
+    for delta in ((0, 1), (1, 0)):
+        assert world.shot_target(SHOOT_ACTIONS[MOVE_BY_DELTA[delta]]) is None
+    assert world.execute_action(SHOOT_ACTIONS[MOVE_BY_DELTA[(0, 1)]]) == "La flecha no golpeó nada."
+    assert len(world.wumpus_locations) == 3 and not world.eventos
+    # Sin flecha ya no se mata a ninguno, aunque esté en la línea
+    assert world.execute_action(SHOOT_ACTIONS[MOVE_BY_DELTA[(0, -1)]]) == "No tienes flechas."
+    assert (4, 1) in world.wumpus_locations
+
+
+def test_los_indices_coinciden_con_recorrer_la_linea():
+    rng = random.Random(0)
+    for _ in range(200):
+        wumpus = {(rng.randint(1, 6), rng.randint(1, 6)) for _ in range(rng.randint(1, 8))}
+        world = WumpusWorld.from_layout(6, (6, 6), wumpus=wumpus)
+        world.agent_location = (rng.randint(1, 6), rng.randint(1, 6))
+        for delta, movimiento in MOVE_BY_DELTA.items():
+            x, y = world.agent_location
+            esperado = None
+            while 1 <= x + delta[0] <= 6 and 1 <= y + delta[1] <= 6 and esperado is None:
+                x, y = x + delta[0], y + delta[1]
+                esperado = (x, y) if (x, y) in wumpus else None
+            assert world.shot_target(SHOOT_ACTIONS[movimiento]) == esperado
+
+
+def test_quedan_wumpus_hasta_matar_al_ultimo():
+    world = WumpusWorld.from_layout(4, (4, 4), wumpus=[(3, 1), (1, 3)])
+    agent = LogicalAgent(world, KnowledgeBase())
+    disparo = SHOOT_ACTIONS[MOVE_BY_DELTA[(1, 0)]]
+    world.execute_action(disparo)
+    agent.observar(observacion(world))
+    assert world.wumpus_locations == {(1, 3)} and world.wumpus_is_alive and agent.quedan_wumpus
+
+    world.agent_has_arrow = True  # Segunda flecha para el segundo Wumpus
+    world.execute_action(SHOOT_ACTIONS[MOVE_BY_DELTA[(0, 1)]])
+    agent.observar(observacion(world))
+    assert not world.wumpus_locations and not world.wumpus_is_alive and not agent.quedan_wumpus
+    assert not world.get_percepts_at((1, 2))['stench']
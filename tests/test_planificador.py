@@ -0,0 +1,71 @@
+import contextlib
+import io
+import random
+
+from wumpus_acciones import MOVE_ACTIONS, MOVE_BY_DELTA, SHOOT_ACTIONS
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld, observacion
+from wumpus_planificador import Creencia, PlanificadorMCTS
+
+
+def _creencia(observaciones, location=(1, 2)):
+    return Creencia(4, location, {(1, 1), (1, 2)}, observaciones)
+
+
+def test_el_arbol_no_se_reutiliza_si_cambia_la_creencia():
+    planificador = PlanificadorMCTS(tiempo_limite=0.02, semilla=0)
+    creencia = _creencia({(1, 1): (False, False), (1, 2): (True, False)})
+    planificador.elegir(creencia, list(MOVE_ACTIONS))
+    raiz = planificador.raiz
+    accion = next(a for a, h in raiz.hijos.items() if h.clave is not None)
+    hijo = raiz.hijos[accion]
+
+    # Misma creencia en el estado al que lleva la acción: se reutiliza el subárbol
+    planificador._ultima_accion = accion
+    assert planificador._raiz_para(_creencia(creencia.observations, hijo.clave[0])) is hijo
+
+    # Con otra observación ya no vale, aunque la casilla coincida
+    planificador.raiz, planificador._ultima_accion = raiz, accion
+    planificador._clave_raiz = creencia.clave()
+    otra = _creencia({(1, 1): (False, False), (1, 2): (True, True)}, hijo.clave[0])
+    nueva = planificador._raiz_para(otra)
+    assert nueva is not hijo and not nueva.hijos
+
+
+def test_cerrar_libera_el_pool_y_el_arbol():
+    with PlanificadorMCTS(tiempo_limite=0.05, procesos=2, semilla=0) as planificador:
+        planificador.elegir(_creencia({(1, 1): (False, False), (1, 2): (True, False)}), list(MOVE_ACTIONS))
+        assert planificador._pool is not None
+    assert planificador._pool is None and planificador.raiz is None
+
+
+def test_el_agente_cierra_el_planificador_al_terminar():
+    random.seed(3)
+    world = WumpusWorld(4)
+    planificador = PlanificadorMCTS(tiempo_limite=0.01, semilla=3)
+    agent = LogicalAgent(world, KnowledgeBase(), planificador)
+    cerrado = []
+    cerrar = planificador.cerrar
+    planificador.cerrar = lambda: (cerrado.append(True), cerrar())
+    with contextlib.redirect_stdout(io.StringIO()):
+        agent.run_agent(30)
+    assert cerrado and planificador._pool is None
+
+
+def test_la_creencia_sabe_si_quedan_wumpus():
+    # Con dos Wumpus, matar uno no deja la cueva sin Wumpus para el planificador
+    world = WumpusWorld.from_layout(4, (4, 4), wumpus=[(3, 1), (1, 3)])
+    agent = LogicalAgent(world, KnowledgeBase(), log=lambda *args: None)
+    agent.observar(observacion(world))
+    world.execute_action(SHOOT_ACTIONS[MOVE_BY_DELTA[(1, 0)]])
+    agent.observar(observacion(world))
+    assert agent.wumpus_killed
+    creencia = Creencia.desde_agente(agent)
+    assert creencia.wumpus_alive
+    assert creencia.muestrear_mundo(random.Random(0)).wumpus is not None
+
+    world.agent_has_arrow = True  # Segunda flecha para el segundo Wumpus
+    world.execute_action(SHOOT_ACTIONS[MOVE_BY_DELTA[(0, 1)]])
+    agent.observar(observacion(world))
+    creencia = Creencia.desde_agente(agent)
+    assert not creencia.wumpus_alive
+    assert creencia.muestrear_mundo(random.Random(0)).wumpus is None
@@ -0,0 +1,40 @@
+import random
+
+import pytest
+
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld
+from wumpus_politica import PoliticaOptima, TablaPolitica, _Solucionador, resolver
+
+
+class _SinSimetria(_Solucionador):
+    """ El mismo solucionador sin identificar cada creencia con su reflejo. """
+    def _claves(self, creencia):
+        clave = self.clave(creencia[1], creencia[3])
+        return clave, clave
+
+
+def test_optimo_de_3x3():
+    assert resolver(3).tasa_victoria == pytest.approx(0.7934, abs=1e-4)
+
+
+@pytest.mark.parametrize("size, pit_probability", [(2, 0.2), (3, 0.2), (3, 0.35)])
+def test_la_reduccion_por_simetria_no_cambia_el_optimo(size, pit_probability):
+    reducido = _Solucionador(size, pit_probability)
+    completo = _SinSimetria(size, pit_probability)
+    assert reducido.resolver() == pytest.approx(completo.resolver(), abs=1e-12)
+    assert len(reducido.memoria) < len(completo.memoria)
+
+
+def test_la_tabla_juega_al_optimo(tmp_path):
+    ruta = tmp_path / "politica3.json.gz"
+    resolver(3).guardar(ruta)
+    tabla = TablaPolitica.cargar(ruta)
+    victorias = 0
+    for semilla in range(1000):
+        random.seed(semilla)
+        world = WumpusWorld(3)
+        agent = LogicalAgent(world, KnowledgeBase(), politica=PoliticaOptima(tabla),
+                             log=lambda *args, **kwargs: None)
+        agent.run_agent(100)
+        victorias += world.agent_has_exited and world.agent_has_gold
+    assert victorias / 1000 == pytest.approx(tabla.tasa_victoria, abs=0.04)
@@ -0,0 +1,103 @@
+import random
+
+import pytest
+
+from wumpus_acciones import CLIMB_OUT
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld, observacion
+
+MOTORES = [{}, {'motor_reglas': True}, {'inferencia_local': True}, {'compactar_kb': True}]
+
+
+class RelojFalso:
+    """
+    Reloj inyectable que avanza 'tick' segundos en cada lectura ('tick' puede
+    ser una función que los devuelva): las latencias no dependen de la máquina.
+    """
+    def __init__(self, tick):
+        self.ahora = 0.0
+        self.tick = tick
+
+    def __call__(self):
+        self.ahora += self.tick() if callable(self.tick) else self.tick
+        return self.ahora
+
+
+def _agente(world, reloj, **opciones):
+    random.seed(0)
+    return LogicalAgent(world, KnowledgeBase(), reloj=reloj, log=lambda *args, **kwargs: None, **opciones)
+
+
+def _jugar(world, agent, max_steps, presupuesto_episodio=None):
+    """ Juega el episodio y devuelve las acciones y todos los hechos que llegó a tener la KB. """
+    episodio = agent.episodio(max_steps, presupuesto_episodio)
+    next(episodio)
+    acciones = []
+    hechos = set()
+    try:
+        action = episodio.send(observacion(world, 0, max_steps))
+        while True:
+            acciones.append(action)
+            hechos.update(agent.kb.facts)
+            result = world.execute_action(action)
+            action = episodio.send((result, observacion(world, len(acciones), max_steps)))
+    except StopIteration:
+        hechos.update(agent.kb.facts)
+    return acciones, hechos
+
+
+@pytest.mark.parametrize("opciones", MOTORES)
+def test_presupuesto_por_paso(opciones):
+    # Los cinco primeros pasos tardan 1 s y los siguientes 3 s: con 2 s por
+    # paso, el sexto pasa al modo degradado y los demás cuentan en él
+    world = WumpusWorld.from_layout(6, (6, 6))
+    reloj = RelojFalso(1.0)
+    agent = _agente(world, reloj, presupuesto_paso=2.0, **opciones)
+    reloj.tick = lambda: 1.0 if len(agent.latencias) < 5 else 3.0
+    acciones, _ = _jugar(world, agent, 20)
+    assert len(acciones) > 8
+    assert agent.latencias == [1.0] * 5 + [3.0] * (len(acciones) - 5)
+    assert agent.modo_degradado and agent.pasos_degradados == len(acciones) - 6
+
+    # Sin superar el presupuesto nunca se degrada
+    world = WumpusWorld.from_layout(6, (6, 6))
+    agent = _agente(world, RelojFalso(1.0), presupuesto_paso=2.0, **opciones)
+    acciones, _ = _jugar(world, agent, 20)
+    assert not agent.modo_degradado and agent.pasos_degradados == 0
+    assert agent.latencias == [1.0] * len(acciones)
+
+
+@pytest.mark.parametrize("opciones", MOTORES)
+@pytest.mark.parametrize("peligro, hecho", [({'pits': [(2, 2)]}, "Pit at (2, 2)"),
+                                            ({'wumpus': [(2, 2)]}, "Wumpus at (2, 2)")])
+def test_el_modo_degradado_omite_las_reglas_4_y_6(opciones, peligro, hecho):
+    # Con brisa (o hedor) en (2, 1) y (1, 2), solo la Regla 4 (o la 6) sitúa
+    # el peligro en (2, 2), la única vecina común que puede tenerlo
+    deducidos = []
+    for presupuesto in (None, 0.5):
+        world = WumpusWorld.from_layout(4, (4, 4), **peligro)
+        agent = _agente(world, RelojFalso(1.0), presupuesto_paso=presupuesto, **opciones)
+        acciones, hechos = _jugar(world, agent, 8)
+        assert agent.modo_degradado == (presupuesto is not None)
+        assert {(2, 1), (1, 2)} <= set(agent.visited_squares)
+        deducidos.append(hecho in hechos)
+    assert deducidos == [True, False]
+
+
+def test_retirada_al_agotar_el_presupuesto_del_episodio():
+    # Cada lectura del reloj es 1 s de razonamiento: con 20 s el agente
+    # explora unos pasos y luego vuelve por lo visitado a (1, 1) y sale
+    world = WumpusWorld.from_layout(6, (6, 6))
+    libre, _ = _jugar(world, _agente(world, RelojFalso(1.0)), 40)
+    assert len(libre) > 12
+
+    world = WumpusWorld.from_layout(6, (6, 6))
+    agent = _agente(world, RelojFalso(1.0))
+    acciones, _ = _jugar(world, agent, 40, presupuesto_episodio=20.0)
+    assert agent.retirada is not None and world.agent_has_exited and not world.agent_has_gold
+    assert acciones[-1] == CLIMB_OUT and len(acciones) < len(libre)
+    assert acciones[:3] == libre[:3]  # Hasta la retirada, lo mismo que sin presupuesto
+
+    # Sin presupuesto para nada: sale en el primer paso
+    world = WumpusWorld.from_layout(6, (6, 6))
+    agent = _agente(world, RelojFalso(1.0))
+    assert _jugar(world, agent, 40, presupuesto_episodio=0.0)[0] == [CLIMB_OUT]
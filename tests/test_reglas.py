@@ -0,0 +1,87 @@
+import pytest
+
+from wumpus_core import KnowledgeBase, WumpusWorld
+from wumpus_reglas import REGLAS_AGENTE, ErrorRegla, MotorReglas, parse_reglas
+
+
+def _motor(reglas=REGLAS_AGENTE, size=4):
+    world = WumpusWorld.from_layout(size, (size, size))
+    kb = KnowledgeBase()
+    return kb, MotorReglas(kb, world, set(), reglas)
+
+
+def test_parse_reglas_reconoce_cada_forma():
+    formas = {nombre: (forma, datos) for nombre, forma, datos in parse_reglas(REGLAS_AGENTE)}
+    assert [formas[f'R{i}'][0] for i in range(1, 8)] == [
+        'propia', 'propagacion', 'unica', 'par', 'unica', 'par', 'propagacion']
+    forma, datos = formas['R1']
+    assert datos['p'] == "Visited" and datos['concl'] == ["No Pit", "No Wumpus"] and datos['vivo']
+    forma, datos = formas['R6']
+    assert (datos['p'], datos['concl'], datos['g']) == ("Stench", ["Wumpus", "Danger"], "No Wumpus")
+
+
+def test_parse_reglas_ignora_comentarios_y_rechaza_lo_desconocido():
+    assert parse_reglas("# nada\n\nR: Breeze at c => No Stench at c\n") == [
+        ('R', 'propia', {'p': "Breeze", 'concl': ["No Stench"], 'vivo': None})]
+    with pytest.raises(ErrorRegla):
+        parse_reglas("R: Breeze at c => Pit at n if any n in N(c)")
+    assert issubclass(ErrorRegla, ValueError)
+
+
+def test_memorias_alfa_siguen_a_la_kb_con_rollback():
+    kb, motor = _motor()
+    kb.tell("Breeze at (1, 2)")
+    with kb.hypothesis():
+        kb.tell("Breeze at (2, 1)")
+        kb.retract("Breeze at (1, 2)")
+        assert motor.alfa("Breeze") == {(2, 1)}
+    assert motor.alfa("Breeze") == {(1, 2)}
+    assert "Glitter" not in motor._alfa  # Solo los predicados de alguna regla
+
+
+def test_memoria_beta_cuenta_vecinos_compartidos():
+    kb, motor = _motor()
+    memoria = motor.memoria_vecinos("Breeze")
+    assert motor.memoria_vecinos("Breeze") is memoria
+    kb.tell("Breeze at (1, 2)")
+    kb.tell("Breeze at (2, 1)")
+    assert memoria.cuenta[(1, 1)] == 2 and memoria.cuenta[(2, 2)] == 2
+    assert memoria.multiples == {(1, 1), (2, 2)}
+    kb.retract("Breeze at (2, 1)")
+    assert not memoria.multiples and memoria.cuenta[(2, 2)] == 1
+
+
+def test_regla_par_concluye_la_unica_interseccion():
+    kb, motor = _motor()
+    kb.tell("No Pit at (1, 1)")
+    kb.tell("Breeze at (1, 2)")
+    kb.tell("Breeze at (2, 1)")
+    motor.inferir((1, 1), omitir=('R3',))
+    assert kb.ask("Pit at (2, 2)") and kb.ask("Danger at (2, 2)")
+    # Justificada por las brisas: sin una de ellas se retira
+    kb.retract("Breeze at (2, 1)")
+    assert not kb.ask("Pit at (2, 2)")
+
+
+def test_reglas_propias_en_el_lenguaje():
+    kb, motor = _motor("G: Glitter at c => Gold at c\nS: Stench at c => No Pit at n for n in N(c) unless Pit at n")
+    kb.tell("Glitter at (2, 2)")
+    kb.tell("Pit at (1, 2)")
+    kb.tell("Stench at (1, 1)")
+    motor.inferir((1, 1))
+    assert kb.ask("Gold at (2, 2)")
+    assert kb.ask("No Pit at (2, 1)") and not kb.ask("No Pit at (1, 2)")
+
+
+def test_reglas_omitidas_conservan_su_agenda():
+    kb, motor = _motor()
+    kb.tell("No Breeze at (1, 1)")
+    motor.inferir((1, 1), omitir=('R7',))
+    assert not kb.ask("No Pit at (1, 2)")
+    motor.inferir((1, 1))
+    assert kb.ask("No Pit at (1, 2)") and kb.ask("No Pit at (2, 1)")
+
+
+@pytest.mark.parametrize('semilla', range(15))
+def test_el_motor_deduce_lo_mismo_que_el_bucle(en_paralelo, semilla):
+    en_paralelo(semilla, {'size': 7, 'pit_probability': 0.15, 'max_steps': 60}, {'motor_reglas': True})
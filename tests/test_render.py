@@ -0,0 +1,44 @@
+import os
+
+import pytest
+
+pygame = pytest.importorskip("pygame")
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+import wumpus_render  # noqa: E402
+
+ARRIESGADO = {'size': 4, 'umbral_riesgo': 0}
+
+
+def _pixeles(ruta):
+    return pygame.image.tostring(pygame.image.load(str(ruta)), 'RGB')
+
+
+@pytest.mark.parametrize("semilla, config, final", [
+    (15, ARRIESGADO, 'muerte'),   # Cae en un pozo
+    (1, {'size': 4}, 'oro'),       # Llega a (1, 1) con el oro
+    (2, {'size': 4}, 'salida'),    # Sale sin el oro
+    (0, {'size': 4}, 'limite'),    # Agota los pasos
+])
+def test_un_fotograma_por_paso_mas_el_inicial(tmp_path, semilla, config, final):
+    fotogramas = wumpus_render.renderizar_episodio(semilla, str(tmp_path), config, modo='png', max_steps=30)
+    gui = wumpus_render._GUIS[config['size']]
+    world = gui.world
+    assert final == ('muerte' if not world.agent_is_alive else 'salida' if world.agent_has_exited
+                     else 'oro' if world.agent_has_gold else 'limite')
+
+    # Tantos fotogramas como pasos dados más el inicial, sin repetir el último
+    assert fotogramas == gui.current_step + 1
+    archivos = sorted(tmp_path.iterdir())
+    assert [a.name for a in archivos] == [f"ep{semilla:06d}_{i:03d}.png" for i in range(fotogramas)]
+    assert _pixeles(archivos[-1]) != _pixeles(archivos[-2])
+
+
+def test_hoja_de_contactos_con_las_filas_usadas(tmp_path):
+    fotogramas = wumpus_render.renderizar_episodio(15, str(tmp_path), ARRIESGADO, modo='hoja',
+                                                   max_steps=30, escala=0.25, columnas=4)
+    gui = wumpus_render._GUIS[4]
+    hoja = pygame.image.load(str(tmp_path / "ep000015.png"))
+    miniatura = (int(gui.width * 0.25), int(gui.height * 0.25))
+    assert hoja.get_size() == (4 * miniatura[0], -(-fotogramas // 4) * miniatura[1])
@@ -0,0 +1,56 @@
+from wumpus_core import ConjuntoCeldas, KnowledgeBase, LogicalAgent, MapaSeguridad, TablaCeldas, WumpusWorld
+
+
+def test_segura_es_la_interseccion_de_las_capas():
+    kb = KnowledgeBase()
+    seguridad = MapaSeguridad(1000, kb)
+    kb.tell("No Pit at (500, 700)")
+    assert not seguridad.es_segura((500, 700))
+    kb.tell("No Wumpus at (500, 700)")
+    assert seguridad.es_segura((500, 700))
+    assert seguridad.num_seguras == 1
+    assert seguridad.celdas_seguras() == [(500, 700)]
+
+    kb.retract("No Wumpus at (500, 700)")
+    assert not seguridad.es_segura((500, 700))
+    assert seguridad.num_seguras == 0
+    assert (500, 700) not in seguridad.seguras_recientes
+
+
+def test_sigue_los_rollback_de_la_kb():
+    kb = KnowledgeBase()
+    kb.tell("No Pit at (2, 1)")
+    seguridad = MapaSeguridad(4, kb)
+    cambios = []
+    seguridad.observadores.append(lambda location, segura: cambios.append((location, segura)))
+    with kb.hypothesis():
+        kb.tell("No Wumpus at (2, 1)")
+        kb.tell("Danger at (3, 3)")
+        assert seguridad.es_segura((2, 1)) and seguridad.hay_peligro((3, 3))
+    assert not seguridad.es_segura((2, 1)) and not seguridad.hay_peligro((3, 3))
+    assert seguridad.sin_pozo((2, 1))
+    assert cambios == [((2, 1), True), ((2, 1), False)]
+
+
+def test_conjunto_de_celdas_conserva_el_orden_de_insercion():
+    tabla = TablaCeldas(1000)
+    celdas = ConjuntoCeldas(tabla, [(1, 1), (900, 2), (3, 1000)])
+    avisos = []
+    celdas.observadores.append(lambda added, location: avisos.append((added, location)))
+    celdas.discard((900, 2))
+    celdas.discard((900, 2))
+    celdas.add((1, 1))
+    celdas.add((900, 2))
+    assert list(celdas) == [(1, 1), (3, 1000), (900, 2)]
+    assert len(celdas) == 3 and (3, 1000) in celdas and (0, 5) not in celdas
+    assert avisos == [(False, (900, 2)), (True, (900, 2))]
+
+
+def test_el_registro_no_confunde_casillas_seguras_con_peligros():
+    world = WumpusWorld.from_layout(4, (4, 4))
+    mensajes = []
+    agent = LogicalAgent(world, KnowledgeBase(), log=lambda *args: mensajes.append(" ".join(map(str, args))))
+    agent.procesar_perceptos({'breeze': False, 'stench': False, 'glitter': False})
+    agent.inferir_seguridad()
+    assert agent.kb.ask("No Pit at (1, 2)") and agent.kb.ask("No Wumpus at (2, 1)")
+    assert not [m for m in mensajes if "inferido" in m or "Peligros" in m]
@@ -1,591 +1,87 @@
-import pygame
-import sys
+import contextlib
+import os
 import random
-from pygame.locals import *
-
-# -----------------------------------------------------------------------------
-# CLASE 1: EL MUNDO DE WUMPUS (EL SIMULADOR)
-#MODIFICADA PARA INCLUIR FLECHAS -
-# -----------------------------------------------------------------------------
-class WumpusWorld:
-    """
-    Simula el entorno del Mundo de Wumpus.
-    Maneja el tablero, la ubicación de los peligros y las percepciones.
-    """
-    def __init__(self, size=4):
-        self.size = size
-        self.agent_location = (1, 1)
-        self.agent_has_gold = False
-        self.agent_is_alive = True
-        self.agent_has_arrow = True  # El agente comienza con una flecha
-        self.wumpus_is_alive = True  # El Wumpus comienza vivo
-
-        # Inicializa un tablero vacío
-        self.board = { (x,y): [] for x in range(1, size+1) for y in range(1, size+1) }
-
-        # Colocar Oro
-        self.gold_location = self._get_random_empty_cell()
-        self.board[self.gold_location].append('G')
-
-        # Colocar Wumpus
-        self.wumpus_location = self._get_random_empty_cell()
-        self.board[self.wumpus_location].append('W')
-
-        # Colocar Pozos 20% de probabilidad por casilla
-        for x in range(1, size + 1):
-            for y in range(1, size + 1):
-                if (x, y) != (1, 1) and (x, y) not in [self.gold_location, self.wumpus_location]:
-                    if random.random() < 0.20:
-                        self.board[(x, y)].append('P')
-
-    def _get_random_empty_cell(self):
-        """ Obtiene una celda aleatoria que no sea (1,1). """
-        while True:
-            x, y = random.randint(1, self.size), random.randint(1, self.size)
-            if (x, y) != (1, 1) and not self.board[(x, y)]:
-                return (x, y)
-
-    def _is_valid_location(self, x, y):
-        """ Comprueba si una coordenada está dentro del tablero. """
-        return 1 <= x <= self.size and 1 <= y <= self.size
-
-    def get_neighbors(self, x, y):
-        """ Obtiene los vecinos válidos de una casilla. """
-        neighbors = []
-        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
-            nx, ny = x + dx, y + dy
-            if self._is_valid_location(nx, ny):
-                neighbors.append((nx, ny))
-        return neighbors
-
-    def get_percepts_at(self, location):
-        """ Devuelve lo que el agente percibe en una ubicación. """
-        x, y = location
-        percepts = {
-            'stench': False, # Hedor (Wumpus)
-            'breeze': False, # Brisa (Pozo)
-            'glitter': False # Brillo (Oro)
-        }
-
-        # Comprobar si hay Oro
-        if 'G' in self.board[location]:
-            percepts['glitter'] = True
-
-        # Comprobar si hay peligros adyacentes (solo si el Wumpus está vivo)
-        if self.wumpus_is_alive:
-            for nx, ny in self.get_neighbors(x, y):
-                if 'W' in self.board[(nx, ny)]:
-                    percepts['stench'] = True
-        for nx, ny in self.get_neighbors(x, y):
-            if 'P' in self.board[(nx, ny)]:
-                percepts['breeze'] = True
-
-        return percepts
-
-    def execute_action(self, action, direction=None):
-        """ Ejecuta la acción del agente y devuelve el estado. """
-        if not self.agent_is_alive:
-            return "El agente está muerto."
-
-        x, y = self.agent_location
-
-        if action == 'move_up':
-            self.agent_location = (x, y + 1) if self._is_valid_location(x, y + 1) else (x, y)
-        elif action == 'move_down':
-            self.agent_location = (x, y - 1) if self._is_valid_location(x, y - 1) else (x, y)
-        elif action == 'move_left':
-            self.agent_location = (x - 1, y) if self._is_valid_location(x - 1, y) else (x, y)
-        elif action == 'move_right':
-            self.agent_location = (x + 1, y) if self._is_valid_location(x + 1, y) else (x, y)
-        elif action == 'grab_gold':
-            if 'G' in self.board[self.agent_location]:
-                self.agent_has_gold = True
-                self.board[self.agent_location].remove('G')
-                return "¡El agente encontró el oro!"
-            else:
-                return "No hay oro aquí."
-        elif action == 'climb_out':
-            if self.agent_location == (1, 1):
-                if self.agent_has_gold:
-                    return "¡VICTORIA! El agente escapó con el oro."
-                else:
-                    return "El agente escapó sin el oro."
-            else:
-                return "Solo se puede salir desde (1, 1)."
-        elif action == 'shoot_arrow':
-            if not self.agent_has_arrow:
-                return "No tienes flechas."
-            
-            self.agent_has_arrow = False
-            # Determinar la dirección del disparo
-            if direction == 'up':
-                target_cells = [(x, y + i) for i in range(1, self.size + 1) if self._is_valid_location(x, y + i)]
-            elif direction == 'down':
-                target_cells = [(x, y - i) for i in range(1, self.size + 1) if self._is_valid_location(x, y - i)]
-            elif direction == 'left':
-                target_cells = [(x - i, y) for i in range(1, self.size + 1) if self._is_valid_location(x - i, y)]
-            elif direction == 'right':
-                target_cells = [(x + i, y) for i in range(1, self.size + 1) if self._is_valid_location(x + i, y)]
-            else:
-                return "Dirección de disparo no válida."
-            
-            # Verificar si el Wumpus está en alguna de las celdas objetivo
-            for cell in target_cells:
-                if cell == self.wumpus_location and self.wumpus_is_alive:
-                    self.wumpus_is_alive = False
-                    self.board[cell].remove('W')
-                    return "¡Escuchas un grito! Has matado al Wumpus."
-            
-            return "La flecha no golpeó nada."
-
-        # Comprobar si el agente muere después de moverse
-        if 'W' in self.board[self.agent_location] and self.wumpus_is_alive:
-            self.agent_is_alive = False
-            return "¡MUERTE! El agente fue comido por el Wumpus."
-        if 'P' in self.board[self.agent_location]:
-            self.agent_is_alive = False
-            return "¡MUERTE! El agente cayó en un pozo."
-
-        return f"Agente se movió a {self.agent_location}"
-
-# -----------------------------------------------------------------------------
-# CLASE 2: LA BASE DE CONOCIMIENTO (KB)
-# - NO MODIFICAR ESTA CLASE -
-# -----------------------------------------------------------------------------
-class KnowledgeBase:
-    """
-    Una Base de Conocimiento (KB) simple basada en hechos.
-    Almacena 'hechos' (oraciones) como cadenas de texto.
-    """
-    def __init__(self):
-        self.facts = set()
-
-    def tell(self, fact):
-        """ Añade un nuevo hecho a la KB. (Diapositiva 6: Representación) """
-        self.facts.add(fact)
-
-    def ask(self, fact):
-        """ Comprueba si un hecho ya existe en la KB. (Diapositiva 6: Razonamiento) """
-        return fact in self.facts
-
-    def get_facts_starting_with(self, prefix):
-        """ Devuelve una lista de hechos que comienzan con un prefijo. """
-        return [f for f in self.facts if f.startswith(prefix)]
-
-    def print_facts(self):
-        """ Imprime todos los hechos conocidos. """
-        print("--- Hechos Conocidos (KB) ---")
-        for f in sorted(list(self.facts)):
-            print(f)
-        print("-------------------------------")
-
-# -----------------------------------------------------------------------------
-# CLASE 3: EL AGENTE LÓGICO
-# - MODIFICADA PARA INCLUIR RETROCESO Y DISPARO MEJORADO -
-# -----------------------------------------------------------------------------
-class LogicalAgent:
-    """
-    El agente que razona sobre el Mundo de Wumpus.
-    """
-    def __init__(self, world, kb):
-        self.world = world
-        self.kb = kb
-        self.location = (1, 1) # El agente siempre empieza en (1, 1)
-        self.visited_squares = set() # Un conjunto de tuplas (x, y)
-        self.path_stack = []  # Pila para realizar backtracking
-        self.wumpus_killed = False  # Para saber si el Wumpus fue eliminado
-
-        # El agente sabe que la casilla (1, 1) es segura al empezar
-        self.kb.tell("Safe at (1, 1)")
-        self.visited_squares.add((1, 1))
-        self.path_stack.append((1, 1))  # Comienza en (1, 1)
-
-    def procesar_perceptos(self, percepts):
-        """
-        Procesa los perceptos de la casilla actual y actualiza la KB.
-        Este es el paso 'TELL'.
-        """
-        x, y = self.location
-
-        # Solo registrar brisa/hedor si no los hemos registrado antes
-        current_breeze = f"Breeze at ({x}, {y})"
-        current_no_breeze = f"No Breeze at ({x}, {y})"
-        current_stench = f"Stench at ({x}, {y})"
-        current_no_stench = f"No Stench at ({x}, {y})"
-
-        if percepts['breeze']:
-            if not self.kb.ask(current_breeze):
-                self.kb.tell(current_breeze)
-                print(f"DEBUG: Registrada brisa en ({x}, {y})")
-        else:
-            if not self.kb.ask(current_no_breeze):
-                self.kb.tell(current_no_breeze)
-                print(f"DEBUG: Registrada NO brisa en ({x}, {y})")
-
-        if percepts['stench']:
-            if not self.kb.ask(current_stench):
-                self.kb.tell(current_stench)
-                print(f"DEBUG: Registrado hedor en ({x}, {y})")
-        else:
-            if not self.kb.ask(current_no_stench):
-                self.kb.tell(current_no_stench)
-                print(f"DEBUG: Registrado NO hedor en ({x}, {y})")
-
-        # Siempre registrar brillo si está presente
-        if percepts['glitter']:
-            self.kb.tell(f"Glitter at ({x}, {y})")
-
-    def inferir_seguridad(self):
-        """
-        Aplica reglas lógicas simples para deducir qué casillas son seguras.
-        Este es el paso de 'INFERENCIA'.
-        """
-
-        # Regla 1: Las casillas visitadas son seguras 
-        for location in self.visited_squares:
-            if self.world.agent_is_alive:
-                self.kb.tell(f"Safe at {location}")
-
-        # Regla 2: Si no hay hedor, los vecinos son seguros del Wumpus
-        no_stench_facts = self.kb.get_facts_starting_with("No Stench at")
-        for fact in no_stench_facts:
-            x, y = eval(fact.split(' at ')[1])
-            for nx, ny in self.world.get_neighbors(x, y):
-                if not self.kb.ask(f"Danger at ({nx}, {ny})"):
-                    self.kb.tell(f"Safe at ({nx}, {ny})")
-                    
-        # -------------------------------------------------------------------------
-        # REGLAS  PARA INFERIR PELIGRO
-        # -------------------------------------------------------------------------
-            
-        # Regla 3: Si hay brisa, algun vecino tiene pozo
-        breeze_facts = self.kb.get_facts_starting_with("Breeze at")
-        
-        # Primero, identificar todas las casillas con brisa
-        breeze_locations = [eval(fact.split(' at ')[1]) for fact in breeze_facts]
-        
-        for breeze_loc in breeze_locations:
-            x, y = breeze_loc
-            neighbors = self.world.get_neighbors(x, y)
-            
-            # Filtrar vecinos que ya sabemos que son seguros
-            unsafe_neighbors = [n for n in neighbors if not self.kb.ask(f"Safe at {n}")]
-            
-            # Si solo hay un vecino no seguro, debe ser un pozo
-            if len(unsafe_neighbors) == 1:
-                dangerous = unsafe_neighbors[0]
-                self.kb.tell(f"Danger at {dangerous}")
-                self.kb.tell(f"Pit at {dangerous}")
-                print(f"DEBUG: Pozo inferido en {dangerous} por brisa en {breeze_loc}")
-
-        # Regla 4: Inferencia mejorada para múltiples brisas
-        if len(breeze_locations) >= 2:
-            # Buscar intersecciones de vecinos entre casillas con brisa
-            possible_pit_locations = set()
-            
-            for i, loc1 in enumerate(breeze_locations):
-                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
-                for j, loc2 in enumerate(breeze_locations):
-                    if i != j:
-                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
-                        intersection = neighbors1.intersection(neighbors2)
-                        # Solo considerar intersecciones que no son seguras
-                        intersection = [loc for loc in intersection if not self.kb.ask(f"Safe at {loc}")]
-                        possible_pit_locations.update(intersection)
-            
-            # Si hay una única ubicación posible para el pozo, inferirla
-            if len(possible_pit_locations) == 1:
-                pit_loc = list(possible_pit_locations)[0]
-                self.kb.tell(f"Danger at {pit_loc}")
-                self.kb.tell(f"Pit at {pit_loc}")
-                print(f"DEBUG: Pozo inferido en {pit_loc} por múltiples brisas")
-
-        # Regla 5: Si hay hedor, algun vecino tiene Wumpus  
-        stench_facts = self.kb.get_facts_starting_with("Stench at")
-        for fact in stench_facts:
-            x, y = eval(fact.split(' at ')[1])
-            neighbors = self.world.get_neighbors(x, y)
-                
-            # Si todos los vecinos excepto uno son seguros, el restante tiene Wumpus
-            safe_neighbors = [n for n in neighbors if self.kb.ask(f"Safe at {n}")]
-            if len(safe_neighbors) == len(neighbors) - 1:
-                wumpus_location = [n for n in neighbors if n not in safe_neighbors][0]
-                self.kb.tell(f"Wumpus at {wumpus_location}")
-                self.kb.tell(f"Danger at {wumpus_location}")
-        
-        # Regla 6: Inferencia mejorada para múltiples hedores
-        if len(stench_facts) >= 2:
-            stench_locations = [eval(fact.split(' at ')[1]) for fact in stench_facts]
-            possible_wumpus_locations = set()
-            
-            # Encontrar intersección de vecinos de todas las casillas con hedor
-            for i, loc1 in enumerate(stench_locations):
-                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
-                for j, loc2 in enumerate(stench_locations):
-                    if i != j:
-                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
-                        intersection = neighbors1.intersection(neighbors2)
-                        possible_wumpus_locations.update(intersection)
-            
-            # Si solo hay una ubicación posible, es el Wumpus
-            possible_wumpus_locations = [loc for loc in possible_wumpus_locations 
-                                    if not self.kb.ask(f"Safe at {loc}")]
-            
-            if len(possible_wumpus_locations) == 1:
-                wumpus_loc = possible_wumpus_locations[0]
-                self.kb.tell(f"Wumpus at {wumpus_loc}")
-                self.kb.tell(f"Danger at {wumpus_loc}")
-                print(f"DEBUG: Wumpus inferido en {wumpus_loc} por múltiples hedores")
-
-        # Regla 7: Si no hay brisa, todos los vecinos son seguros de pozos
-        no_breeze_facts = self.kb.get_facts_starting_with("No Breeze at")
-        for fact in no_breeze_facts:
-            x, y = eval(fact.split(' at ')[1])
-            for nx, ny in self.world.get_neighbors(x, y):
-                if not self.kb.ask(f"Danger at ({nx}, {ny})"):
-                    self.kb.tell(f"Safe at ({nx}, {ny})")
-                        
-        # Ver qué peligros se detectaron
-        danger_facts = [f for f in self.kb.facts if 'Danger' in f]
-        wumpus_facts = [f for f in self.kb.facts if 'Wumpus at' in f]
-        pit_facts = [f for f in self.kb.facts if 'Pit at' in f]
-        
-        if danger_facts:
-            print(f"DEBUG: Peligros inferidos: {danger_facts}")
-        if wumpus_facts:
-            print(f"DEBUG: Wumpus inferido en: {wumpus_facts}")
-        if pit_facts:
-            print(f"DEBUG: Pozos inferidos en: {pit_facts}")
-
-    def elegir_accion(self):
-        """
-        Decide qué acción tomar basándose en la KB.
-        Este es el paso 'ASK' y 'ACTÚA'.
-        """
-
-        # 1. Si hay "Brillo" (Glitter), toma el oro.
-        if self.kb.ask(f"Glitter at {self.location}"):
-            return 'grab_gold'
-
-        # 2. Si tiene el oro y está en (1, 1), sal.
-        if self.world.agent_has_gold and self.location == (1, 1):
-            return 'climb_out'
-
-        vecinos = self.world.get_neighbors(self.location[0], self.location[1])
-
-        acciones_posibles = []
-        if self._is_valid_and_get_action('up'): acciones_posibles.append('move_up')
-        if self._is_valid_and_get_action('down'): acciones_posibles.append('move_down')
-        if self._is_valid_and_get_action('left'): acciones_posibles.append('move_left')
-        if self._is_valid_and_get_action('right'): acciones_posibles.append('move_right')
-        
-        # Lógica más para disparar flechas
-        if self.world.agent_has_arrow:
-            # Opción 1: Si se sabe exactamente dónde está el Wumpus, disparar
-            wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
-            if wumpus_facts:
-                wumpus_location = eval(wumpus_facts[0].split(' at ')[1])
-                # Determinar dirección para disparar
-                if wumpus_location[0] == self.location[0]:  # Misma columna
-                    if wumpus_location[1] > self.location[1]:
-                        return ('shoot_arrow', 'up')
-                    else:
-                        return ('shoot_arrow', 'down')
-                elif wumpus_location[1] == self.location[1]:  # Misma fila
-                    if wumpus_location[0] > self.location[0]:
-                        return ('shoot_arrow', 'right')
-                    else:
-                        return ('shoot_arrow', 'left')
-            
-            # Opción 2: Si el hedor persiste, considerar disparar
-            stench_facts = self.kb.get_facts_starting_with("Stench at")
-            if len(stench_facts) >= 2:  # Solo disparar si hay múltiples hedores
-                print("DEBUG: Hedor persistente detectado, considerando disparar...")
-                
-                # Obtener vecinos no visitados y peligrosos
-                vecinos_no_visitados = [v for v in vecinos if v not in self.visited_squares]
-                vecinos_peligrosos = [v for v in vecinos_no_visitados if self.kb.ask(f"Danger at {v}")]
-                
-                if vecinos_peligrosos:
-                    target = vecinos_peligrosos[0]
-                    print(f"DEBUG: Disparando hacia vecino peligroso: {target}")
-                    
-                    # Determinar dirección del disparo
-                    x, y = self.location
-                    tx, ty = target
-                    
-                    if tx == x and ty == y + 1:
-                        return ('shoot_arrow', 'up')
-                    elif tx == x and ty == y - 1:
-                        return ('shoot_arrow', 'down')
-                    elif tx == x - 1 and ty == y:
-                        return ('shoot_arrow', 'left')
-                    elif tx == x + 1 and ty == y:
-                        return ('shoot_arrow', 'right')
-
-        random.shuffle(acciones_posibles) # Para evitar bucles entre dos casillas
-
-        # Clasificar acciones por seguridad
-        acciones_seguras_no_visitadas = []
-        acciones_seguras_visitadas = []
-        acciones_riesgosas = []
-
-        for action in acciones_posibles:
-            vecino = self._get_target_location(action)
-            
-            # EVITAR casillas peligrosas confirmadas
-            if self.kb.ask(f"Danger at {vecino}"):
-                continue
-
-            # Clasificar por nivel de seguridad
-            if self.kb.ask(f"Safe at {vecino}"):
-                if vecino not in self.visited_squares:
-                    acciones_seguras_no_visitadas.append(action)
-                else:
-                    acciones_seguras_visitadas.append(action)
-            else:
-                # NUEVO: Solo considerar riesgosas si no hay brisa actual
-                percepts_actuales = self.world.get_percepts_at(self.location)
-                if not percepts_actuales['breeze']:
-                    acciones_riesgosas.append(action)
-
-        # Decidir basado en la prioridad
-        if acciones_seguras_no_visitadas:
-            self.path_stack.append(self.location)
-            return random.choice(acciones_seguras_no_visitadas)
-        elif acciones_seguras_visitadas:
-            self.path_stack.append(self.location)
-            return random.choice(acciones_seguras_visitadas)
-        elif acciones_riesgosas and len(self.visited_squares) > 3:
-            # Solo considerar movimientos riesgosos si hemos explorado suficiente
-            # y no hay brisa en la ubicación actual
-            percepts_actuales = self.world.get_percepts_at(self.location)
-            if not percepts_actuales['breeze']:
-                print(f"DEBUG: Considerando movimiento riesgoso (sin brisa actual)")
-                self.path_stack.append(self.location)
-                return random.choice(acciones_riesgosas)
-        else:
-            # Realizar backtracking si no hay movimientos seguros
-            if len(self.path_stack) > 1:
-                previous_location = self.path_stack.pop()
-                return self._get_backtrack_action(previous_location)
-            else:
-                # No hay ningún lugar seguro conocido a donde ir.
-                return 'climb_out'
-
-    def _get_backtrack_action(self, target_location):
-        """Determina la acción para retroceder a una ubicación anterior"""
-        x, y = self.location
-        tx, ty = target_location
-        
-        if tx == x and ty == y + 1:
-            return 'move_up'
-        elif tx == x and ty == y - 1:
-            return 'move_down'
-        elif tx == x - 1 and ty == y:
-            return 'move_left'
-        elif tx == x + 1 and ty == y:
-            return 'move_right'
-        else:
-            # Si no es un movimiento directo, elegir una dirección aleatoria
-            acciones = []
-            if self._is_valid_and_get_action('up'): acciones.append('move_up')
-            if self._is_valid_and_get_action('down'): acciones.append('move_down')
-            if self._is_valid_and_get_action('left'): acciones.append('move_left')
-            if self._is_valid_and_get_action('right'): acciones.append('move_right')
-            return random.choice(acciones) if acciones else 'climb_out'
-
-    # --- Métodos Ayudantes (No modificar) ---
-
-    def _is_valid_and_get_action(self, direction):
-        x, y = self.location
-        if direction == 'up': return self.world._is_valid_location(x, y + 1)
-        if direction == 'down': return self.world._is_valid_location(x, y - 1)
-        if direction == 'left': return self.world._is_valid_location(x - 1, y)
-        if direction == 'right': return self.world._is_valid_location(x + 1, y)
-        return False
-
-    def _get_target_location(self, action):
-        x, y = self.location
-        if action == 'move_up': return (x, y + 1)
-        if action == 'move_down': return (x, y - 1)
-        if action == 'move_left': return (x - 1, y)
-        if action == 'move_right': return (x + 1, y)
-        return self.location
-
-    def run_agent(self, max_steps=50):
-        """ El ciclo principal del agente: PERCIBE -> PIENSA -> ACTÚA """
-        print(f"Agente iniciando en {self.location}")
-
-        for step in range(max_steps):
-            if not self.world.agent_is_alive:
-                print("El agente ha muerto. Fin de la simulación.")
-                break
-
-            print(f"\n--- Paso {step + 1} ---")
-
-            # 1. PERCIBE
-            self.location = self.world.agent_location
-            self.visited_squares.add(self.location)
-            percepts = self.world.get_percepts_at(self.location)
-            print(f"Agente está en {self.location}")
-            print(f"Agente percibe: {percepts}")
-
-            # 2. PIENSA (TELL e INFERENCIA)
-            # Primero, añade los perceptos actuales a la KB
-            self.procesar_perceptos(percepts)
-
-            # Si hay brillo, la KB se actualiza para la acción 'grab_gold'
-            if percepts['glitter']:
-                self.kb.tell(f"Glitter at {self.location}")
-
-            # Segundo, deduce nuevos hechos (seguridad)
-            self.inferir_seguridad()
-
-            # 3. DECIDE (ASK)
-            action_result = self.elegir_accion()
-            if isinstance(action_result, tuple):
-                action, direction = action_result
-                print(f"Agente decide: {action} hacia {direction}")
-            else:
-                action = action_result
-                print(f"Agente decide: {action}")
-
-            # 4. ACTÚA
-            if isinstance(action_result, tuple):
-                result = self.world.execute_action(action, direction)
-            else:
-                result = self.world.execute_action(action)
-            print(f"Resultado: {result}")
-
-            # Actualizar estado si el Wumpus fue eliminado
-            if "grito" in result.lower() or "matado" in result.lower():
-                self.wumpus_killed = True
-                # Limpiar hechos relacionados con el Wumpus
-                wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
-                for fact in wumpus_facts:
-                    self.kb.facts.remove(fact)
-                # Actualizar percepciones de hedor
-                stench_facts = self.kb.get_facts_starting_with("Stench at")
-                for fact in stench_facts:
-                    self.kb.facts.remove(fact)
-                    self.kb.tell(fact.replace("Stench", "No Stench"))
-
-            if "¡VICTORIA!" in result or "escapó" in result or "¡MUERTE!" in result:
-                break
-        else:
-            print("Se alcanzó el límite de pasos.")
-
-        print("\n--- Simulación Terminada ---")
-        self.kb.print_facts()
+import sys
+from array import array
+from collections import deque
+from wumpus_acciones import SHOOT_ACTIONS, describe_action
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld, observacion
+
+# pygame se importa al crear la interfaz (ver _importar_pygame), no al cargar
+# el módulo, para que el modo consola no pague su arranque.
+pygame = None
+
+
+def _importar_pygame():
+    """ Importa pygame la primera vez que se construye un WumpusGUI. """
+    global pygame
+    if pygame is None:
+        import pygame as modulo
+        pygame = modulo
+    return pygame
+
+# Presupuesto por paso en la interfaz gráfica, en segundos
+PRESUPUESTO_PASO_INTERACTIVO = 0.05
+
+# Velocidades del modo automático, en pasos por segundo
+VELOCIDAD_INICIAL = 1.0
+VELOCIDAD_MINIMA = 0.25
+VELOCIDAD_MAXIMA = 4096.0
+
+# En modo turbo se juegan pasos durante este tiempo y luego se dibuja un fotograma
+TURBO_MS_POR_FOTOGRAMA = 40
+
+# Memoria (aproximada) para retroceder: al pasar de aquí se olvidan los pasos
+# más antiguos. Cada paso guardado ocupa lo suyo (sobre todo el estado de
+# 'random') más cada cambio de la KB hecho en él.
+HISTORIAL_BYTES = 64 * 2 ** 20
+BYTES_POR_PASO = 6000
+BYTES_POR_CAMBIO = 150
+
+# Semillas de las partidas nuevas: generador propio, porque cada partida
+# reinicia el global con random.seed(semilla)
+_semillas = random.Random()
+
+
+def partida_por_defecto(semilla):
+    """ Mundo 4x4 y agente por defecto; la misma semilla da la misma partida. """
+    random.seed(semilla)
+    world = WumpusWorld(size=4)
+    kb = KnowledgeBase()
+    return world, LogicalAgent(world, kb, presupuesto_paso=PRESUPUESTO_PASO_INTERACTIVO)
 
 # -----------------------------------------------------------------------------
 # INTERFAZ GRÁFICA CON PYGAME
 # -----------------------------------------------------------------------------
 class WumpusGUI:
-    def __init__(self, world, agent):
+    """
+    Interfaz de pygame. Con headless=True no abre ventana: dibuja en una
+    superficie en memoria (driver SDL 'dummy'), para renderizar episodios a
+    imágenes sin pantalla (ver wumpus_render.py).
+
+    'fabrica(semilla)' devuelve un (mundo, agente) nuevo y reproducible; se usa
+    al reiniciar.
+
+    Para retroceder, cada paso abre un punto de restauración en la KB y
+    guarda lo poco que cambia fuera de ella: el estado del agente en el mundo
+    (y el Wumpus abatido), la instantanea() del agente y el estado de
+    'random'. Retroceder deshace los cambios de la KB del último paso y
+    restaura el resto, sin volver a razonar: no depende de cuánto tardaron
+    los pasos (modo degradado por presupuesto_paso, MCTS por tiempo) y cuesta
+    según lo que cambió en ese paso, no según el tamaño de la partida.
+    'historial' limita esa memoria en bytes (por defecto HISTORIAL_BYTES; 0
+    en headless, sin retroceso).
+    """
+    def __init__(self, world, agent, headless=False, fabrica=partida_por_defecto, semilla=None,
+                 historial=None):
         self.world = world
         self.agent = agent
+        self.fabrica = fabrica
+        self.semilla = semilla
+        if historial is None:
+            historial = 0 if headless else HISTORIAL_BYTES
+        self.max_historial = historial
+        self.historial = deque()  # Un paso por entrada, el último al final
         self.cell_size = 80
         self.margin = 5
         self.width = world.size * (self.cell_size + self.margin) + self.margin + 300
@@ -604,16 +100,23 @@ class WumpusGUI:
         self.ORANGE = (255, 165, 0)
         
         # Inicializar Pygame
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+        _importar_pygame()
         pygame.init()
-        self.screen = pygame.display.set_mode((self.width, self.height))
-        pygame.display.set_caption("Mundo de Wumpus - Agente Lógico")
+        if headless:
+            self.screen = pygame.Surface((self.width, self.height))
+        else:
+            self.screen = pygame.display.set_mode((self.width, self.height))
+            pygame.display.set_caption("Mundo de Wumpus - Agente Lógico")
         self.font = pygame.font.SysFont('Arial', 16)
         self.title_font = pygame.font.SysFont('Arial', 24, bold=True)
         
-        self.step_delay = 1000  # Milisegundos entre pasos
-        self.last_step_time = 0
+        self.pasos_por_segundo = VELOCIDAD_INICIAL
+        self.pasos_pendientes = 0.0  # Fracción de paso acumulada en modo automático
         self.running = True
         self.auto_mode = False
+        self.turbo = False
         self.current_step = 0
         self.game_state = "Ejecutando"
         self.message = "Presiona ESPACIO para avanzar o A para modo automático"
@@ -746,11 +249,13 @@ class WumpusGUI:
         kb_title = self.font.render("Base de Conocimiento:", True, self.WHITE)
         self.screen.blit(kb_title, (panel_x, kb_y))
         
-        safe_cells = [f for f in self.agent.kb.facts if f.startswith("Safe at")]
-        danger_cells = [f for f in self.agent.kb.facts if f.startswith("Danger at")]
+        # Contadores y últimos hechos que mantienen la KB y el mapa de seguridad
+        # al cambiar, para no recorrer la KB en cada fotograma
+        safe_cells = [f"Safe at {c}" for c in self.agent.seguridad.seguras_recientes]
+        danger_cells = self.agent.kb.recent("Danger")
         kb_items = [
-            f"Hechos seguros: {len(safe_cells)}",
-            f"Hechos peligrosos: {len(danger_cells)}"
+            f"Hechos seguros: {self.agent.seguridad.num_seguras}",
+            f"Hechos peligrosos: {self.agent.kb.count('Danger')}"
         ]
         
         for i, item in enumerate(kb_items):
@@ -759,11 +264,11 @@ class WumpusGUI:
         
         # Mostrar algunos hechos de seguridad y peligro
         fact_y = kb_y + 80
-        for i, fact in enumerate(list(safe_cells)[:3]):
+        for i, fact in enumerate(safe_cells[-3:]):
             text = self.font.render(fact, True, self.GREEN)
             self.screen.blit(text, (panel_x + 10, fact_y + i * 20))
         
-        for i, fact in enumerate(list(danger_cells)[:3]):
+        for i, fact in enumerate(danger_cells[-3:]):
             text = self.font.render(fact, True, self.RED)
             self.screen.blit(text, (panel_x + 150, fact_y + i * 20))
         
@@ -774,7 +279,11 @@ class WumpusGUI:
         
         controls = [
             "ESPACIO: Siguiente paso",
-            "A: Modo automático",
+            "IZQUIERDA: Paso anterior",
+            f"A: Modo automático ({self.pasos_por_segundo:g} pasos/s)",
+            "ARRIBA/ABAJO: Más/menos velocidad",
+            "T: Turbo hasta el final",
+            "P: Pausa",
             "R: Reiniciar",
             "Q: Salir"
         ]
@@ -784,7 +293,7 @@ class WumpusGUI:
             self.screen.blit(text, (panel_x + 10, controls_y + 30 + i * 25))
         
         # Mensaje
-        msg_y = controls_y + 150
+        msg_y = controls_y + 30 + len(controls) * 25
         msg_text = self.font.render(self.message, True, self.YELLOW)
         self.screen.blit(msg_text, (panel_x, msg_y))
 
@@ -797,7 +306,12 @@ class WumpusGUI:
             else:
                 self.message = "¡VICTORIA! El agente escapó con el oro. Presiona R para reiniciar"
             return
+        if self.world.agent_has_exited:
+            self.game_state = "Terminado"
+            self.message = "El agente salió sin el oro. Presiona R para reiniciar"
+            return
         
+        paso = self._abrir_paso() if self.max_historial else None
         self.current_step += 1
         
         # Ejecutar un paso del agente
@@ -807,90 +321,185 @@ class WumpusGUI:
         
         # Procesar perceptos y razonar
         self.agent.procesar_perceptos(percepts)
-        if percepts['glitter']:
-            self.agent.kb.tell(f"Glitter at {self.agent.location}")
-        self.agent.inferir_seguridad()
-        
-        # Elegir y ejecutar acción
-        action_result = self.agent.elegir_accion()
-        if isinstance(action_result, tuple):
-            action, direction = action_result
-            result = self.world.execute_action(action, direction)
-            self.message = f"Paso {self.current_step}: {action} {direction} -> {result}"
-        else:
-            action = action_result
-            result = self.world.execute_action(action)
-            self.message = f"Paso {self.current_step}: {action} -> {result}"
-        
-        # Actualizar si el Wumpus fue eliminado
-        if "grito" in result.lower() or "matado" in result.lower():
-            self.agent.wumpus_killed = True
-            # Limpiar hechos relacionados con el Wumpus
-            wumpus_facts = self.agent.kb.get_facts_starting_with("Wumpus at")
-            for fact in wumpus_facts:
-                self.agent.kb.facts.remove(fact)
-            # Actualizar percepciones de hedor
-            stench_facts = self.agent.kb.get_facts_starting_with("Stench at")
-            for fact in stench_facts:
-                self.agent.kb.facts.remove(fact)
-                self.agent.kb.tell(fact.replace("Stench", "No Stench"))
+
+        # Razonar y elegir acción dentro del presupuesto por paso, y ejecutarla
+        action = self.agent.decidir()
+        if paso is not None and action in SHOOT_ACTIONS:
+            paso[-1] = self.world.shot_target(action)
+        result = self.world.execute_action(action)
+        self.message = f"Paso {self.current_step}: {describe_action(action)} -> {result}"
+        # El grito y el oro recogido los procesa el agente al observar
+        self.agent.observar(observacion(self.world))
+
+    def cargar(self, world, agent, message="", semilla=None):
+        """ Empieza una partida nueva con otro mundo y agente del mismo tamaño, reutilizando la superficie. """
+        if getattr(self, 'agent', None) is not None and self.agent.planificador is not None:
+            self.agent.planificador.cerrar()
+        self.world = world
+        self.agent = agent
+        self.semilla = semilla
+        self.historial.clear()  # Los puntos de restauración eran de la KB anterior
+        self.current_step = 0
+        self.game_state = "Ejecutando"
+        self.message = message
 
     def reset_game(self):
         """Reinicia el juego"""
-        self.world = WumpusWorld(size=4)
-        kb = KnowledgeBase()
-        self.agent = LogicalAgent(self.world, kb)
-        self.current_step = 0
+        semilla = _semillas.randrange(2 ** 32)
+        world, agent = self.fabrica(semilla)
+        self.cargar(world, agent, "Juego reiniciado. Presiona ESPACIO para avanzar o A para modo automático",
+                    semilla)
+        self.auto_mode = self.turbo = False
+
+    def _abrir_paso(self):
+        """
+        Guarda lo necesario para deshacer el paso que empieza (ver step_back)
+        y devuelve su entrada; el último elemento es el Wumpus que mate el
+        disparo del paso, si lo hay.
+        """
+        kb = self.agent.kb
+        version, interno, gauss = random.getstate()
+        estado_random = (version, array('L', interno), gauss)  # Compacto: enteros de 32 bits
+        self.historial.append([self.world.state(), self.agent.instantanea(), estado_random,
+                               self.current_step, None])
+        kb.snapshot()
+        # Olvidar los pasos más antiguos si no caben (siempre queda el actual)
+        while (len(self.historial) > 1 and len(self.historial) * BYTES_POR_PASO
+               + kb.undo_size() * BYTES_POR_CAMBIO > self.max_historial):
+            self.historial.popleft()
+            kb.drop_oldest_snapshot()
+        return self.historial[-1]
+
+    def step_back(self):
+        """ Vuelve al estado de antes del último paso. """
+        self.auto_mode = self.turbo = False
+        if not self.historial:
+            self.message = "No se puede retroceder más"
+            return
+        estado_mundo, instantanea, estado_random, self.current_step, abatido = self.historial.pop()
+        kb = self.agent.kb
+        kb.rollback(kb.open_snapshots())
+        self.agent.restaurar(instantanea)
+        self.world.undo_action(estado_mundo, abatido)
+        version, interno, gauss = estado_random
+        random.setstate((version, tuple(interno), gauss))
         self.game_state = "Ejecutando"
-        self.message = "Juego reiniciado. Presiona ESPACIO para avanzar o A para modo automático"
+        self.message = f"Retrocedido al paso {self.current_step}"
+
+    def cambiar_velocidad(self, factor):
+        """ Multiplica la velocidad del modo automático por 'factor', dentro de los límites. """
+        self.pasos_por_segundo = min(VELOCIDAD_MAXIMA,
+                                     max(VELOCIDAD_MINIMA, self.pasos_por_segundo * factor))
+        self.message = f"Velocidad: {self.pasos_por_segundo:g} pasos/s"
+
+    def avanzar(self, ms):
+        """
+        Juega los pasos que tocan tras 'ms' milisegundos de modo automático:
+        pueden ser varios por fotograma, sin pasar de un fotograma de turbo
+        para que la ventana siga respondiendo. En modo turbo juega hasta el
+        final de la partida, TURBO_MS_POR_FOTOGRAMA en cada llamada.
+        """
+        if self.game_state != "Ejecutando":
+            self.auto_mode = self.turbo = False
+            self.pasos_pendientes = 0.0
+            return
+        limite = pygame.time.get_ticks() + TURBO_MS_POR_FOTOGRAMA
+        if self.turbo:
+            with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+                while self.game_state == "Ejecutando" and pygame.time.get_ticks() < limite:
+                    self.run_step()
+            return
+        self.pasos_pendientes += ms * self.pasos_por_segundo / 1000
+        while self.pasos_pendientes >= 1 and self.game_state == "Ejecutando":
+            self.pasos_pendientes -= 1
+            self.run_step()
+            if pygame.time.get_ticks() >= limite:
+                self.pasos_pendientes = 0.0  # No acumular retraso si la máquina no da más
+                break
 
     def run(self):
         """Bucle principal de la interfaz gráfica"""
         clock = pygame.time.Clock()
+        ms = 0
         
         while self.running:
-            current_time = pygame.time.get_ticks()
-            
             for event in pygame.event.get():
-                if event.type == QUIT:
+                if event.type == pygame.QUIT:
                     self.running = False
-                elif event.type == KEYDOWN:
-                    if event.key == K_q:
+                elif event.type == pygame.KEYDOWN:
+                    if event.key == pygame.K_q:
                         self.running = False
-                    elif event.key == K_SPACE:
+                    elif event.key == pygame.K_SPACE:
                         self.run_step()
-                    elif event.key == K_a:
+                    elif event.key in (pygame.K_LEFT, pygame.K_BACKSPACE):
+                        self.step_back()
+                    elif event.key == pygame.K_a:
                         self.auto_mode = not self.auto_mode
+                        self.turbo = False
+                        self.pasos_pendientes = 0.0
                         self.message = f"Modo automático: {'ACTIVADO' if self.auto_mode else 'DESACTIVADO'}"
-                    elif event.key == K_r:
+                    elif event.key in (pygame.K_UP, pygame.K_PLUS, pygame.K_KP_PLUS):
+                        self.cambiar_velocidad(2)
+                    elif event.key in (pygame.K_DOWN, pygame.K_MINUS, pygame.K_KP_MINUS):
+                        self.cambiar_velocidad(0.5)
+                    elif event.key == pygame.K_t:
+                        self.turbo = not self.turbo
+                        self.message = f"Turbo: {'ACTIVADO' if self.turbo else 'DESACTIVADO'}"
+                    elif event.key == pygame.K_p:
+                        self.auto_mode = self.turbo = False
+                        self.message = f"En pausa en el paso {self.current_step}"
+                    elif event.key == pygame.K_r:
                         self.reset_game()
             
-            # Ejecutar paso automáticamente si está en modo automático
-            if self.auto_mode and current_time - self.last_step_time > self.step_delay:
-                if self.game_state == "Ejecutando":
-                    self.run_step()
-                self.last_step_time = current_time
+            # Modo automático o turbo: varios pasos por fotograma si la velocidad lo pide
+            if self.auto_mode or self.turbo:
+                self.avanzar(ms)
             
-            # Dibujar interfaz
+            # Dibujar interfaz (en turbo, un fotograma cada TURBO_MS_POR_FOTOGRAMA de pasos)
             self.draw_board()
             self.draw_info_panel()
             pygame.display.flip()
-            clock.tick(60)
+            ms = clock.tick(60)
         
+        if self.agent.planificador is not None:
+            self.agent.planificador.cerrar()
         pygame.quit()
 
 # -----------------------------------------------------------------------------
 # BLOQUE PRINCIPAL DE EJECUCIÓN
 # -----------------------------------------------------------------------------
 if __name__ == "__main__":
-    # Crea el mundo
-    world = WumpusWorld(size=4)
+    # --politica ruta: decide con una tabla de política óptima (ver wumpus_politica.py)
+    tabla = None
+    if "--politica" in sys.argv:
+        from wumpus_politica import TablaPolitica
+        tabla = TablaPolitica.cargar(sys.argv[sys.argv.index("--politica") + 1])
 
-    # Crea la Base de Conocimiento
-    kb = KnowledgeBase()
+    def crear_partida(semilla):
+        random.seed(semilla)
+
+        # Crea el mundo
+        world = WumpusWorld(size=4)
+
+        # Crea la Base de Conocimiento
+        kb = KnowledgeBase()
 
-    # Crea el Agente
-    agent = LogicalAgent(world, kb)
+        # Crea el Agente (--mcts: riesgos y disparos con el planificador;
+        # --reglas: inferencia con el motor de reglas compilado)
+        planificador = None
+        if "--mcts" in sys.argv:
+            from wumpus_planificador import PlanificadorMCTS
+            planificador = PlanificadorMCTS(semilla=semilla)
+        politica = None
+        if tabla is not None:
+            from wumpus_politica import PoliticaOptima
+            politica = PoliticaOptima(tabla)
+        agent = LogicalAgent(world, kb, planificador, motor_reglas="--reglas" in sys.argv,
+                             presupuesto_paso=PRESUPUESTO_PASO_INTERACTIVO, politica=politica)
+        return world, agent
+
+    semilla = _semillas.randrange(2 ** 32)
+    world, agent = crear_partida(semilla)
 
     # Ejecutar en modo gráfico o consola
     if len(sys.argv) > 1 and sys.argv[1] == "--console":
@@ -898,5 +507,5 @@ if __name__ == "__main__":
         agent.run_agent(max_steps=50)
     else:
         # Modo gráfico
-        gui = WumpusGUI(world, agent)
+        gui = WumpusGUI(world, agent, fabrica=crear_partida, semilla=semilla)
         gui.run()
\ No newline at end of file
@@ -0,0 +1,44 @@
+# -----------------------------------------------------------------------------
+# CODIFICACIÓN NUMÉRICA DE LAS ACCIONES
+# -----------------------------------------------------------------------------
+# Las acciones se representan con enteros pequeños compartidos por el mundo,
+# el agente y los simuladores. Las tablas de abajo sustituyen a las cadenas
+# de if/elif: el desplazamiento, la dirección y el nombre de cada acción se
+# obtienen indexando por su código.
+
+MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT = 0, 1, 2, 3
+GRAB_GOLD, CLIMB_OUT = 4, 5
+SHOOT_UP, SHOOT_DOWN, SHOOT_LEFT, SHOOT_RIGHT = 6, 7, 8, 9
+NUM_ACTIONS = 10
+
+MOVE_ACTIONS = (MOVE_UP, MOVE_DOWN, MOVE_LEFT, MOVE_RIGHT)
+SHOOT_ACTIONS = (SHOOT_UP, SHOOT_DOWN, SHOOT_LEFT, SHOOT_RIGHT)
+
+# Direcciones en el mismo orden que MOVE_ACTIONS y SHOOT_ACTIONS
+DIRECTIONS = ('up', 'down', 'left', 'right')
+DELTAS = ((0, 1), (0, -1), (-1, 0), (1, 0))
+
+# Tablas indexadas por código de acción
+ACTION_NAMES = ('move_up', 'move_down', 'move_left', 'move_right', 'grab_gold', 'climb_out',
+                'shoot_arrow', 'shoot_arrow', 'shoot_arrow', 'shoot_arrow')
+ACTION_DIRECTION = (0, 1, 2, 3, None, None, 0, 1, 2, 3)  # Índice en DIRECTIONS
+ACTION_DELTA = DELTAS + ((0, 0), (0, 0)) + DELTAS
+
+# Tablas inversas
+MOVE_BY_DELTA = dict(zip(DELTAS, MOVE_ACTIONS))
+ACTION_CODES = {name: code for code, name in enumerate(ACTION_NAMES[:SHOOT_UP])}
+ACTION_CODES.update({('shoot_arrow', d): code for d, code in zip(DIRECTIONS, SHOOT_ACTIONS)})
+
+
+def encode_action(action, direction=None):
+    """ Convierte una acción en texto ('move_up', 'shoot_arrow' + dirección) a su código, o None. """
+    if action == 'shoot_arrow':
+        return ACTION_CODES.get((action, direction))
+    return ACTION_CODES.get(action)
+
+
+def describe_action(code):
+    """ Texto legible de una acción, p. ej. 'move_up' o 'shoot_arrow hacia left'. """
+    if code in SHOOT_ACTIONS:
+        return f"{ACTION_NAMES[code]} hacia {DIRECTIONS[ACTION_DIRECTION[code]]}"
+    return ACTION_NAMES[code]
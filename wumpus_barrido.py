@@ -0,0 +1,399 @@
+import argparse
+import contextlib
+import itertools
+import json
+import math
+import os
+import random
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld
+from wumpus_corpus import Corpus
+from wumpus_metricas import HistogramaLatencias, agregar_argumentos, desde_argumentos
+from wumpus_planificador import COSTE_FLECHA, COSTE_PASO, PENALIZACION_MUERTE, RECOMPENSA_ORO
+
+# -----------------------------------------------------------------------------
+# BARRIDO PARALELO DE PARÁMETROS DEL MUNDO Y DEL AGENTE
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_barrido.py barrido.json --salida resultados.jsonl --procesos 4
+#
+# Ejemplo de especificación (rejilla = producto cartesiano de las listas;
+# con "aleatorio": N se sortean N configuraciones, y un parámetro puede ser
+# una lista de valores o un rango {"min": a, "max": b}):
+#   {"parametros": {"size": [4, 6], "pit_probability": [0.1, 0.2, 0.3],
+#                   "max_steps": [50, 100], "umbral_riesgo": [1, 3, 5],
+#                   "presupuesto_paso": [0.01], "presupuesto_episodio": [1.0]},
+#    "episodios": 200, "lote": 20, "semilla": 0}
+#
+# Con "politica": ["politica4.json.gz"] el agente decide con esa tabla de
+# política óptima (ver wumpus_politica.py) en los tableros que cubre.
+#
+# Con "corpus": {"ruta": "corpus.db", "filtro": {"adivinanzas": 1}} los
+# episodios de cada configuración se juegan en los mundos del corpus (ver
+# wumpus_corpus.py) de su tamaño y probabilidad de pozo que cumplen el filtro.
+#
+# Cada configuración se reparte en lotes de episodios. Los procesos toman los
+# lotes de una cola común según van quedando libres, así que ninguno espera a
+# las configuraciones lentas de otro. Tras cada lote se comparan intervalos de
+# confianza de la puntuación media y se abandonan las configuraciones que ya
+# son claramente peores que la mejor. Cada configuración terminada se añade
+# al fichero de salida (una línea JSON), y al relanzar el barrido se saltan
+# las que ya estén en él.
+#
+# Los intervalos se miran tras cada lote, así que un intervalo normal fijo
+# acabaría podando alguna configuración buena solo por mirarlo muchas veces.
+# Por eso son secuencias de confianza (SecuenciaConfianza, las mismas de
+# wumpus_comparacion.py), válidas en cualquier momento, y el alfa se reparte
+# entre las configuraciones (Bonferroni): con probabilidad 1 - alfa todos los
+# intervalos contienen su media durante todo el barrido, y ninguna poda
+# descarta una configuración que en realidad es la mejor.
+#
+# Los trabajadores no devuelven las latencias de cada paso sino un
+# HistogramaLatencias por episodio (ver wumpus_metricas.py).
+
+PARAMETROS_MUNDO = ('size', 'pit_probability', 'num_wumpus')
+PARAMETROS_AGENTE = ('umbral_riesgo', 'motor_reglas', 'presupuesto_paso', 'inferencia_local', 'compactar_kb',
+                     'detectar_ciclos')
+
+_TABLAS = {}  # ruta -> TablaPolitica cargada en este proceso
+
+
+def crear_partida(config, semilla):
+    """ Mundo y agente de un episodio: la misma semilla da siempre la misma partida. """
+    random.seed(semilla)
+    world = WumpusWorld(**{k: config[k] for k in PARAMETROS_MUNDO if k in config})
+    kb = KnowledgeBase()
+    opciones = {k: config[k] for k in PARAMETROS_AGENTE if k in config}
+    if config.get('politica'):
+        from wumpus_politica import PoliticaOptima, TablaPolitica
+        ruta = config['politica']
+        if ruta not in _TABLAS:
+            _TABLAS[ruta] = TablaPolitica.cargar(ruta)
+        opciones['politica'] = PoliticaOptima(_TABLAS[ruta])
+    agent = LogicalAgent(world, kb, **opciones)
+    return world, agent
+
+
+def jugar_episodio(config, semilla):
+    """
+    Juega un episodio silencioso con la configuración dada y devuelve
+    (puntuacion, victoria, muerte, pasos, latencias, pasos_degradados,
+    hechos_kb, segundos), con las latencias en un HistogramaLatencias.
+    """
+    inicio = time.perf_counter()
+    world, agent = crear_partida(config, semilla)
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        pasos = agent.run_agent(config.get('max_steps', 50), config.get('presupuesto_episodio'))
+    return resultado_episodio(world, agent, pasos, time.perf_counter() - inicio)
+
+
+def resultado_episodio(world, agent, pasos, segundos):
+    """ La tupla de resultados de jugar_episodio de un episodio ya terminado. """
+    victoria = world.agent_has_exited and world.agent_has_gold
+    muerte = not world.agent_is_alive
+    puntuacion = COSTE_PASO * pasos
+    if not world.agent_has_arrow:
+        puntuacion += COSTE_FLECHA
+    if victoria:
+        puntuacion += RECOMPENSA_ORO
+    if muerte:
+        puntuacion += PENALIZACION_MUERTE
+    return (puntuacion, victoria, muerte, pasos, HistogramaLatencias(agent.latencias),
+            agent.pasos_degradados, len(agent.kb.facts), segundos)
+
+
+def jugar_lote(config, semillas):
+    """ Trabajo de un proceso: juega los episodios de 'semillas' y devuelve sus resultados. """
+    return [jugar_episodio(config, s) for s in semillas]
+
+
+def generar_configuraciones(spec):
+    """ Lista de configuraciones (diccionarios) de la especificación. """
+    parametros = spec['parametros']
+    nombres = sorted(parametros)
+    if 'aleatorio' not in spec:
+        return [dict(zip(nombres, valores))
+                for valores in itertools.product(*(parametros[n] for n in nombres))]
+
+    rng = random.Random(spec.get('semilla', 0))
+    configs = []
+    for _ in range(spec['aleatorio']):
+        config = {}
+        for nombre in nombres:
+            dominio = parametros[nombre]
+            if isinstance(dominio, dict):
+                lo, hi = dominio['min'], dominio['max']
+                if isinstance(lo, int) and isinstance(hi, int):
+                    config[nombre] = rng.randint(lo, hi)
+                else:
+                    config[nombre] = rng.uniform(lo, hi)
+            else:
+                config[nombre] = rng.choice(dominio)
+        configs.append(config)
+    return configs
+
+
+def _clave(config):
+    return json.dumps(config, sort_keys=True)
+
+
+def rango_puntuacion(max_steps):
+    """ Puntuaciones mínima y máxima posibles de un episodio de como mucho max_steps pasos. """
+    return PENALIZACION_MUERTE + COSTE_FLECHA + COSTE_PASO * max_steps, RECOMPENSA_ORO
+
+
+class SecuenciaConfianza:
+    """
+    Secuencia de confianza para la media de una serie de valores acotados en
+    'rango' = (a, b): la de Bernstein empírica con parámetros predecibles
+    (Waudby-Smith y Ramdas, 2023) sobre los valores llevados a [0, 1].
+
+    La varianza entra a través de una estimación que empieza con una varianza
+    previa de 1/4 (la máxima en [0, 1]) con el peso de una observación, así
+    que unos primeros valores idénticos no dejan el intervalo en un punto: el
+    radio nunca baja de log(2 / alfa) / suma de lambdas, y la cota vale para
+    cualquier distribución en el rango, no solo para normales. Se devuelve la
+    intersección de todos los intervalos vistos, también válida.
+    """
+    LAMBDA_MAXIMA = 0.75
+
+    def __init__(self, alfa=0.05, rango=(0.0, 1.0)):
+        self.alfa = alfa
+        self.minimo, self.maximo = rango
+        if not self.minimo < self.maximo:
+            raise ValueError(f"Rango vacío: {rango}")
+        self.log_alfa = math.log(2 / alfa)
+        self.n = 0
+        self.suma = 0.0
+        self.suma_x = 0.5          # 1/2 + suma de los valores en [0, 1]: media previa 1/2
+        self.suma_desvios = 0.25   # 1/4 + suma de (x_i - media_i)^2: varianza previa 1/4
+        self.suma_lambdas = 0.0
+        self.suma_lambdas_x = 0.0
+        self.suma_penalizacion = 0.0
+        self.lo, self.hi = 0.0, 1.0
+
+    def anotar(self, valor):
+        x = (valor - self.minimo) / (self.maximo - self.minimo)
+        if not 0.0 <= x <= 1.0:
+            raise ValueError(f"{valor} fuera del rango [{self.minimo}, {self.maximo}]")
+        t = self.n + 1
+        media_previa = self.suma_x / t
+        varianza_previa = self.suma_desvios / t
+        lam = min(math.sqrt(2 * self.log_alfa / (varianza_previa * t * math.log(1 + t))),
+                  self.LAMBDA_MAXIMA)
+        self.suma_lambdas += lam
+        self.suma_lambdas_x += lam * x
+        self.suma_penalizacion += (x - media_previa) ** 2 * (-math.log1p(-lam) - lam)
+        self.n = t
+        self.suma += valor
+        self.suma_x += x
+        self.suma_desvios += (x - self.suma_x / (t + 1)) ** 2
+        centro = self.suma_lambdas_x / self.suma_lambdas
+        radio = (self.log_alfa + self.suma_penalizacion) / self.suma_lambdas
+        self.lo = max(self.lo, centro - radio)
+        self.hi = min(self.hi, centro + radio)
+
+    def media(self):
+        return self.suma / self.n if self.n else 0.0
+
+    def intervalo(self):
+        """ Intervalo válido en cualquier momento para la media (el rango entero sin valores). """
+        ancho = self.maximo - self.minimo
+        return self.minimo + ancho * self.lo, self.minimo + ancho * self.hi
+
+
+class _Estadistica:
+    """ Resultados acumulados de una configuración. """
+    def __init__(self, config, alfa):
+        self.config = config
+        self.puntuacion = SecuenciaConfianza(alfa, rango_puntuacion(config.get('max_steps', 50)))
+        self.victorias = 0
+        self.muertes = 0
+        self.pasos = 0
+        self.latencias = HistogramaLatencias()
+        self.degradados = 0
+        self.inicio = time.perf_counter()
+
+    @property
+    def n(self):
+        return self.puntuacion.n
+
+    def anotar(self, resultados):
+        for puntuacion, victoria, muerte, pasos, latencias, degradados, _, _ in resultados:
+            self.puntuacion.anotar(puntuacion)
+            self.victorias += victoria
+            self.muertes += muerte
+            self.pasos += pasos
+            self.latencias.sumar(latencias)
+            self.degradados += degradados
+
+    def media(self):
+        return self.puntuacion.media()
+
+    def intervalo(self):
+        """ Intervalo para la puntuación media, válido tras cualquier lote. """
+        return self.puntuacion.intervalo()
+
+    def resumen(self, podada):
+        lo, hi = self.intervalo()
+        p50, p99 = self.latencias.percentil(50), self.latencias.percentil(99)
+        return {'config': self.config, 'episodios': self.n, 'media': self.media(),
+                'intervalo': [lo, hi], 'victorias': self.victorias / self.n,
+                'muertes': self.muertes / self.n, 'pasos_medios': self.pasos / self.n,
+                'latencia_p50_ms': None if p50 is None else p50 * 1000,
+                'latencia_p99_ms': None if p99 is None else p99 * 1000,
+                'pasos_degradados': self.degradados, 'podada': podada, 'segundos': time.perf_counter() - self.inicio}
+
+
+class Barrido:
+    """
+    Ejecuta un barrido: reparte lotes de episodios entre procesos, poda
+    configuraciones claramente peores y escribe los resultados según terminan.
+
+    Todas las configuraciones usan las mismas semillas de episodio (semilla,
+    semilla + 1, ...), o las del corte del corpus, así que se comparan sobre
+    los mismos mundos.
+
+    'alfa' es el error de todo el barrido (se reparte entre configuraciones).
+    """
+    def __init__(self, spec, salida, procesos=1, alfa=0.01, minimo_episodios=40, metricas=None):
+        self.configs = generar_configuraciones(spec)
+        self.episodios = spec.get('episodios', 100)
+        self.lote = spec.get('lote', 20)
+        self.semilla = spec.get('semilla', 0)
+        self.corpus = spec.get('corpus')
+        self.salida = salida
+        self.procesos = procesos
+        self.alfa = alfa
+        self.minimo_episodios = minimo_episodios
+        self.metricas = metricas  # Opcional: MetricasEpisodios (ver wumpus_metricas.py)
+
+    def _hechas(self):
+        """ Claves de las configuraciones ya presentes en el fichero de salida. """
+        if not os.path.exists(self.salida):
+            return set()
+        with open(self.salida) as f:
+            return {_clave(json.loads(linea)['config']) for linea in f if linea.strip()}
+
+    def _semillas(self, config, corpus):
+        """ Semillas de los episodios de una configuración. """
+        if corpus is None:
+            return range(self.semilla, self.semilla + self.episodios)
+        filas = corpus.seleccionar(limite=self.episodios, size=config.get('size', 4),
+                                   num_wumpus=config.get('num_wumpus', 1),
+                                   pit_probability=config.get('pit_probability', 0.20),
+                                   **self.corpus.get('filtro', {}))
+        return [f['semilla'] for f in filas]
+
+    def _lotes(self, indices):
+        """ Lotes (indice, semillas) intercalando configuraciones para que avancen a la par. """
+        corpus = Corpus(self.corpus['ruta']) if self.corpus else None
+        try:
+            semillas = {i: self._semillas(self.configs[i], corpus) for i in indices}
+        finally:
+            if corpus is not None:
+                corpus.cerrar()
+        cola = deque()
+        for inicio in range(0, self.episodios, self.lote):
+            cola.extend((i, semillas[i][inicio:inicio + self.lote]) for i in indices
+                        if inicio < len(semillas[i]))
+        return cola
+
+    def _podar(self, estadisticas, activas):
+        """
+        Configuraciones activas cuyo intervalo queda entero por debajo del de
+        la mejor (contando también las ya terminadas).
+        """
+        maduras = [e for e in estadisticas.values() if e.n >= self.minimo_episodios]
+        if len(maduras) < 2:
+            return []
+        mejor = max(e.intervalo()[0] for e in maduras)
+        return [i for i in activas if estadisticas[i].n >= self.minimo_episodios
+                and estadisticas[i].intervalo()[1] < mejor]
+
+    def ejecutar(self):
+        """ Ejecuta el barrido y devuelve la lista de resúmenes escritos. """
+        hechas = self._hechas()
+        indices = [i for i, c in enumerate(self.configs) if _clave(c) not in hechas]
+        alfa = self.alfa / max(1, len(indices))  # Bonferroni entre configuraciones
+        estadisticas = {i: _Estadistica(self.configs[i], alfa) for i in indices}
+        pendientes_por_config = {i: 0 for i in indices}
+        cola = self._lotes(indices)
+        for i, _ in cola:
+            pendientes_por_config[i] += 1
+        activas = {i for i in indices if pendientes_por_config[i]}  # Sin mundos: nada que jugar
+        resumenes = []
+
+        pool = ProcessPoolExecutor(max_workers=self.procesos) if self.procesos > 1 else None
+        en_vuelo = {}
+        try:
+            with open(self.salida, 'a') as salida:
+                def cerrar(i, podada):
+                    activas.discard(i)
+                    resumen = estadisticas[i].resumen(podada)
+                    salida.write(json.dumps(resumen) + "\n")
+                    salida.flush()
+                    resumenes.append(resumen)
+
+                while activas:
+                    # Mantener la cola de los procesos llena (dos lotes por proceso)
+                    while cola and len(en_vuelo) < 2 * max(1, self.procesos):
+                        i, semillas = cola.popleft()
+                        if i not in activas:
+                            continue
+                        if pool is None:
+                            en_vuelo[len(cola), i] = (i, jugar_lote(self.configs[i], semillas))
+                        else:
+                            futuro = pool.submit(jugar_lote, self.configs[i], semillas)
+                            en_vuelo[futuro] = (i, None)
+
+                    if pool is None:
+                        terminados = list(en_vuelo)
+                    else:
+                        terminados, _ = wait(list(en_vuelo), return_when=FIRST_COMPLETED)
+
+                    for clave in terminados:
+                        i, resultados = en_vuelo.pop(clave)
+                        if pool is not None:
+                            resultados = clave.result()
+                        pendientes_por_config[i] -= 1
+                        if self.metricas is not None:
+                            self.metricas.anotar(resultados)
+                        if i not in activas:
+                            continue
+                        estadisticas[i].anotar(resultados)
+                        if pendientes_por_config[i] == 0:
+                            cerrar(i, False)
+
+                    for i in self._podar(estadisticas, activas):
+                        cerrar(i, True)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+        return resumenes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Barrido paralelo de parámetros del Mundo de Wumpus")
+    parser.add_argument('spec', help="fichero JSON con la especificación del barrido")
+    parser.add_argument('--salida', default='barrido.jsonl')
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--alfa', type=float, default=0.01,
+                        help="probabilidad de podar alguna vez la mejor configuración")
+    parser.add_argument('--minimo', type=int, default=40, help="episodios antes de poder podar")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    metricas, exportador = desde_argumentos(args, args.procesos)
+    barrido = Barrido(spec, args.salida, args.procesos, args.alfa, args.minimo, metricas)
+    with exportador or contextlib.nullcontext():
+        resumenes = barrido.ejecutar()
+    for r in sorted(resumenes, key=lambda r: r['media'], reverse=True)[:10]:
+        marca = " (podada)" if r['podada'] else ""
+        print(f"{r['media']:9.1f}  victorias {r['victorias']:.2f}  muertes {r['muertes']:.2f}  "
+              f"p99 {r['latencia_p99_ms'] or 0:.2f} ms  {r['config']}{marca}")
@@ -0,0 +1,174 @@
+import argparse
+import contextlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from wumpus_barrido import SecuenciaConfianza, jugar_lote, rango_puntuacion
+from wumpus_metricas import agregar_argumentos, desde_argumentos
+
+# -----------------------------------------------------------------------------
+# COMPARACIÓN A/B DE VARIANTES DEL AGENTE CON PARADA SECUENCIAL
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_comparacion.py ab.json --procesos 4
+#
+# Ejemplo de especificación (cada variante es una configuración como las de
+# wumpus_barrido.py):
+#   {"a": {"size": 4, "umbral_riesgo": 3}, "b": {"size": 4, "umbral_riesgo": 5},
+#    "metrica": "puntuacion", "efecto_minimo": 10, "alfa": 0.05,
+#    "max_episodios": 20000, "minimo_episodios": 200, "lote": 50, "semilla": 0}
+#
+# Las dos variantes juegan los mismos mundos (semilla, semilla + 1, ...) y se
+# compara la diferencia emparejada a - b de la métrica ('puntuacion' o
+# 'victoria') de cada mundo, lo que elimina la varianza entre mundos.
+#
+# El contraste es una secuencia de confianza (SecuenciaConfianza, la de Bernstein
+# empírica de wumpus_barrido.py, con el rango de valores posibles de la
+# diferencia): un intervalo para la diferencia media que es válido mirándolo
+# tras cada lote, sin corregir por las veces que se ha mirado. Se para en
+# cuanto el intervalo excluye el 0 (diferencia significativa) o queda dentro
+# de (-efecto_minimo, efecto_minimo) (futilidad: si la hay, es menor de lo
+# que importa), o al llegar a max_episodios. La anchura no baja de lo que
+# permite el rango aunque las diferencias vistas sean todas 0, así que unas
+# variantes que casi siempre juegan igual no paran por futilidad tras unos
+# pocos mundos. Antes de minimo_episodios no se para.
+#
+# Los lotes se reparten entre procesos y terminan en cualquier orden, pero el
+# contraste los consume en orden de semilla: así el momento de parar no
+# depende de qué mundos se juegan más deprisa.
+
+METRICAS = {'puntuacion': 0, 'victoria': 1}
+
+
+class ComparacionAB:
+    """
+    Juega las dos variantes sobre los mismos mundos por lotes en paralelo y
+    para en cuanto la secuencia de confianza decide (ver la cabecera).
+    """
+    def __init__(self, spec, procesos=1, metricas=None):
+        self.a = spec['a']
+        self.b = spec['b']
+        self.metrica = spec.get('metrica', 'puntuacion')
+        self.efecto_minimo = spec.get('efecto_minimo', 10.0 if self.metrica == 'puntuacion' else 0.02)
+        self.alfa = spec.get('alfa', 0.05)
+        self.max_episodios = spec.get('max_episodios', 20000)
+        self.lote = spec.get('lote', 50)
+        self.semilla = spec.get('semilla', 0)
+        self.minimo_episodios = spec.get('minimo_episodios', 200)  # Antes no se decide
+        self.procesos = procesos
+        self.metricas = metricas  # Opcional: MetricasEpisodios (ver wumpus_metricas.py)
+        self.secuencia = SecuenciaConfianza(self.alfa, self._rango_diferencia())
+        self.totales = {'a': [0.0, 0, 0], 'b': [0.0, 0, 0]}  # puntuación, victorias, muertes
+
+    def _rango_diferencia(self):
+        """ Valores posibles de la diferencia a - b de la métrica en un mundo. """
+        if self.metrica == 'victoria':
+            return -1.0, 1.0
+        min_a, max_a = rango_puntuacion(self.a.get('max_steps', 50))
+        min_b, max_b = rango_puntuacion(self.b.get('max_steps', 50))
+        return min_a - max_b, max_a - min_b
+
+    def _anotar(self, resultados_a, resultados_b):
+        indice = METRICAS[self.metrica]
+        for ra, rb in zip(resultados_a, resultados_b):
+            self.secuencia.anotar(float(ra[indice]) - float(rb[indice]))
+            for nombre, r in (('a', ra), ('b', rb)):
+                total = self.totales[nombre]
+                total[0] += r[0]
+                total[1] += r[1]
+                total[2] += r[2]
+
+    def _decision(self):
+        if self.secuencia.n < self.minimo_episodios:
+            return None
+        lo, hi = self.secuencia.intervalo()
+        if lo > 0:
+            return 'a mejor'
+        if hi < 0:
+            return 'b mejor'
+        if -self.efecto_minimo < lo and hi < self.efecto_minimo:
+            return 'futilidad'
+        return None
+
+    def ejecutar(self):
+        """ Ejecuta la comparación y devuelve su resumen. """
+        inicio = time.perf_counter()
+        lotes = [range(s, min(s + self.lote, self.semilla + self.max_episodios))
+                 for s in range(self.semilla, self.semilla + self.max_episodios, self.lote)]
+        siguiente = 0      # Próximo lote a enviar
+        consumido = 0      # Próximo lote que entra en el contraste
+        terminados = {}    # indice de lote -> {'a': resultados, 'b': resultados}
+        decision = None
+
+        pool = ProcessPoolExecutor(max_workers=self.procesos) if self.procesos > 1 else None
+        en_vuelo = {}
+        try:
+            while decision is None and consumido < len(lotes):
+                # Mantener la cola de los procesos llena (dos lotes por proceso y variante);
+                # sin procesos, jugar solo el lote que toca contrastar
+                while siguiente < len(lotes) and (len(en_vuelo) < 4 * self.procesos if pool is not None
+                                                  else siguiente == consumido):
+                    for nombre, config in (('a', self.a), ('b', self.b)):
+                        if pool is None:
+                            resultados = jugar_lote(config, lotes[siguiente])
+                            terminados.setdefault(siguiente, {})[nombre] = resultados
+                            if self.metricas is not None:
+                                self.metricas.anotar(resultados)
+                        else:
+                            en_vuelo[pool.submit(jugar_lote, config, lotes[siguiente])] = (siguiente, nombre)
+                    siguiente += 1
+
+                if en_vuelo:
+                    hechos, _ = wait(list(en_vuelo), return_when=FIRST_COMPLETED)
+                    for futuro in hechos:
+                        i, nombre = en_vuelo.pop(futuro)
+                        terminados.setdefault(i, {})[nombre] = futuro.result()
+                        if self.metricas is not None:
+                            self.metricas.anotar(futuro.result())
+
+                # Consumir en orden de semilla los lotes con las dos variantes jugadas
+                while decision is None and len(terminados.get(consumido, ())) == 2:
+                    par = terminados.pop(consumido)
+                    self._anotar(par['a'], par['b'])
+                    consumido += 1
+                    decision = self._decision()
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        return self._resumen(decision or 'sin decidir', time.perf_counter() - inicio)
+
+    def _resumen(self, decision, segundos):
+        n = self.secuencia.n
+        lo, hi = self.secuencia.intervalo()
+        resumen = {'decision': decision, 'metrica': self.metrica, 'episodios': n,
+                   'diferencia': self.secuencia.media(), 'intervalo': [lo, hi],
+                   'efecto_minimo': self.efecto_minimo, 'alfa': self.alfa, 'segundos': segundos}
+        for nombre in ('a', 'b'):
+            puntuacion, victorias, muertes = self.totales[nombre]
+            resumen[nombre] = {'config': getattr(self, nombre), 'media': puntuacion / max(1, n),
+                               'victorias': victorias / max(1, n), 'muertes': muertes / max(1, n)}
+        return resumen
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara dos variantes del agente en los mismos mundos")
+    parser.add_argument('spec', help="fichero JSON con las variantes 'a' y 'b' y las opciones del contraste")
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    with open(args.spec) as f:
+        spec = json.load(f)
+    metricas, exportador = desde_argumentos(args, args.procesos)
+    with exportador or contextlib.nullcontext():
+        r = ComparacionAB(spec, args.procesos, metricas).ejecutar()
+    lo, hi = r['intervalo']
+    print(f"{r['decision']} tras {r['episodios']} episodios emparejados ({r['segundos']:.1f} s): "
+          f"diferencia de {r['metrica']} a - b = {r['diferencia']:.3f} [{lo:.3f}, {hi:.3f}]")
+    for nombre in ('a', 'b'):
+        v = r[nombre]
+        print(f"  {nombre}: media {v['media']:.1f}  victorias {v['victorias']:.3f}  "
+              f"muertes {v['muertes']:.3f}  {v['config']}")
@@ -0,0 +1,179 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import random
+import time
+from collections import deque
+
+from wumpus_barrido import crear_partida, resultado_episodio
+from wumpus_core import observacion, sin_salida
+from wumpus_metricas import agregar_argumentos, desde_argumentos
+
+# -----------------------------------------------------------------------------
+# MUCHOS EPISODIOS INTERCALADOS EN UN PROCESO
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_cooperativo.py config.json --episodios 5000 --activos 1000
+#
+# Cada episodio es la corrutina LogicalAgent.episodio(): cede una acción y
+# espera el resultado y la observación siguiente. El planificador avanza
+# todos los episodios activos un paso por ronda, en dos fases:
+#   1. el mundo de cada episodio ejecuta la acción pendiente y calcula la
+#      observación (todas las actualizaciones de mundo juntas, en un bucle);
+#   2. cada agente recibe lo suyo y razona hasta su siguiente acción.
+# Los agentes no tocan su mundo: todo les llega por send(), y escriben en su
+# propio 'log', que aquí es sin_salida. No se redirige sys.stdout, así que
+# otras tareas de asyncio del mismo hilo siguen escribiendo con normalidad.
+# Los episodios terminados dejan sitio a los pendientes, así que la memoria
+# depende de 'max_activos' y no del número de episodios.
+#
+# Los mundos solo usan 'random' al crearse. Los agentes lo usan en
+# desempates y retrocesos, así que cada uno recibe su propio random.Random
+# con el estado que tendría el global en jugar_episodio: cada semilla da
+# exactamente la misma partida, y el 'random' de quien llama queda como estaba.
+#
+# ejecutar_async() cede el control al bucle de asyncio tras cada ronda, para
+# convivir con servidores asyncio en el mismo hilo.
+
+
+class _Episodio:
+    __slots__ = ('semilla', 'world', 'agent', 'corrutina', 'max_steps', 'accion', 'envio',
+                 'pasos', 'segundos')
+
+    def __init__(self, semilla, world, agent, corrutina, max_steps):
+        self.semilla = semilla
+        self.world = world
+        self.agent = agent
+        self.corrutina = corrutina
+        self.max_steps = max_steps
+        self.accion = None  # Acción pendiente de ejecutar en el mundo
+        self.envio = observacion(world, 0, max_steps)  # Lo siguiente que recibe el agente
+        self.pasos = 0
+        self.segundos = 0.0
+
+
+class PlanificadorCooperativo:
+    """
+    Juega los episodios de 'semillas' con la configuración dada (como las de
+    wumpus_barrido.py) intercalados, con hasta 'max_activos' a la vez.
+    al_terminar(semilla, resultado) se llama con cada episodio terminado; el
+    resultado es la tupla de jugar_episodio.
+    """
+    def __init__(self, config, semillas, max_activos=1000, al_terminar=None):
+        self.config = config
+        self.max_activos = max_activos
+        self.al_terminar = al_terminar
+        self.activos = []
+        self.resultados = {}  # semilla -> resultado
+        self._pendientes = deque(semillas)
+        self._orden = list(self._pendientes)
+
+    def terminado(self):
+        return not self.activos and not self._pendientes
+
+    def _admitir(self):
+        max_steps = self.config.get('max_steps', 50)
+        while self._pendientes and len(self.activos) < self.max_activos:
+            semilla = self._pendientes.popleft()
+            inicio = time.perf_counter()
+            world, agent = crear_partida(self.config, semilla)
+            agent.azar = random.Random()
+            agent.azar.setstate(random.getstate())
+            agent.log = sin_salida
+            corrutina = agent.episodio(max_steps, self.config.get('presupuesto_episodio'))
+            next(corrutina)
+            episodio = _Episodio(semilla, world, agent, corrutina, max_steps)
+            episodio.segundos = time.perf_counter() - inicio
+            self.activos.append(episodio)
+
+    def ronda(self):
+        """ Avanza un paso todos los episodios activos y admite pendientes. """
+        if self._pendientes and len(self.activos) < self.max_activos:
+            estado_exterior = random.getstate()
+            try:
+                self._admitir()
+            finally:
+                random.setstate(estado_exterior)  # crear_partida siembra el 'random' global
+        self._actualizar_mundos()
+        self._razonar()
+
+    def _actualizar_mundos(self):
+        reloj = time.perf_counter
+        for episodio in self.activos:
+            if episodio.accion is None:
+                continue
+            inicio = reloj()
+            world = episodio.world
+            result = world.execute_action(episodio.accion)
+            episodio.pasos += 1
+            episodio.envio = (result, observacion(world, episodio.pasos, episodio.max_steps))
+            episodio.segundos += reloj() - inicio
+
+    def _razonar(self):
+        reloj = time.perf_counter
+        siguen = []
+        for episodio in self.activos:
+            inicio = reloj()
+            try:
+                episodio.accion = episodio.corrutina.send(episodio.envio)
+            except StopIteration as fin:
+                episodio.segundos += reloj() - inicio
+                self._terminar(episodio, fin.value)
+                continue
+            episodio.segundos += reloj() - inicio
+            siguen.append(episodio)
+        self.activos = siguen
+
+    def _terminar(self, episodio, pasos):
+        resultado = resultado_episodio(episodio.world, episodio.agent, pasos, episodio.segundos)
+        self.resultados[episodio.semilla] = resultado
+        if self.al_terminar is not None:
+            self.al_terminar(episodio.semilla, resultado)
+
+    def ejecutar(self):
+        """ Juega todos los episodios y devuelve sus resultados en el orden de las semillas. """
+        while not self.terminado():
+            self.ronda()
+        return [self.resultados[s] for s in self._orden]
+
+    async def ejecutar_async(self, rondas_por_turno=1):
+        """ Como ejecutar(), cediendo el control a asyncio cada 'rondas_por_turno' rondas. """
+        while not self.terminado():
+            for _ in range(rondas_por_turno):
+                if self.terminado():
+                    break
+                self.ronda()
+            await asyncio.sleep(0)
+        return [self.resultados[s] for s in self._orden]
+
+
+def jugar_lote_cooperativo(config, semillas, max_activos=1000):
+    """ Como wumpus_barrido.jugar_lote, con los episodios intercalados. """
+    return PlanificadorCooperativo(config, semillas, max_activos).ejecutar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Juega muchos episodios intercalados en un solo proceso")
+    parser.add_argument('config', help="fichero JSON con la configuración (como las de wumpus_barrido.py)")
+    parser.add_argument('--episodios', type=int, default=1000)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--activos', type=int, default=1000, help="episodios en curso a la vez")
+    agregar_argumentos(parser)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = json.load(f)
+    metricas, exportador = desde_argumentos(args, 1)
+    al_terminar = None if metricas is None else (lambda semilla, resultado: metricas.anotar([resultado]))
+    planificador = PlanificadorCooperativo(config, range(args.semilla, args.semilla + args.episodios),
+                                           args.activos, al_terminar)
+    inicio = time.perf_counter()
+    with exportador or contextlib.nullcontext():
+        resultados = planificador.ejecutar()
+    segundos = time.perf_counter() - inicio
+    n = len(resultados)
+    print(f"{n} episodios en {segundos:.1f} s ({n / segundos:.0f} episodios/s)")
+    print(f"  media {sum(r[0] for r in resultados) / n:.1f}  "
+          f"victorias {sum(r[1] for r in resultados) / n:.3f}  "
+          f"muertes {sum(r[2] for r in resultados) / n:.3f}")
@@ -0,0 +1,2033 @@
+import copy
+import hashlib
+import random
+import math
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from collections import deque, namedtuple
+from contextlib import contextmanager
+from itertools import islice
+from wumpus_acciones import (ACTION_DELTA, CLIMB_OUT, GRAB_GOLD, MOVE_ACTIONS, MOVE_BY_DELTA,
+                             SHOOT_ACTIONS, describe_action, encode_action)
+from wumpus_reglas import MotorReglas, parse_fact
+
+# -----------------------------------------------------------------------------
+# NÚCLEO DEL MUNDO DE WUMPUS: MUNDO, KB Y AGENTE
+# -----------------------------------------------------------------------------
+# Sin dependencias gráficas: lo importan la interfaz (wumpus_GUI.py), el modo
+# consola, la plantilla del agente y los procesos trabajadores de las
+# ejecuciones en paralelo, que así arrancan sin cargar pygame.
+
+# -----------------------------------------------------------------------------
+# CELDAS COMPARTIDAS (FLYWEIGHT)
+# -----------------------------------------------------------------------------
+# Cada casilla se identifica por un entero i = (y - 1) * size + (x - 1). Las
+# tuplas (x, y), las listas de vecinos y las cadenas de los hechos se crean una
+# sola vez por tamaño de tablero y todos los mundos y agentes las comparten, en
+# lugar de construir objetos nuevos en cada paso.
+
+_DESPLAZAMIENTOS_VECINOS = ((0, 1), (0, -1), (1, 0), (-1, 0))
+
+
+class TablaCeldas:
+    """
+    Tabla compartida de celdas de un tablero de lado 'size'. Se rellena bajo
+    demanda, así que en tableros enormes solo ocupa lo que se usa.
+    """
+    __slots__ = ('size', '_celdas', '_vecinos', '_hechos')
+
+    def __init__(self, size):
+        self.size = size
+        self._celdas = {}
+        self._vecinos = {}
+        self._hechos = {}  # predicado -> {indice: hecho}
+
+    def indice(self, location):
+        return (location[1] - 1) * self.size + (location[0] - 1)
+
+    def celda(self, i):
+        """ Tupla (x, y) única para el índice i. """
+        cell = self._celdas.get(i)
+        if cell is None:
+            cell = self._celdas[i] = (i % self.size + 1, i // self.size + 1)
+        return cell
+
+    def vecinos(self, x, y):
+        """ Tupla compartida con los vecinos válidos de (x, y). """
+        size = self.size
+        i = (y - 1) * size + (x - 1)
+        vecinos = self._vecinos.get(i)
+        if vecinos is None:
+            vecinos = tuple(self.celda((ny - 1) * size + (nx - 1))
+                            for nx, ny in ((x + dx, y + dy) for dx, dy in _DESPLAZAMIENTOS_VECINOS)
+                            if 1 <= nx <= size and 1 <= ny <= size)
+            if 1 <= x <= size and 1 <= y <= size:
+                self._vecinos[i] = vecinos
+        return vecinos
+
+    def hecho(self, pred, location):
+        """ Cadena 'pred at (x, y)' compartida. """
+        hechos = self._hechos.get(pred)
+        if hechos is None:
+            hechos = self._hechos[pred] = {}
+        i = self.indice(location)
+        fact = hechos.get(i)
+        if fact is None:
+            fact = hechos[i] = f"{pred} at ({location[0]}, {location[1]})"
+        return fact
+
+
+_TABLAS = {}
+
+
+def tabla_celdas(size):
+    """ Tabla de celdas compartida por todos los tableros de lado 'size'. """
+    tabla = _TABLAS.get(size)
+    if tabla is None:
+        tabla = _TABLAS[size] = TablaCeldas(size)
+    return tabla
+
+
+class ConjuntoCeldas:
+    """
+    Conjunto de casillas guardadas como índices en un diccionario (en orden
+    de inserción para recorrerlo): ocupa según las casillas que contiene, no
+    según el tamaño del tablero, y añadir y quitar cuestan O(1).
+    """
+    __slots__ = ('tabla', '_orden', 'observadores')
+
+    def __init__(self, tabla, celdas=()):
+        self.tabla = tabla
+        self._orden = {}  # índice -> None
+        self.observadores = []  # Funciones observador(añadida, casilla)
+        for cell in celdas:
+            self.add(cell)
+
+    def __contains__(self, location):
+        x, y = location
+        size = self.tabla.size
+        return 1 <= x <= size and 1 <= y <= size and (y - 1) * size + (x - 1) in self._orden
+
+    def add(self, location):
+        i = self.tabla.indice(location)
+        if i not in self._orden:
+            self._orden[i] = None
+            for observador in self.observadores:
+                observador(True, location)
+
+    def discard(self, location):
+        if location in self:
+            del self._orden[self.tabla.indice(location)]
+            for observador in self.observadores:
+                observador(False, location)
+
+    def __len__(self):
+        return len(self._orden)
+
+    def __iter__(self):
+        celda = self.tabla.celda
+        return (celda(i) for i in self._orden)
+
+
+class PilaCeldas:
+    """ Pila de casillas guardadas como índices en un array de enteros. """
+    __slots__ = ('tabla', '_indices')
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self._indices = array('l')
+
+    def append(self, location):
+        self._indices.append(self.tabla.indice(location))
+
+    def pop(self):
+        return self.tabla.celda(self._indices.pop())
+
+    def ultima(self):
+        """ Última casilla apilada, o None si la pila está vacía. """
+        return self.tabla.celda(self._indices[-1]) if self._indices else None
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __iter__(self):
+        celda = self.tabla.celda
+        return (celda(i) for i in self._indices)
+
+# -----------------------------------------------------------------------------
+# CLASE 1: EL MUNDO DE WUMPUS (EL SIMULADOR)
+#MODIFICADA PARA INCLUIR FLECHAS -
+# -----------------------------------------------------------------------------
+class _LazyBoard:
+    """
+    Vista de solo lectura del tablero para el modo perezoso.
+    Calcula el contenido de cada casilla bajo demanda a partir de los
+    conjuntos de peligros del mundo, sin reservar una lista por casilla.
+    """
+    __slots__ = ('world',)
+
+    def __init__(self, world):
+        self.world = world
+
+    def __getitem__(self, location):
+        if not self.world._is_valid_location(*location):
+            raise KeyError(location)
+        return self.world._cell_contents(location)
+
+    def __contains__(self, location):
+        return self.world._is_valid_location(*location)
+
+    def __len__(self):
+        return self.world.size * self.world.size
+
+    def __iter__(self):
+        size = self.world.size
+        return ((x, y) for x in range(1, size + 1) for y in range(1, size + 1))
+
+# Eventos que WumpusWorld envía a sus suscriptores (subscribe). 'location'
+# es la casilla del agente cuando ocurre: el grito no revela dónde estaba el
+# Wumpus.
+SCREAM = 'scream'              # La flecha ha matado a un Wumpus
+GOLD_GRABBED = 'gold_grabbed'  # El agente ha cogido el oro
+DEATH = 'death'                # El agente ha muerto en un pozo o con el Wumpus
+CLIMB = 'climb'                # El agente ha salido de la cueva
+
+WorldEvent = namedtuple('WorldEvent', ('kind', 'location'))
+
+
+class WumpusWorld:
+    """
+    Simula el entorno del Mundo de Wumpus.
+    Maneja el tablero, la ubicación de los peligros y las percepciones.
+
+    Con lazy=True no se reserva el tablero completo: solo se guardan las
+    coordenadas de los peligros en conjuntos y los perceptos se calculan
+    bajo demanda, de modo que crear el mundo cuesta O(peligros).
+
+    Admite varios Wumpus (num_wumpus). Sus posiciones se indexan por fila y
+    por columna para resolver cada disparo con una búsqueda binaria.
+
+    Los suscriptores (subscribe) reciben un WorldEvent por cada grito, oro
+    recogido, muerte y salida; los de la última acción quedan en 'eventos'.
+    """
+    __slots__ = ('size', 'lazy', 'pit_probability', 'celdas', 'board',
+                 'agent_location', 'agent_has_gold', 'agent_is_alive', 'agent_has_exited',
+                 'agent_has_arrow', 'wumpus_is_alive', 'gold_location', 'wumpus_location',
+                 'wumpus_locations', 'pit_locations', '_wumpus_by_column', '_wumpus_by_row',
+                 '_listeners', 'eventos')
+
+    def __init__(self, size=4, lazy=False, num_wumpus=1, pit_probability=0.20):
+        self.size = size
+        self.lazy = lazy
+        self.celdas = tabla_celdas(size)
+        self.pit_probability = pit_probability
+        self.agent_location = (1, 1)
+        self.agent_has_gold = False
+        self.agent_is_alive = True
+        self.agent_has_exited = False
+        self.agent_has_arrow = True  # El agente comienza con una flecha
+        self.wumpus_is_alive = True  # Queda al menos un Wumpus vivo
+        self._listeners = []
+        self.eventos = []  # WorldEvent de la última acción
+
+        # Los peligros se guardan siempre en conjuntos para consultas O(1)
+        self.gold_location = None
+        self.wumpus_location = None   # El primer Wumpus colocado
+        self.wumpus_locations = set() # Wumpus vivos
+        self.pit_locations = set()
+
+        # Índices de Wumpus vivos: columna -> filas ordenadas, fila -> columnas ordenadas
+        self._wumpus_by_column = {}
+        self._wumpus_by_row = {}
+
+        if lazy:
+            self.board = _LazyBoard(self)
+            self.gold_location = self._get_random_empty_cell()
+            for _ in range(num_wumpus):
+                self._add_wumpus(self._get_random_empty_cell())
+            self._place_pits_sparse(pit_probability)
+            return
+
+        # Inicializa un tablero vacío
+        self.board = { (x,y): [] for x in range(1, size+1) for y in range(1, size+1) }
+
+        # Colocar Oro
+        self.gold_location = self._get_random_empty_cell()
+        self.board[self.gold_location].append('G')
+
+        # Colocar Wumpus
+        for _ in range(num_wumpus):
+            cell = self._get_random_empty_cell()
+            self.board[cell].append('W')
+            self._add_wumpus(cell)
+
+        # Colocar Pozos con probabilidad pit_probability (20% por defecto) por casilla
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                if (x, y) != (1, 1) and (x, y) != self.gold_location and (x, y) not in self.wumpus_locations:
+                    if random.random() < pit_probability:
+                        self.board[(x, y)].append('P')
+                        self.pit_locations.add((x, y))
+
+    def _place_pits_sparse(self, probability):
+        """
+        Coloca pozos con la probabilidad dada saltando directamente de un
+        pozo al siguiente (saltos geométricos), en O(pozos) en lugar de
+        recorrer todas las casillas.
+        """
+        if probability <= 0:
+            return
+        total = self.size * self.size
+        log_q = math.log(1.0 - probability) if probability < 1 else None
+        index = -1
+        while True:
+            if log_q is None:
+                index += 1
+            else:
+                index += 1 + int(math.log(1.0 - random.random()) / log_q)
+            if index >= total:
+                return
+            cell = (index % self.size + 1, index // self.size + 1)
+            if cell != (1, 1) and cell != self.gold_location and cell not in self.wumpus_locations:
+                self.pit_locations.add(cell)
+
+    @classmethod
+    def from_layout(cls, size, gold, wumpus=(), pits=(), lazy=False):
+        """
+        Mundo con el oro y los peligros dados, sin azar (para reproducir un
+        caso concreto). No consume ni altera el estado de 'random'.
+        """
+        state = random.getstate()
+        world = cls(size, lazy=lazy, num_wumpus=0, pit_probability=0)
+        random.setstate(state)
+        if not lazy:
+            world.board[world.gold_location].remove('G')
+            world.board[gold].append('G')
+        world.gold_location = gold
+        for cell in wumpus:
+            world._add_wumpus(cell)
+            if not lazy:
+                world.board[cell].append('W')
+        for cell in pits:
+            world.pit_locations.add(cell)
+            if not lazy:
+                world.board[cell].append('P')
+        world.wumpus_is_alive = bool(world.wumpus_locations)
+        return world
+
+    def state(self):
+        """ Estado del agente en el mundo, para undo_action(). """
+        return (self.agent_location, self.agent_has_gold, self.agent_is_alive, self.agent_has_exited,
+                self.agent_has_arrow, self.wumpus_is_alive)
+
+    def shot_target(self, action):
+        """ Wumpus que mataría la acción de disparo 'action' ahora, o None. """
+        x, y = self.agent_location
+        return self._first_wumpus_in_line(x, y, *ACTION_DELTA[action])
+
+    def undo_action(self, state, killed=None):
+        """
+        Deshace una acción: 'state' es el de state() antes de ejecutarla y
+        'killed' el Wumpus que mató (el de shot_target()), si mató a alguno.
+        """
+        had_gold = self.agent_has_gold
+        (self.agent_location, self.agent_has_gold, self.agent_is_alive, self.agent_has_exited,
+         self.agent_has_arrow, self.wumpus_is_alive) = state
+        if had_gold and not self.agent_has_gold and not self.lazy:
+            self.board[self.gold_location].append('G')
+        if killed is not None and killed not in self.wumpus_locations:
+            self._add_wumpus(killed)
+            if not self.lazy:
+                self.board[killed].append('W')
+        self.eventos = []
+
+    def subscribe(self, listener):
+        """ Registra una función listener(evento) que recibe cada WorldEvent. """
+        self._listeners.append(listener)
+
+    def _emit(self, kind):
+        event = WorldEvent(kind, self.agent_location)
+        self.eventos.append(event)
+        for listener in self._listeners:
+            listener(event)
+
+    def _add_wumpus(self, cell):
+        """ Registra un Wumpus vivo en el conjunto y en los índices de fila/columna. """
+        if self.wumpus_location is None:
+            self.wumpus_location = cell
+        self.wumpus_locations.add(cell)
+        x, y = cell
+        insort(self._wumpus_by_column.setdefault(x, []), y)
+        insort(self._wumpus_by_row.setdefault(y, []), x)
+
+    def _remove_wumpus(self, cell):
+        """ Elimina un Wumpus muerto del conjunto y de los índices. """
+        self.wumpus_locations.discard(cell)
+        x, y = cell
+        self._wumpus_by_column[x].remove(y)
+        self._wumpus_by_row[y].remove(x)
+        self.wumpus_is_alive = bool(self.wumpus_locations)
+
+    def _first_wumpus_in_line(self, x, y, dx, dy):
+        """
+        Devuelve el primer Wumpus vivo en la línea de tiro desde (x, y) en la
+        dirección (dx, dy), o None. Usa búsqueda binaria sobre los Wumpus de
+        la misma fila o columna.
+        """
+        if dx == 0:
+            line, position, step = self._wumpus_by_column.get(x), y, dy
+        else:
+            line, position, step = self._wumpus_by_row.get(y), x, dx
+        if not line:
+            return None
+        if step > 0:
+            i = bisect_right(line, position)
+            hit = line[i] if i < len(line) else None
+        else:
+            i = bisect_left(line, position) - 1
+            hit = line[i] if i >= 0 else None
+        if hit is None:
+            return None
+        return (x, hit) if dx == 0 else (hit, y)
+
+    def _cell_contents(self, location):
+        """ Construye la lista de contenido de una casilla a partir de los peligros. """
+        contents = []
+        if location == self.gold_location and not self.agent_has_gold:
+            contents.append('G')
+        if location in self.wumpus_locations:
+            contents.append('W')
+        if location in self.pit_locations:
+            contents.append('P')
+        return contents
+
+    def _get_random_empty_cell(self):
+        """ Obtiene una celda aleatoria que no sea (1,1). """
+        while True:
+            x, y = random.randint(1, self.size), random.randint(1, self.size)
+            if (x, y) != (1, 1) and not self.board[(x, y)]:
+                return (x, y)
+
+    def _is_valid_location(self, x, y):
+        """ Comprueba si una coordenada está dentro del tablero. """
+        return 1 <= x <= self.size and 1 <= y <= self.size
+
+    def get_neighbors(self, x, y):
+        """ Obtiene los vecinos válidos de una casilla (tupla compartida, no modificar). """
+        return self.celdas.vecinos(x, y)
+
+    def get_percepts_at(self, location):
+        """ Devuelve lo que el agente percibe en una ubicación. """
+        x, y = location
+        percepts = {
+            'stench': False, # Hedor (Wumpus)
+            'breeze': False, # Brisa (Pozo)
+            'glitter': False # Brillo (Oro)
+        }
+
+        # Comprobar si hay Oro
+        if location == self.gold_location and not self.agent_has_gold:
+            percepts['glitter'] = True
+
+        # Comprobar si hay peligros adyacentes (el hedor solo si el Wumpus está vivo)
+        for neighbor in self.get_neighbors(x, y):
+            if neighbor in self.wumpus_locations:
+                percepts['stench'] = True
+            if neighbor in self.pit_locations:
+                percepts['breeze'] = True
+
+        return percepts
+
+    def execute_action(self, action, direction=None):
+        """
+        Ejecuta la acción del agente y devuelve el estado.
+        La acción es un código de wumpus_acciones; por compatibilidad también
+        se aceptan los nombres en texto ('move_up', 'shoot_arrow' + dirección).
+        """
+        self.eventos.clear()
+        if not self.agent_is_alive:
+            return "El agente está muerto."
+
+        if not isinstance(action, int):
+            code = encode_action(action, direction)
+            if code is None:
+                if action == 'shoot_arrow':
+                    if not self.agent_has_arrow:
+                        return "No tienes flechas."
+                    self.agent_has_arrow = False
+                    return "Dirección de disparo no válida."
+                return self._check_death()
+            action = code
+        elif not 0 <= action < len(self._ACTION_DISPATCH):
+            raise ValueError(f"Código de acción no válido: {action}")
+
+        return self._ACTION_DISPATCH[action](self, action)
+
+    def _move(self, action):
+        x, y = self.agent_location
+        dx, dy = ACTION_DELTA[action]
+        if self._is_valid_location(x + dx, y + dy):
+            self.agent_location = self.celdas.celda((y + dy - 1) * self.size + (x + dx - 1))
+        return self._check_death()
+
+    def _grab_gold(self, action):
+        if self.agent_location == self.gold_location and not self.agent_has_gold:
+            self.agent_has_gold = True
+            if not self.lazy:
+                self.board[self.agent_location].remove('G')
+            self._emit(GOLD_GRABBED)
+            return "¡El agente encontró el oro!"
+        else:
+            return "No hay oro aquí."
+
+    def _climb_out(self, action):
+        if self.agent_location == (1, 1):
+            self.agent_has_exited = True
+            self._emit(CLIMB)
+            if self.agent_has_gold:
+                return "¡VICTORIA! El agente escapó con el oro."
+            else:
+                return "El agente escapó sin el oro."
+        else:
+            return "Solo se puede salir desde (1, 1)."
+
+    def _shoot(self, action):
+        if not self.agent_has_arrow:
+            return "No tienes flechas."
+
+        self.agent_has_arrow = False
+        # La flecha mata al primer Wumpus vivo en la línea de tiro
+        x, y = self.agent_location
+        cell = self._first_wumpus_in_line(x, y, *ACTION_DELTA[action])
+        if cell is not None:
+            self._remove_wumpus(cell)
+            if not self.lazy:
+                self.board[cell].remove('W')
+            self._emit(SCREAM)
+            return "¡Escuchas un grito! Has matado al Wumpus."
+
+        return "La flecha no golpeó nada."
+
+    def _check_death(self):
+        """ Comprueba si el agente muere en su casilla actual. """
+        if self.agent_location in self.wumpus_locations:
+            self.agent_is_alive = False
+            self._emit(DEATH)
+            return "¡MUERTE! El agente fue comido por el Wumpus."
+        if self.agent_location in self.pit_locations:
+            self.agent_is_alive = False
+            self._emit(DEATH)
+            return "¡MUERTE! El agente cayó en un pozo."
+
+        return f"Agente se movió a {self.agent_location}"
+
+    # Tabla de despacho indexada por código de acción
+    _ACTION_DISPATCH = (_move,) * 4 + (_grab_gold, _climb_out) + (_shoot,) * 4
+
+# -----------------------------------------------------------------------------
+# CLASE 2: LA BASE DE CONOCIMIENTO (KB)
+# - MODIFICADA PARA INCLUIR PUNTOS DE RESTAURACIÓN -
+# -----------------------------------------------------------------------------
+class KnowledgeBase:
+    """
+    Una Base de Conocimiento (KB) simple basada en hechos.
+    Almacena 'hechos' (oraciones) como cadenas de texto.
+
+    Permite marcar puntos de restauración (snapshot) y deshacer los cambios
+    posteriores (rollback). Mientras hay algún punto abierto, cada cambio se
+    anota en un registro de deshacer, así que restaurar cuesta lo mismo que
+    los cambios realizados y no depende del tamaño de la KB.
+
+    Los suscriptores (subscribe) reciben cada cambio como (añadido, hecho),
+    también los que provoca un rollback.
+
+    Mantenimiento de la verdad: tell(hecho, because=premisas) anota una
+    justificación del hecho. Un hecho dicho sin 'because' es una premisa y
+    no se retira solo. Al retirar un hecho se descartan las justificaciones
+    que lo usaban, y los hechos derivados que se quedan sin ninguna se
+    retiran a su vez, con un coste proporcional a los hechos afectados.
+
+    Por predicado ('Danger' en "Danger at (2, 3)") se lleva el conjunto de
+    hechos y el orden en que llegaron los que siguen en la KB, de modo que
+    count(), recent() (los últimos 'max_recent') y
+    get_facts_starting_with("Danger at") no recorren toda la KB. Un rollback
+    devuelve cada hecho retirado a su sitio en ese orden.
+
+    Compactación: archive(hecho) pasa un hecho que ya no puede dar
+    conclusiones nuevas al archivo frío. Sigue en la KB (ask, facts, count y
+    get_facts_starting_with lo incluyen), pero get_active_facts_starting_with,
+    que es lo que recorren las reglas, ya no lo devuelve.
+    """
+    __slots__ = ('facts', '_undo_log', '_checkpoints', '_listeners', '_by_predicate', '_recent',
+                 'max_recent', '_supports', '_dependents', '_archive', '_stamp')
+
+    def __init__(self, max_recent=8):
+        self.facts = set()
+        self._undo_log = []      # (añadido, hecho), (añadida, hecho, justificación) o (hecho, sello, archivado) en orden
+        self._checkpoints = []   # Posición del registro en cada punto abierto
+        self._listeners = []
+        self._by_predicate = {}  # Predicado -> conjunto de hechos activos (sin archivar)
+        self._archive = {}       # Predicado -> conjunto de hechos archivados
+        self._recent = {}        # Predicado -> {hecho: sello} de los que están en la KB, por orden de llegada
+        self._stamp = 0          # Sello del próximo hecho añadido
+        self.max_recent = max_recent
+        self._supports = {}      # Hecho derivado -> justificaciones (tuplas de premisas)
+        self._dependents = {}    # Premisa -> hechos con alguna justificación que la usa
+
+    def subscribe(self, listener):
+        """ Registra una función listener(añadido, hecho) que se llama en cada cambio. """
+        self._listeners.append(listener)
+
+    def tell(self, fact, because=None):
+        """
+        Añade un nuevo hecho a la KB. (Diapositiva 6: Representación)
+        Con 'because' (hechos de los que se deduce) el hecho queda justificado
+        por ellos; si ya estaba, se le añade la justificación.
+        """
+        supports = self._supports.get(fact)
+        if fact in self.facts:
+            if supports is not None:
+                self._justify(fact, supports, () if because is None else tuple(because))
+            return
+        if because is not None:
+            if supports is None:
+                supports = self._supports[fact] = set()
+            self._justify(fact, supports, tuple(because))
+        elif supports is not None:
+            self._justify(fact, supports, ())  # Ahora también es premisa
+        self._apply(True, fact)
+
+    def retract(self, fact):
+        """ Elimina un hecho de la KB si existe, y los que solo se deducían de él. """
+        pending = [fact]
+        while pending:
+            fact = pending.pop()
+            if fact not in self.facts:
+                continue
+            self._apply(False, fact)
+            # Sus propias justificaciones dejan de valer: si se vuelve a decir,
+            # solo cuentan las nuevas
+            for justification in self._supports.pop(fact, ()):
+                for premise in justification:
+                    dependents = self._dependents.get(premise)
+                    if dependents is not None:
+                        dependents.discard(fact)
+                if self._checkpoints:
+                    self._undo_log.append((False, fact, justification))
+            for dependent in self._dependents.pop(fact, ()):
+                supports = self._supports.get(dependent)
+                if not supports:
+                    continue
+                for justification in [j for j in supports if fact in j]:
+                    supports.discard(justification)
+                    if self._checkpoints:
+                        self._undo_log.append((False, dependent, justification))
+                if not supports and dependent in self.facts:
+                    pending.append(dependent)
+
+    def _justify(self, fact, supports, justification):
+        if justification in supports:
+            return
+        supports.add(justification)
+        for premise in justification:
+            self._dependents.setdefault(premise, set()).add(fact)
+        if self._checkpoints:
+            self._undo_log.append((True, fact, justification))
+
+    def _apply(self, added, fact):
+        if added:
+            self.facts.add(fact)
+        else:
+            self.facts.remove(fact)
+        if self._checkpoints:
+            if not added:
+                # Al deshacer la retirada vuelve a su sitio entre los recientes y, si lo estaba, al archivo
+                stamp = self._recent[fact.partition(' at ')[0]][fact]
+                self._undo_log.append((fact, stamp, self.is_archived(fact)))
+            self._undo_log.append((added, fact))
+        self._tally(added, fact)
+        for listener in self._listeners:
+            listener(added, fact)
+
+    def ask(self, fact):
+        """ Comprueba si un hecho ya existe en la KB. (Diapositiva 6: Razonamiento) """
+        return fact in self.facts
+
+    def snapshot(self):
+        """ Abre un punto de restauración y devuelve su identificador. """
+        self._checkpoints.append(len(self._undo_log))
+        return len(self._checkpoints)
+
+    def rollback(self, snapshot):
+        """ Deshace todos los cambios hechos desde el punto 'snapshot' y lo cierra. """
+        mark = self._checkpoints[snapshot - 1]
+        reordered = set()  # Predicados con hechos devueltos a su sitio entre los recientes
+        while len(self._undo_log) > mark:
+            entry = self._undo_log.pop()
+            if isinstance(entry[0], str):
+                fact, stamp, archived = entry
+                pred = fact.partition(' at ')[0]
+                self._recent[pred][fact] = stamp
+                reordered.add(pred)
+                if archived:
+                    self._by_predicate[pred].discard(fact)
+                    self._archive.setdefault(pred, set()).add(fact)
+                continue
+            if len(entry) == 3:
+                added, fact, justification = entry
+                if added:
+                    supports = self._supports[fact]
+                    supports.discard(justification)
+                    if not supports:
+                        del self._supports[fact]
+                else:
+                    self._supports.setdefault(fact, set()).add(justification)
+                    for premise in justification:
+                        self._dependents.setdefault(premise, set()).add(fact)
+                continue
+            added, fact = entry
+            if added:
+                self.facts.discard(fact)
+            else:
+                self.facts.add(fact)
+            self._tally(not added, fact)
+            for listener in self._listeners:
+                listener(not added, fact)
+        for pred in reordered:
+            self._recent[pred] = dict(sorted(self._recent[pred].items(), key=lambda item: item[1]))
+        self._close(snapshot)
+
+    def commit(self, snapshot):
+        """ Cierra el punto 'snapshot' conservando los cambios realizados. """
+        self._close(snapshot)
+
+    def drop_oldest_snapshot(self):
+        """
+        Cierra solo el punto de restauración más antiguo, conservando sus
+        cambios, y olvida la parte del registro que ya no se puede deshacer.
+        Los identificadores de los demás puntos bajan en uno.
+        """
+        mark = self._checkpoints[1] if len(self._checkpoints) > 1 else len(self._undo_log)
+        del self._checkpoints[0]
+        del self._undo_log[:mark]
+        self._checkpoints[:] = [m - mark for m in self._checkpoints]
+
+    def undo_size(self):
+        """ Entradas del registro de cambios pendientes de confirmar o deshacer. """
+        return len(self._undo_log)
+
+    def changes_since(self, snapshot):
+        """ Devuelve los hechos añadidos y eliminados desde el punto 'snapshot'. """
+        added, removed = set(), set()
+        for entry in self._undo_log[self._checkpoints[snapshot - 1]:]:
+            if len(entry) != 2:
+                continue
+            was_added, fact = entry
+            if was_added:
+                removed.discard(fact)
+                added.add(fact)
+            else:
+                added.discard(fact)
+                removed.add(fact)
+        return added, removed
+
+    @contextmanager
+    def hypothesis(self):
+        """ Contexto en el que todos los cambios a la KB se deshacen al salir. """
+        snapshot = self.snapshot()
+        try:
+            yield self
+        finally:
+            self.rollback(snapshot)
+
+    def _close(self, snapshot):
+        del self._checkpoints[snapshot - 1:]
+        if not self._checkpoints:
+            self._undo_log.clear()
+
+    def _tally(self, added, fact):
+        pred = fact.partition(' at ')[0]
+        facts = self._by_predicate.get(pred)
+        recent = self._recent.get(pred)
+        if added:
+            if facts is None:
+                facts = self._by_predicate[pred] = set()
+                recent = self._recent[pred] = {}
+            facts.add(fact)
+            recent[fact] = self._stamp
+            self._stamp += 1
+        else:
+            facts.discard(fact)
+            archived = self._archive.get(pred)
+            if archived:
+                archived.discard(fact)
+            del recent[fact]
+
+    def archive(self, fact):
+        """
+        Pasa 'fact' al archivo frío: la KB lo sigue sabiendo, pero las reglas
+        dejan de recorrerlo. No se puede archivar con un punto de restauración
+        abierto (el rollback no lo desharía); sí retirar un hecho archivado, y
+        el rollback lo devuelve al archivo.
+        """
+        if self._checkpoints:
+            raise RuntimeError("No se puede archivar durante una hipótesis")
+        if fact not in self.facts:
+            return
+        pred = fact.partition(' at ')[0]
+        facts = self._by_predicate.get(pred)
+        if facts is not None and fact in facts:
+            facts.remove(fact)
+            self._archive.setdefault(pred, set()).add(fact)
+
+    def is_archived(self, fact):
+        return fact in self._archive.get(fact.partition(' at ')[0], ())
+
+    def open_snapshots(self):
+        """ Número de puntos de restauración abiertos. """
+        return len(self._checkpoints)
+
+    def count(self, predicate):
+        """ Número de hechos con ese predicado, p. ej. count("Danger"). """
+        return len(self._by_predicate.get(predicate, ())) + len(self._archive.get(predicate, ()))
+
+    def recent(self, predicate):
+        """ Últimos hechos añadidos con ese predicado que siguen en la KB, del más antiguo al más reciente. """
+        recent = self._recent.get(predicate)
+        if not recent:
+            return []
+        return list(islice(reversed(recent), self.max_recent))[::-1]
+
+    def get_facts_starting_with(self, prefix):
+        """ Devuelve una lista de hechos que comienzan con un prefijo. """
+        if prefix.endswith(' at'):
+            return list(self._by_predicate.get(prefix[:-3], ())) + list(self._archive.get(prefix[:-3], ()))
+        return [f for f in self.facts if f.startswith(prefix)]
+
+    def get_active_facts_starting_with(self, prefix):
+        """ Como get_facts_starting_with, sin los hechos archivados. """
+        if prefix.endswith(' at'):
+            return list(self._by_predicate.get(prefix[:-3], ()))
+        return [f for f in self.facts if f.startswith(prefix) and not self.is_archived(f)]
+
+    def print_facts(self, salida=print):
+        """ Imprime todos los hechos conocidos (con 'salida', una función como print). """
+        salida("--- Hechos Conocidos (KB) ---")
+        for f in sorted(list(self.facts)):
+            salida(f)
+        salida("-------------------------------")
+
+# -----------------------------------------------------------------------------
+# CASILLAS CON CAMBIOS EN LA KB
+# -----------------------------------------------------------------------------
+class CambiosPorCasilla:
+    """
+    Casillas en las que ha cambiado algún hecho de la KB, con una marca por
+    consumidor: casillas(consumidor) devuelve las cambiadas desde su consulta
+    anterior. Los cambios que ya han visto todos se olvidan al compactar().
+
+    Se suscribe a la KB, así que también ve los rollback. Durante una
+    hipótesis, guardar() y restaurar() devuelven las marcas a donde estaban
+    para que lo examinado en ella se vuelva a examinar con la KB real.
+    """
+    __slots__ = ('_registro', '_marcas', '_guardadas')
+
+    def __init__(self, kb, consumidores):
+        self._registro = []  # Casillas cambiadas, en orden
+        self._marcas = dict.fromkeys(consumidores, 0)  # Consumidor -> posición ya vista
+        self._guardadas = 0  # Marcas guardadas pendientes de restaurar: no se compacta
+        for fact in kb.facts:
+            self._al_cambiar(True, fact)
+        kb.subscribe(self._al_cambiar)
+
+    def _al_cambiar(self, added, fact):
+        parsed = parse_fact(fact)
+        if parsed is not None:
+            self._registro.append(parsed[1])
+
+    def casillas(self, consumidor):
+        """ Casillas cambiadas desde la consulta anterior de 'consumidor'. """
+        cambiadas = set(self._registro[self._marcas[consumidor]:])
+        self._marcas[consumidor] = len(self._registro)
+        return cambiadas
+
+    def descartar(self, consumidor):
+        """ Da por vistos los cambios pendientes de 'consumidor' sin examinarlos. """
+        self._marcas[consumidor] = len(self._registro)
+
+    def guardar(self):
+        self._guardadas += 1
+        return dict(self._marcas)
+
+    def restaurar(self, marcas):
+        self._marcas = marcas
+        self._guardadas -= 1
+
+    def compactar(self):
+        """ Olvida los cambios que ya han visto todos los consumidores. """
+        vistos = min(self._marcas.values())
+        if vistos and not self._guardadas:
+            del self._registro[:vistos]
+            for consumidor in self._marcas:
+                self._marcas[consumidor] -= vistos
+
+# -----------------------------------------------------------------------------
+# HASH DEL ESTADO DE CREENCIA (ZOBRIST)
+# -----------------------------------------------------------------------------
+def clave_zobrist(texto):
+    """ Clave de 64 bits fija para 'texto' (la misma en todos los procesos). """
+    return int.from_bytes(hashlib.blake2b(texto.encode(), digest_size=8).digest(), 'little')
+
+
+class HashCreencias:
+    """
+    Hash Zobrist de la KB: el XOR de la clave de cada hecho, actualizado con
+    cada cambio (también los de un rollback), así que cuesta O(1) por cambio
+    y dos KB con los mismos hechos tienen el mismo hash. estado() le añade la
+    casilla del agente y si tiene el oro y la flecha.
+
+    Las claves ya calculadas se guardan en la instancia: crecen con los
+    hechos y casillas de su episodio y se liberan con él.
+    """
+    __slots__ = ('valor', '_claves')
+
+    def __init__(self, kb):
+        self.valor = 0
+        self._claves = {}  # Texto -> clave_zobrist(texto)
+        for fact in kb.facts:
+            self._al_cambiar(True, fact)
+        kb.subscribe(self._al_cambiar)
+
+    def _clave(self, texto):
+        clave = self._claves.get(texto)
+        if clave is None:
+            clave = self._claves[texto] = clave_zobrist(texto)
+        return clave
+
+    def _al_cambiar(self, added, fact):
+        self.valor ^= self._clave(fact)
+
+    def estado(self, location, tiene_oro, tiene_flecha):
+        valor = self.valor ^ self._clave(f"Agente en {location}")
+        if tiene_oro:
+            valor ^= self._clave("Con oro")
+        if tiene_flecha:
+            valor ^= self._clave("Con flecha")
+        return valor
+
+# -----------------------------------------------------------------------------
+# MAPA DE SEGURIDAD POR PELIGRO
+# -----------------------------------------------------------------------------
+class MapaSeguridad:
+    """
+    Capas de seguridad por casilla, cada una el conjunto de casillas que la
+    cumplen: ocupan según lo que sabe el agente, no según el tamaño del
+    tablero.
+
+    La KB guarda por separado "No Pit at" y "No Wumpus at"; este mapa las
+    refleja en dos capas y mantiene la capa de casillas seguras (sin pozo y
+    sin Wumpus) como su intersección, actualizada con cada cambio. También
+    refleja "Danger at". Así las consultas del agente son accesos directos.
+
+    Se suscribe a la KB, por lo que también sigue los rollback.
+    """
+    __slots__ = ('size', 'capa_sin_pozo', 'capa_sin_wumpus', 'capa_segura', 'capa_peligro',
+                 'seguras_recientes', '_capas', 'observadores')
+
+    def __init__(self, size, kb):
+        self.size = size
+        self.capa_sin_pozo = set()
+        self.capa_sin_wumpus = set()
+        self.capa_segura = set()
+        self.capa_peligro = set()
+        self.seguras_recientes = deque(maxlen=8)  # Últimas casillas que han pasado a ser seguras
+        self.observadores = []  # Funciones observador(casilla, segura) al cambiar la capa segura
+        self._capas = {"No Pit": self.capa_sin_pozo,
+                       "No Wumpus": self.capa_sin_wumpus,
+                       "Danger": self.capa_peligro}
+
+        for fact in list(kb.facts):
+            self._al_cambiar(True, fact)
+        kb.subscribe(self._al_cambiar)
+
+    def _al_cambiar(self, added, fact):
+        parsed = parse_fact(fact)
+        if parsed is None or parsed[0] not in self._capas:
+            return
+        pred, location = parsed
+        if added:
+            self._capas[pred].add(location)
+        else:
+            self._capas[pred].discard(location)
+        if pred != "Danger":
+            segura = location in self.capa_sin_pozo and location in self.capa_sin_wumpus
+            if segura != (location in self.capa_segura):
+                if segura:
+                    self.capa_segura.add(location)
+                    self.seguras_recientes.append(location)
+                else:
+                    self.capa_segura.discard(location)
+                    if location in self.seguras_recientes:
+                        self.seguras_recientes.remove(location)
+                for observador in self.observadores:
+                    observador(location, segura)
+
+    @property
+    def num_seguras(self):
+        return len(self.capa_segura)
+
+    def es_segura(self, location):
+        """ Sin pozo y sin Wumpus. """
+        return location in self.capa_segura
+
+    def sin_pozo(self, location):
+        return location in self.capa_sin_pozo
+
+    def sin_wumpus(self, location):
+        return location in self.capa_sin_wumpus
+
+    def hay_peligro(self, location):
+        return location in self.capa_peligro
+
+    def celdas_seguras(self):
+        """ Casillas seguras (sin orden), en O(casillas seguras). """
+        return list(self.capa_segura)
+
+# -----------------------------------------------------------------------------
+# FRONTERA DE EXPLORACIÓN
+# -----------------------------------------------------------------------------
+class Frontera:
+    """
+    Casillas seguras sin visitar adyacentes a alguna visitada.
+
+    Se mantiene con los avisos del mapa de seguridad y del conjunto de
+    visitadas, revisando solo la casilla que cambia y sus vecinas. Cuál está
+    más cerca depende de dónde está el agente, así que eso lo decide el
+    agente al elegir objetivo (ver _accion_hacia_frontera).
+    """
+    __slots__ = ('world', 'seguridad', 'visitadas', 'celdas')
+
+    def __init__(self, world, seguridad, visitadas):
+        self.world = world
+        self.seguridad = seguridad
+        self.visitadas = visitadas
+        self.celdas = set()
+        seguridad.observadores.append(self._cambio_seguridad)
+        visitadas.observadores.append(self._cambio_visita)
+        for cell in list(visitadas):
+            self._cambio_visita(True, cell)
+
+    def _revisar(self, cell):
+        candidata = (cell not in self.visitadas and self.seguridad.es_segura(cell)
+                     and any(n in self.visitadas for n in self.world.get_neighbors(*cell)))
+        if candidata:
+            self.celdas.add(cell)
+        else:
+            self.celdas.discard(cell)
+
+    def _cambio_seguridad(self, cell, segura):
+        self._revisar(cell)
+
+    def _cambio_visita(self, added, cell):
+        self._revisar(cell)
+        for n in self.world.get_neighbors(*cell):
+            self._revisar(n)
+
+    def __len__(self):
+        return len(self.celdas)
+
+    def __contains__(self, cell):
+        return cell in self.celdas
+
+def percentil(valores, p):
+    """ Percentil p (0-100) de una lista de valores por rango más cercano; None si está vacía. """
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    rango = max(1, math.ceil(p / 100.0 * len(ordenados)))
+    return ordenados[rango - 1]
+
+# Lo que el agente recibe del mundo tras cada acción: su casilla y su estado,
+# si queda algún Wumpus vivo (lo que revela el grito), los WorldEvent de la
+# acción y los perceptos de su casilla.
+Observacion = namedtuple('Observacion', ('location', 'alive', 'exited', 'has_gold', 'has_arrow',
+                                         'wumpus_alive', 'events', 'percepts'))
+
+
+def observacion(world, pasos=0, max_steps=None):
+    """
+    Observacion del agente de 'world' tras 'pasos' acciones. Los perceptos
+    son None si el episodio ya no sigue (muerto, fuera o sin pasos): así no
+    se perciben casillas de más.
+    """
+    sigue = (world.agent_is_alive and not world.agent_has_exited
+             and (max_steps is None or pasos < max_steps))
+    return Observacion(world.agent_location, world.agent_is_alive, world.agent_has_exited,
+                       world.agent_has_gold, world.agent_has_arrow, world.wumpus_is_alive,
+                       tuple(world.eventos), world.get_percepts_at(world.agent_location) if sigue else None)
+
+
+def sin_salida(*args, **kwargs):
+    """ Salida de un agente silenciado. """
+
+# Reglas que se omiten en modo degradado (las de pares de premisas, las más caras)
+REGLAS_DEGRADADAS = ('R4', 'R6')
+
+# -----------------------------------------------------------------------------
+# CLASE 3: EL AGENTE LÓGICO
+# - MODIFICADA PARA INCLUIR RETROCESO Y DISPARO MEJORADO -
+# -----------------------------------------------------------------------------
+class LogicalAgent:
+    """
+    El agente que razona sobre el Mundo de Wumpus.
+
+    Del mundo solo usa la geometría del tablero (tamaño, vecinos, celdas).
+    Su propio estado (casilla, vivo, oro, flecha) y lo que ocurre al actuar
+    le llegan en una Observacion por observar(); sus mensajes van a 'log'
+    (print por defecto), que cada agente puede silenciar por su cuenta.
+    """
+    __slots__ = ('world', 'kb', 'location', 'visited_squares', 'path_stack', 'wumpus_killed',
+                 'planificador', 'umbral_riesgo', 'presupuesto_paso', 'modo_degradado',
+                 'retirada', 'latencias', 'pasos_degradados', 'seguridad', 'motor',
+                 'frontera', 'objetivo', 'ruta', 'politica', 'cambios', 'candidatos',
+                 'compactar_kb', 'pozos_archivados', 'azar', 'hash_creencias', 'estados_vistos',
+                 'disparo', 'vivo', 'fuera', 'tiene_oro', 'tiene_flecha', 'quedan_wumpus', 'percepts',
+                 'log', 'reloj')
+
+    def __init__(self, world, kb, planificador=None, motor_reglas=False, umbral_riesgo=3,
+                 presupuesto_paso=None, politica=None, inferencia_local=False, compactar_kb=False,
+                 azar=None, detectar_ciclos=False, log=None, reloj=None):
+        self.world = world
+        self.kb = kb
+        self.location = (1, 1) # El agente siempre empieza en (1, 1)
+        self.visited_squares = ConjuntoCeldas(world.celdas) # Casillas (x, y) visitadas
+        self.path_stack = PilaCeldas(world.celdas)  # Pila para realizar backtracking
+        self.wumpus_killed = False  # Para saber si el Wumpus fue eliminado
+        self.disparo = None  # (casilla, dirección) del último disparo, para saber a quién alcanzó
+        # Lo que sabe de sí mismo, al día con cada observar()
+        self.vivo = True
+        self.fuera = False
+        self.tiene_oro = False
+        self.tiene_flecha = True
+        self.quedan_wumpus = True
+        self.percepts = None  # Los de la casilla actual, guardados por procesar_perceptos
+        self.log = print if log is None else log  # Salida de los mensajes, con la firma de print
+        self.planificador = planificador  # Opcional: decide riesgos y disparos por MCTS
+        self.politica = politica  # Opcional: PoliticaOptima precalculada para tableros pequeños
+        self.umbral_riesgo = umbral_riesgo  # Casillas visitadas necesarias antes de arriesgarse
+        # Desempates y retrocesos al azar: el 'random' global salvo que se dé un random.Random propio
+        self.azar = random if azar is None else azar
+
+        # Presupuestos de tiempo: al superar el de un paso se omiten las Reglas 4 y 6
+        # (modo degradado); al agotar el del episodio se vuelve a (1, 1) y se sale.
+        self.presupuesto_paso = presupuesto_paso  # Segundos por paso, None = sin límite
+        self.reloj = time.perf_counter if reloj is None else reloj  # Segundos, para medir los presupuestos
+        self.modo_degradado = False
+        self.retirada = None  # Camino pendiente hasta (1, 1) durante la retirada
+        self.latencias = []   # Segundos de razonamiento de cada paso
+        self.pasos_degradados = 0
+
+        # Seguridad frente a pozos y frente al Wumpus por separado
+        self.seguridad = MapaSeguridad(world.size, kb)
+
+        # Casillas seguras por explorar y el camino en curso hacia la elegida
+        self.frontera = Frontera(world, self.seguridad, self.visited_squares)
+        self.objetivo = None
+        self.ruta = []  # En orden inverso: el siguiente paso está al final
+
+        # Opcional (tableros enormes): cada regla del bucle solo repasa el entorno
+        # de las casillas que han cambiado desde su pasada anterior
+        self.cambios = None
+        self.candidatos = {'Breeze': set(), 'Stench': set()}  # Reglas 4 y 6
+        if inferencia_local and not motor_reglas:
+            self.cambios = CambiosPorCasilla(kb, (2, 3, 4, 5, 6, 7))
+
+        # Opcional (episodios largos, con el bucle completo): tras cada pasada se
+        # archivan las premisas ya resueltas para que las reglas no las repasen
+        self.compactar_kb = compactar_kb and not motor_reglas and not inferencia_local
+        self.pozos_archivados = set()  # Candidatas de la Regla 4 con todas sus brisas archivadas
+
+        # Opcional (agentes que deambulan): estados de creencia (casilla, KB, oro y
+        # flecha) en los que ya se ha decidido; volver a uno es dar vueltas sin aprender nada
+        self.hash_creencias = HashCreencias(kb) if detectar_ciclos else None
+        self.estados_vistos = {}  # Estado -> None, en orden de inserción (ver restaurar)
+
+        # El agente sabe que la casilla (1, 1) es segura al empezar
+        self.kb.tell("No Pit at (1, 1)")
+        self.kb.tell("No Wumpus at (1, 1)")
+        self.visited_squares.add((1, 1))
+        self.path_stack.append((1, 1))  # Comienza en (1, 1)
+
+        # Opcional: las reglas de inferir_seguridad compiladas en una red incremental
+        self.motor = MotorReglas(kb, world, self.visited_squares) if motor_reglas else None
+
+    def instantanea(self):
+        """
+        Estado propio del agente antes de un paso, para volver a él con
+        restaurar(). No incluye la KB, que se deshace con sus puntos de
+        restauración, ni lo que se mantiene a partir de ella y de las
+        visitadas (seguridad, frontera, motor, cambios, hash). Cuesta según
+        los caminos en curso, no según lo que sabe el agente. Durante esos
+        puntos de restauración no se compacta la KB, así que pozos_archivados
+        no cambia.
+        """
+        return (self.location, self.location not in self.visited_squares,
+                len(self.path_stack), self.path_stack.ultima(),
+                self.wumpus_killed, self.disparo, self.vivo, self.fuera, self.tiene_oro,
+                self.tiene_flecha, self.quedan_wumpus, self.percepts, self.modo_degradado,
+                None if self.retirada is None else list(self.retirada), self.objetivo,
+                list(self.ruta), len(self.latencias), self.pasos_degradados, len(self.estados_vistos),
+                copy.copy(self.politica))
+
+    def restaurar(self, instantanea):
+        """ Vuelve al estado de instantanea() (con la KB ya devuelta a ese momento). """
+        (location, nueva, pila, cima, self.wumpus_killed, self.disparo, self.vivo, self.fuera,
+         self.tiene_oro, self.tiene_flecha, self.quedan_wumpus, self.percepts, self.modo_degradado,
+         self.retirada, self.objetivo, self.ruta, latencias, self.pasos_degradados, vistos,
+         self.politica) = instantanea
+        if nueva:
+            self.visited_squares.discard(location)
+        self.location = location
+        # En un paso se apila o se desapila como mucho una casilla
+        while len(self.path_stack) > pila:
+            self.path_stack.pop()
+        if len(self.path_stack) < pila:
+            self.path_stack.append(cima)
+        del self.latencias[latencias:]
+        while len(self.estados_vistos) > vistos:
+            self.estados_vistos.popitem()
+
+    def observar(self, observacion):
+        """
+        Pone al día el estado del agente con una Observacion (ver observacion())
+        y procesa sus eventos: el grito y el oro recogido cambian lo que se sabía.
+        Los perceptos se guardan aparte, con procesar_perceptos.
+        """
+        self.location = observacion.location
+        self.vivo = observacion.alive
+        self.fuera = observacion.exited
+        self.tiene_oro = observacion.has_gold
+        self.tiene_flecha = observacion.has_arrow
+        self.quedan_wumpus = observacion.wumpus_alive
+        for event in observacion.events:
+            self._al_evento(event)
+
+    def _al_evento(self, event):
+        """ Actualiza la KB con los eventos del mundo que cambian lo que se sabía. """
+        hecho = self.world.celdas.hecho
+        if event.kind == SCREAM:
+            self.wumpus_killed = True
+            if not self.quedan_wumpus:
+                # Sin Wumpus no hay hedor: al retirar cada "Stench at" la KB retira
+                # también lo que solo se deducía de él ("Wumpus at", "Danger at")
+                for fact in self.kb.get_facts_starting_with("Stench at"):
+                    self.kb.retract(fact)
+                    self.kb.tell(hecho("No Stench", parse_fact(fact)[1]))
+                for fact in self.kb.get_facts_starting_with("Wumpus at"):
+                    self.kb.retract(fact)
+            else:
+                # Quedan otros: cada hedor puede ser suyo, así que solo se retira
+                # el Wumpus abatido (y en cascada lo deducido de él). Las casillas
+                # que ya no huelen se corrigen al volver a percibirlas.
+                celdas, seguro = self._wumpus_abatido()
+                for cell in celdas:
+                    self.kb.retract(hecho("Wumpus", cell))
+                if seguro:
+                    self.kb.tell(hecho("No Wumpus", celdas[0]))
+        elif event.kind == GOLD_GRABBED:
+            self.kb.retract(hecho("Glitter", event.location))
+
+    def _wumpus_abatido(self):
+        """
+        (casillas, seguro): las casillas con "Wumpus at" en la línea del
+        último disparo, y si se sabe cuál cayó. Si la primera solo tiene
+        delante casillas sin Wumpus, fue ella (y es la única devuelta); si
+        no, pudo caer otro que no se conocía, y se devuelven todas para que
+        se vuelvan a deducir desde los hedores.
+        """
+        if self.disparo is None:
+            return [], False
+        (x, y), (dx, dy) = self.disparo
+        hecho = self.world.celdas.hecho
+        celdas, despejado = [], True
+        x, y = x + dx, y + dy
+        while self.world._is_valid_location(x, y):
+            if self.kb.ask(hecho("Wumpus", (x, y))):
+                if despejado and not celdas:
+                    return [(x, y)], True
+                celdas.append((x, y))
+            elif not self.seguridad.sin_wumpus((x, y)):
+                despejado = False
+            x, y = x + dx, y + dy
+        return celdas, False
+
+    def procesar_perceptos(self, percepts):
+        """
+        Procesa los perceptos de la casilla actual y actualiza la KB.
+        Este es el paso 'TELL'.
+        """
+        x, y = self.location
+        hecho = self.world.celdas.hecho
+        self.percepts = percepts
+
+        # Solo registrar brisa/hedor si no los hemos registrado antes
+        current_breeze = hecho("Breeze", self.location)
+        current_no_breeze = hecho("No Breeze", self.location)
+        current_stench = hecho("Stench", self.location)
+        current_no_stench = hecho("No Stench", self.location)
+
+        if percepts['breeze']:
+            if not self.kb.ask(current_breeze):
+                self.kb.tell(current_breeze)
+                self.log(f"DEBUG: Registrada brisa en ({x}, {y})")
+        else:
+            if not self.kb.ask(current_no_breeze):
+                self.kb.tell(current_no_breeze)
+                self.log(f"DEBUG: Registrada NO brisa en ({x}, {y})")
+
+        if percepts['stench']:
+            if not self.kb.ask(current_stench):
+                self.kb.tell(current_stench)
+                self.log(f"DEBUG: Registrado hedor en ({x}, {y})")
+        else:
+            if self.kb.ask(current_stench):
+                # Hedor de un Wumpus ya abatido (con varios no se retira al oír el grito)
+                self.kb.retract(current_stench)
+            if not self.kb.ask(current_no_stench):
+                self.kb.tell(current_no_stench)
+                self.log(f"DEBUG: Registrado NO hedor en ({x}, {y})")
+
+        # Siempre registrar brillo si está presente
+        if percepts['glitter']:
+            self.kb.tell(hecho("Glitter", self.location))
+
+    def inferir_seguridad(self):
+        """
+        Aplica reglas lógicas simples para deducir qué casillas son seguras.
+        Este es el paso de 'INFERENCIA'.
+        """
+
+        # Con motor de reglas, las mismas reglas se propagan solo por los hechos nuevos
+        if self.motor is not None:
+            omitir = REGLAS_DEGRADADAS if self.modo_degradado else ()
+            self.motor.inferir(self.location, self.vivo, omitir)
+            return
+
+        if self.cambios is not None:
+            self._inferir_local()
+            return
+
+        hecho = self.world.celdas.hecho
+
+        # Regla 1: Las casillas visitadas no tienen pozo ni Wumpus (compactando,
+        # las anteriores ya lo saben: basta con la actual)
+        for location in ((self.location,) if self.compactar_kb else self.visited_squares):
+            if self.vivo:
+                self.kb.tell(hecho("No Pit", location))
+                self.kb.tell(hecho("No Wumpus", location))
+
+        # Regla 2: Si no hay hedor, los vecinos son seguros del Wumpus
+        no_stench_facts = self.kb.get_active_facts_starting_with("No Stench at")
+        for fact in no_stench_facts:
+            x, y = eval(fact.split(' at ')[1])
+            for n in self.world.get_neighbors(x, y):
+                self.kb.tell(hecho("No Wumpus", n), (fact,))
+                    
+        # -------------------------------------------------------------------------
+        # REGLAS  PARA INFERIR PELIGRO
+        # -------------------------------------------------------------------------
+            
+        # Regla 3: Si hay brisa, algun vecino tiene pozo
+        breeze_facts = self.kb.get_active_facts_starting_with("Breeze at")
+        
+        # Primero, identificar todas las casillas con brisa
+        breeze_locations = [eval(fact.split(' at ')[1]) for fact in breeze_facts]
+        
+        for fact, breeze_loc in zip(breeze_facts, breeze_locations):
+            x, y = breeze_loc
+            neighbors = self.world.get_neighbors(x, y)
+            
+            # Filtrar vecinos que ya sabemos que no tienen pozo
+            unsafe_neighbors = [n for n in neighbors if not self.seguridad.sin_pozo(n)]
+            
+            # Si solo hay un vecino no seguro, debe ser un pozo
+            if len(unsafe_neighbors) == 1:
+                dangerous = unsafe_neighbors[0]
+                because = [fact] + [hecho("No Pit", n) for n in neighbors if n != dangerous]
+                self.kb.tell(f"Danger at {dangerous}", because)
+                self.kb.tell(f"Pit at {dangerous}", because)
+                self.log(f"DEBUG: Pozo inferido en {dangerous} por brisa en {breeze_loc}")
+
+        # Regla 4: Inferencia mejorada para múltiples brisas (no en modo degradado)
+        if self.compactar_kb:
+            if not self.modo_degradado:
+                self._regla4_compactada(breeze_locations)
+        elif len(breeze_locations) >= 2 and not self.modo_degradado:
+            # Buscar intersecciones de vecinos entre casillas con brisa
+            possible_pit_locations = set()
+            
+            for i, loc1 in enumerate(breeze_locations):
+                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
+                for j, loc2 in enumerate(breeze_locations):
+                    if i != j:
+                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
+                        intersection = neighbors1.intersection(neighbors2)
+                        # Solo considerar intersecciones que pueden tener pozo
+                        intersection = [loc for loc in intersection if not self.seguridad.sin_pozo(loc)]
+                        possible_pit_locations.update(intersection)
+            
+            # Si hay una única ubicación posible para el pozo, inferirla
+            if len(possible_pit_locations) == 1:
+                pit_loc = list(possible_pit_locations)[0]
+                self.kb.tell(f"Danger at {pit_loc}", breeze_facts)
+                self.kb.tell(f"Pit at {pit_loc}", breeze_facts)
+                self.log(f"DEBUG: Pozo inferido en {pit_loc} por múltiples brisas")
+
+        # Regla 5: Si hay hedor, algun vecino tiene Wumpus  
+        stench_facts = self.kb.get_active_facts_starting_with("Stench at")
+        for fact in stench_facts:
+            x, y = eval(fact.split(' at ')[1])
+            neighbors = self.world.get_neighbors(x, y)
+                
+            # Si todos los vecinos excepto uno están libres de Wumpus, el restante lo tiene
+            safe_neighbors = [n for n in neighbors if self.seguridad.sin_wumpus(n)]
+            if len(safe_neighbors) == len(neighbors) - 1:
+                wumpus_location = [n for n in neighbors if n not in safe_neighbors][0]
+                because = [fact] + [hecho("No Wumpus", n) for n in safe_neighbors]
+                self.kb.tell(f"Wumpus at {wumpus_location}", because)
+                self.kb.tell(f"Danger at {wumpus_location}", because)
+        
+        # Regla 6: Inferencia mejorada para múltiples hedores (no en modo degradado)
+        if len(stench_facts) >= 2 and not self.modo_degradado:
+            stench_locations = [eval(fact.split(' at ')[1]) for fact in stench_facts]
+            possible_wumpus_locations = set()
+            
+            # Encontrar intersección de vecinos de todas las casillas con hedor
+            for i, loc1 in enumerate(stench_locations):
+                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
+                for j, loc2 in enumerate(stench_locations):
+                    if i != j:
+                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
+                        intersection = neighbors1.intersection(neighbors2)
+                        possible_wumpus_locations.update(intersection)
+            
+            # Si solo hay una ubicación posible, es el Wumpus
+            possible_wumpus_locations = [loc for loc in possible_wumpus_locations 
+                                    if not self.seguridad.sin_wumpus(loc)]
+            
+            if len(possible_wumpus_locations) == 1:
+                wumpus_loc = possible_wumpus_locations[0]
+                self.kb.tell(f"Wumpus at {wumpus_loc}", stench_facts)
+                self.kb.tell(f"Danger at {wumpus_loc}", stench_facts)
+                self.log(f"DEBUG: Wumpus inferido en {wumpus_loc} por múltiples hedores")
+
+        # Regla 7: Si no hay brisa, todos los vecinos son seguros de pozos
+        no_breeze_facts = self.kb.get_active_facts_starting_with("No Breeze at")
+        for fact in no_breeze_facts:
+            x, y = eval(fact.split(' at ')[1])
+            for n in self.world.get_neighbors(x, y):
+                self.kb.tell(hecho("No Pit", n), (fact,))
+                        
+        if self.compactar_kb:
+            self._compactar()
+
+        # Ver qué peligros se detectaron: por predicado, sin recorrer toda la KB
+        # (y sin confundir "No Pit at" con "Pit at")
+        danger_facts = self.kb.get_facts_starting_with("Danger at")
+        wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
+        pit_facts = self.kb.get_facts_starting_with("Pit at")
+
+        if danger_facts:
+            self.log(f"DEBUG: Peligros inferidos: {danger_facts}")
+        if wumpus_facts:
+            self.log(f"DEBUG: Wumpus inferido en: {wumpus_facts}")
+        if pit_facts:
+            self.log(f"DEBUG: Pozos inferidos en: {pit_facts}")
+
+    def _regla4_compactada(self, breeze_locations):
+        """
+        Regla 4 con brisas archivadas. Las candidatas son las casillas que
+        aún pueden tener pozo con dos o más vecinas con brisa: las que tienen
+        alguna brisa activa se buscan alrededor de ellas, y las demás (todas
+        sus brisas archivadas) están en pozos_archivados. El resultado es el
+        mismo que con todas las brisas, con un coste proporcional a las activas.
+        """
+        kb = self.kb
+        hecho = self.world.celdas.hecho
+        get_neighbors = self.world.get_neighbors
+        sin_pozo = self.seguridad.sin_pozo
+
+        possible_pit_locations = {c for c in self.pozos_archivados if not sin_pozo(c)}
+        for loc in breeze_locations:
+            for n in get_neighbors(*loc):
+                if (n not in possible_pit_locations and not sin_pozo(n)
+                        and sum(kb.ask(hecho("Breeze", m)) for m in get_neighbors(*n)) >= 2):
+                    possible_pit_locations.add(n)
+
+        if len(possible_pit_locations) == 1:
+            pit_loc = possible_pit_locations.pop()
+            because = set(kb.get_active_facts_starting_with("Breeze at"))
+            because.update(f for f in (hecho("Breeze", m) for m in get_neighbors(*pit_loc)) if kb.ask(f))
+            because = sorted(because)
+            kb.tell(f"Danger at {pit_loc}", because)
+            kb.tell(f"Pit at {pit_loc}", because)
+            self.log(f"DEBUG: Pozo inferido en {pit_loc} por múltiples brisas")
+
+    def _compactar(self):
+        """
+        Archiva en la KB las premisas que ya no pueden dar conclusiones nuevas:
+        - "No Breeze at" y "No Stench at", en cuanto las Reglas 7 y 2 han dicho
+          lo que implican (sus conclusiones no se retiran).
+        - "Breeze at" con todas las vecinas sin pozo o con pozo ya deducido:
+          la Regla 3 ya no concluiría nada nuevo. Su aportación a la Regla 4
+          se conserva en pozos_archivados.
+        Los "Stench at" no se archivan: el grito los retira y con ellos los
+        "Wumpus at" deducidos. Durante una hipótesis no se archiva nada.
+        """
+        kb = self.kb
+        if kb.open_snapshots():
+            return
+        hecho = self.world.celdas.hecho
+        get_neighbors = self.world.get_neighbors
+        sin_pozo = self.seguridad.sin_pozo
+
+        for prefix in ("No Breeze at", "No Stench at"):
+            for fact in kb.get_active_facts_starting_with(prefix):
+                kb.archive(fact)
+
+        for fact in kb.get_active_facts_starting_with("Breeze at"):
+            vecinos = get_neighbors(*parse_fact(fact)[1])
+            if not all(sin_pozo(n) or kb.ask(hecho("Pit", n)) for n in vecinos):
+                continue
+            kb.archive(fact)
+            for n in vecinos:
+                if sin_pozo(n):
+                    continue
+                brisas = [f for f in (hecho("Breeze", m) for m in get_neighbors(*n)) if kb.ask(f)]
+                if len(brisas) >= 2 and all(kb.is_archived(f) for f in brisas):
+                    self.pozos_archivados.add(n)
+
+    def _inferir_local(self):
+        """
+        Las reglas de inferir_seguridad repasando solo lo que ha cambiado.
+        Cada regla depende de los hechos de una casilla y de los de sus
+        vecinas, así que fuera del entorno de las casillas cambiadas desde su
+        pasada anterior repetiría las mismas conclusiones. Las Reglas 4 y 6
+        llevan el conjunto de casillas con dos o más vecinas con brisa (hedor)
+        que aún pueden tener pozo (Wumpus) y concluyen cuando solo queda una.
+        Deduce los mismos hechos que el bucle completo con un coste que
+        depende de lo que cambia en cada paso, no del tamaño de la KB.
+        """
+        kb, cambios = self.kb, self.cambios
+        hecho = self.world.celdas.hecho
+        get_neighbors = self.world.get_neighbors
+
+        # Regla 1: en las visitadas antes ya se aplicó; basta con la actual
+        if self.vivo:
+            kb.tell(hecho("No Pit", self.location))
+            kb.tell(hecho("No Wumpus", self.location))
+
+        # Regla 2: Si no hay hedor, los vecinos son seguros del Wumpus
+        for cell in cambios.casillas(2):
+            fact = hecho("No Stench", cell)
+            if kb.ask(fact):
+                for n in get_neighbors(*cell):
+                    kb.tell(hecho("No Wumpus", n), (fact,))
+
+        # Regla 3: Si hay brisa y solo un vecino puede tener pozo, lo tiene
+        for cell in self._entorno(cambios.casillas(3)):
+            fact = hecho("Breeze", cell)
+            if not kb.ask(fact):
+                continue
+            neighbors = get_neighbors(*cell)
+            unsafe_neighbors = [n for n in neighbors if not self.seguridad.sin_pozo(n)]
+            if len(unsafe_neighbors) == 1:
+                dangerous = unsafe_neighbors[0]
+                because = [fact] + [hecho("No Pit", n) for n in neighbors if n != dangerous]
+                kb.tell(f"Danger at {dangerous}", because)
+                kb.tell(f"Pit at {dangerous}", because)
+                self.log(f"DEBUG: Pozo inferido en {dangerous} por brisa en {cell}")
+
+        # Regla 4: Única casilla posible para un pozo entre varias brisas
+        if self.modo_degradado:
+            cambios.descartar(4)
+        else:
+            pit_loc = self._candidato_unico("Breeze", cambios.casillas(4), self.seguridad.sin_pozo)
+            if pit_loc is not None:
+                breeze_facts = kb.get_facts_starting_with("Breeze at")
+                kb.tell(f"Danger at {pit_loc}", breeze_facts)
+                kb.tell(f"Pit at {pit_loc}", breeze_facts)
+                self.log(f"DEBUG: Pozo inferido en {pit_loc} por múltiples brisas")
+
+        # Regla 5: Si hay hedor y todos los vecinos menos uno están libres de Wumpus, ese lo tiene
+        for cell in self._entorno(cambios.casillas(5)):
+            fact = hecho("Stench", cell)
+            if not kb.ask(fact):
+                continue
+            neighbors = get_neighbors(*cell)
+            safe_neighbors = [n for n in neighbors if self.seguridad.sin_wumpus(n)]
+            if len(safe_neighbors) == len(neighbors) - 1:
+                wumpus_location = [n for n in neighbors if n not in safe_neighbors][0]
+                because = [fact] + [hecho("No Wumpus", n) for n in safe_neighbors]
+                kb.tell(f"Wumpus at {wumpus_location}", because)
+                kb.tell(f"Danger at {wumpus_location}", because)
+
+        # Regla 6: Única casilla posible para el Wumpus entre varios hedores
+        if self.modo_degradado:
+            cambios.descartar(6)
+        else:
+            wumpus_loc = self._candidato_unico("Stench", cambios.casillas(6), self.seguridad.sin_wumpus)
+            if wumpus_loc is not None:
+                stench_facts = kb.get_facts_starting_with("Stench at")
+                kb.tell(f"Wumpus at {wumpus_loc}", stench_facts)
+                kb.tell(f"Danger at {wumpus_loc}", stench_facts)
+                self.log(f"DEBUG: Wumpus inferido en {wumpus_loc} por múltiples hedores")
+
+        # Regla 7: Si no hay brisa, todos los vecinos son seguros de pozos
+        for cell in cambios.casillas(7):
+            fact = hecho("No Breeze", cell)
+            if kb.ask(fact):
+                for n in get_neighbors(*cell):
+                    kb.tell(hecho("No Pit", n), (fact,))
+
+        cambios.compactar()
+
+    def _entorno(self, casillas):
+        """ Las casillas dadas y sus vecinas. """
+        entorno = set(casillas)
+        for cell in casillas:
+            entorno.update(self.world.get_neighbors(*cell))
+        return entorno
+
+    def _candidato_unico(self, pred, cambiadas, descartada):
+        """
+        Revisa en el entorno de 'cambiadas' qué casillas tienen dos o más
+        vecinas con 'pred' y no están descartadas, y devuelve la única de
+        todo el tablero, o None si no hay exactamente una.
+        """
+        hecho = self.world.celdas.hecho
+        get_neighbors = self.world.get_neighbors
+        candidatos = self.candidatos[pred]
+        for cell in self._entorno(cambiadas):
+            if (not descartada(cell)
+                    and sum(self.kb.ask(hecho(pred, n)) for n in get_neighbors(*cell)) >= 2):
+                candidatos.add(cell)
+            else:
+                candidatos.discard(cell)
+        return next(iter(candidatos)) if len(candidatos) == 1 else None
+
+    def elegir_accion(self):
+        """
+        Decide qué acción tomar basándose en la KB.
+        Este es el paso 'ASK' y 'ACTÚA'.
+        """
+
+        # 1. Si hay "Brillo" (Glitter), toma el oro.
+        if self.kb.ask(f"Glitter at {self.location}"):
+            return GRAB_GOLD
+
+        # 2. Si tiene el oro y está en (1, 1), sal.
+        if self.tiene_oro and self.location == (1, 1):
+            return CLIMB_OUT
+
+        # Con una política precalculada, decide ella mientras la creencia esté en su tabla
+        if self.politica is not None:
+            action = self.politica.elegir_para(self)
+            if action is not None:
+                return action
+
+        # Si ya estuvo aquí sabiendo lo mismo, no repetir la misma deambulación
+        if self.hash_creencias is not None:
+            estado = self.hash_creencias.estado(self.location, self.tiene_oro,
+                                                self.tiene_flecha)
+            if estado in self.estados_vistos:
+                action = self._salir_del_ciclo()
+                if action is not None:
+                    return action
+            else:
+                self.estados_vistos[estado] = None
+
+        vecinos = self.world.get_neighbors(self.location[0], self.location[1])
+
+        acciones_posibles = [a for a in MOVE_ACTIONS if self._is_valid_and_get_action(a)]
+        
+        # Lógica más para disparar flechas (con planificador, la decide la búsqueda)
+        if self.tiene_flecha and self.planificador is None:
+            # Opción 1: Si se sabe exactamente dónde está el Wumpus, disparar
+            wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
+            if wumpus_facts:
+                wumpus_location = eval(wumpus_facts[0].split(' at ')[1])
+                # Disparar si está en la misma fila o columna
+                shot = self._shoot_towards(wumpus_location)
+                if shot is not None:
+                    return shot
+            
+            # Opción 2: Si el hedor persiste, considerar disparar
+            stench_facts = self.kb.get_facts_starting_with("Stench at")
+            if len(stench_facts) >= 2:  # Solo disparar si hay múltiples hedores
+                self.log("DEBUG: Hedor persistente detectado, considerando disparar...")
+                
+                # Obtener vecinos no visitados y peligrosos
+                vecinos_no_visitados = [v for v in vecinos if v not in self.visited_squares]
+                vecinos_peligrosos = [v for v in vecinos_no_visitados if self.seguridad.hay_peligro(v)]
+                
+                if vecinos_peligrosos:
+                    target = vecinos_peligrosos[0]
+                    self.log(f"DEBUG: Disparando hacia vecino peligroso: {target}")
+                    return self._shoot_towards(target)
+
+        self.azar.shuffle(acciones_posibles) # Para evitar bucles entre dos casillas
+
+        # Clasificar acciones por seguridad
+        acciones_seguras_no_visitadas = []
+        acciones_seguras_visitadas = []
+        acciones_riesgosas = []
+        acciones_inciertas = []
+
+        for action in acciones_posibles:
+            vecino = self._get_target_location(action)
+            
+            # EVITAR casillas peligrosas confirmadas
+            if self.seguridad.hay_peligro(vecino):
+                continue
+
+            # Clasificar por nivel de seguridad
+            if self.seguridad.es_segura(vecino):
+                if vecino not in self.visited_squares:
+                    acciones_seguras_no_visitadas.append(action)
+                else:
+                    acciones_seguras_visitadas.append(action)
+            else:
+                acciones_inciertas.append(action)
+                # NUEVO: Solo considerar riesgosas si no hay brisa actual
+                if not self.percepts['breeze']:
+                    acciones_riesgosas.append(action)
+
+        # Decidir basado en la prioridad
+        if acciones_seguras_no_visitadas:
+            self.path_stack.append(self.location)
+            return self.azar.choice(acciones_seguras_no_visitadas)
+        elif self.planificador is not None:
+            return self._decidir_con_planificador(acciones_seguras_visitadas, acciones_inciertas)
+
+        # Sin vecinas seguras nuevas: ir por casillas visitadas hacia la frontera
+        hacia_frontera = self._accion_hacia_frontera()
+        if hacia_frontera is not None:
+            self.path_stack.append(self.location)
+            return hacia_frontera
+
+        if acciones_seguras_visitadas:
+            self.path_stack.append(self.location)
+            return self.azar.choice(acciones_seguras_visitadas)
+        elif acciones_riesgosas and len(self.visited_squares) > self.umbral_riesgo:
+            # Solo considerar movimientos riesgosos si hemos explorado suficiente
+            # y no hay brisa en la ubicación actual
+            if not self.percepts['breeze']:
+                self.log(f"DEBUG: Considerando movimiento riesgoso (sin brisa actual)")
+                self.path_stack.append(self.location)
+                return self.azar.choice(acciones_riesgosas)
+        else:
+            # Realizar backtracking si no hay movimientos seguros
+            if len(self.path_stack) > 1:
+                previous_location = self.path_stack.pop()
+                return self._get_backtrack_action(previous_location)
+            else:
+                # No hay ningún lugar seguro conocido a donde ir.
+                return CLIMB_OUT
+
+    def _salir_del_ciclo(self):
+        """
+        Estrategia determinista al repetirse un estado de creencia: ir a la
+        frontera segura si la hay; si no, a la casilla visitada más cercana
+        desde la que se dispararía (None al llegar, para que dispare la lógica
+        normal); y si tampoco, volver a (1, 1) y salir.
+        """
+        action = self._accion_hacia_frontera()
+        if action is not None:
+            self.path_stack.append(self.location)
+            return action
+
+        destinos = self._casillas_de_disparo()
+        if self.location in destinos:
+            return None
+        camino = self._camino_por_visitadas(destinos) if destinos else None
+        if camino:
+            return self._get_backtrack_action(camino[-1])
+
+        self.iniciar_retirada("Estado de creencia repetido")
+        return self._accion_retirada()
+
+    def _casillas_de_disparo(self):
+        """ Casillas visitadas en las que elegir_accion dispararía (mismas condiciones). """
+        if not self.tiene_flecha or self.planificador is not None:
+            return set()
+        wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
+        if wumpus_facts:
+            wx, wy = parse_fact(wumpus_facts[0])[1]
+            return {c for c in self.visited_squares if (c[0] == wx) != (c[1] == wy)}
+        if len(self.kb.get_facts_starting_with("Stench at")) < 2:
+            return set()
+        return {c for c in self.visited_squares
+                if any(n not in self.visited_squares and self.seguridad.hay_peligro(n)
+                       for n in self.world.get_neighbors(c[0], c[1]))}
+
+    def decidir(self):
+        """
+        Paso de razonamiento completo (INFERENCIA + ASK) dentro del presupuesto.
+        Anota la latencia del paso y, si supera presupuesto_paso, pasa al modo
+        degradado para el resto del episodio. En retirada no se razona: se
+        sigue el camino ya calculado hasta (1, 1).
+        """
+        inicio = self.reloj()
+        if self.retirada is not None:
+            action = self._accion_retirada()
+        else:
+            self.inferir_seguridad()
+            action = self.elegir_accion()
+        if action in SHOOT_ACTIONS:
+            self.disparo = (self.location, ACTION_DELTA[action])
+        latencia = self.reloj() - inicio
+
+        self.latencias.append(latencia)
+        if self.modo_degradado:
+            self.pasos_degradados += 1
+        elif self.presupuesto_paso is not None and latencia > self.presupuesto_paso:
+            self.log(f"DEBUG: Paso de {latencia * 1000:.1f} ms, se omiten las reglas {REGLAS_DEGRADADAS}")
+            self.modo_degradado = True
+        return action
+
+    def _camino_por_visitadas(self, destino):
+        """
+        Camino más corto hasta 'destino' (una casilla o un conjunto de ellas,
+        y entonces hasta la más cercana) pasando solo por casillas visitadas
+        (el destino puede no estarlo), en orden inverso: el siguiente paso
+        está al final. None si no hay camino.
+        """
+        destinos = destino if isinstance(destino, (set, frozenset)) else {destino}
+        previo = {self.location: None}
+        cola = deque([self.location])
+        destino = None
+        while cola:
+            cell = cola.popleft()
+            if cell in destinos:
+                destino = cell
+                break
+            for n in self.world.get_neighbors(cell[0], cell[1]):
+                if n not in previo and (n in self.visited_squares or n in destinos):
+                    previo[n] = cell
+                    cola.append(n)
+        if destino is None:
+            return None
+        camino = []
+        cell = destino
+        while cell != self.location:
+            camino.append(cell)
+            cell = previo[cell]
+        return camino
+
+    def _accion_hacia_frontera(self):
+        """
+        Siguiente paso hacia la casilla de la frontera más cercana al agente
+        (por casillas visitadas), o None.
+
+        El objetivo y su camino salen de una sola búsqueda en anchura con
+        toda la frontera como destino, que cuesta O(visitadas). Se repite
+        solo al elegir objetivo: cuando el actual deja la frontera (visitado
+        o ya no seguro) o el camino ya no sale de la casilla actual; mientras
+        tanto cada paso es O(1).
+        """
+        vecinos = self.world.get_neighbors(self.location[0], self.location[1])
+        if (self.objetivo not in self.frontera or self.seguridad.hay_peligro(self.objetivo)
+                or not self.ruta or self.ruta[-1] not in vecinos):
+            destinos = {c for c in self.frontera.celdas if not self.seguridad.hay_peligro(c)}
+            self.ruta = (self._camino_por_visitadas(destinos) if destinos else None) or []
+            self.objetivo = self.ruta[0] if self.ruta else None
+        if not self.ruta:
+            return None
+        return self._get_backtrack_action(self.ruta.pop())
+
+    def iniciar_retirada(self, motivo="Presupuesto del episodio agotado"):
+        """ Calcula una vez el camino más corto a (1, 1) por casillas visitadas. """
+        self.retirada = self._camino_por_visitadas((1, 1)) or []
+        self.log(f"DEBUG: {motivo}, retirada en {len(self.retirada)} pasos")
+
+    def _accion_retirada(self):
+        while self.retirada and self.retirada[-1] == self.location:
+            self.retirada.pop()
+        if not self.retirada:
+            return CLIMB_OUT
+        return self._get_backtrack_action(self.retirada.pop())
+
+    def anticipar(self, location, percepts):
+        """
+        Evalúa qué deduciría el agente si estuviera en 'location' y recibiera
+        'percepts', sin alterar la KB ni su propio estado.
+        Devuelve (hechos_nuevos, hechos_eliminados). El coste de deshacer la
+        hipótesis es proporcional a los cambios, no al tamaño de la KB.
+        """
+        previous_location, previous_percepts = self.location, self.percepts
+        was_visited = location in self.visited_squares
+        marcas = self.cambios.guardar() if self.cambios is not None else None
+        snapshot = self.kb.snapshot()
+        try:
+            self.location = location
+            self.visited_squares.add(location)
+            self.procesar_perceptos(percepts)
+            self.inferir_seguridad()
+            return self.kb.changes_since(snapshot)
+        finally:
+            self.kb.rollback(snapshot)
+            if marcas is not None:
+                self.cambios.restaurar(marcas)
+            self.location, self.percepts = previous_location, previous_percepts
+            if not was_visited:
+                self.visited_squares.discard(location)
+
+    def _decidir_con_planificador(self, acciones_seguras_visitadas, acciones_inciertas):
+        """
+        Sin movimientos seguros nuevos, el planificador elige entre arriesgarse,
+        disparar, retroceder por casillas seguras o salir.
+        """
+        candidatas = acciones_inciertas + acciones_seguras_visitadas
+        if self.tiene_flecha and self.kb.get_facts_starting_with("Stench at"):
+            for move, shot in zip(MOVE_ACTIONS, SHOOT_ACTIONS):
+                if self._is_valid_and_get_action(move):
+                    candidatas.append(shot)
+        if self.location == (1, 1):
+            candidatas.append(CLIMB_OUT)
+        if not candidatas:
+            return CLIMB_OUT
+
+        action = self.planificador.elegir_para(self, candidatas)
+        if action in acciones_inciertas or action in acciones_seguras_visitadas:
+            self.path_stack.append(self.location)
+        return action
+
+    def _get_backtrack_action(self, target_location):
+        """Determina la acción para retroceder a una ubicación anterior"""
+        x, y = self.location
+        tx, ty = target_location
+
+        move = MOVE_BY_DELTA.get((tx - x, ty - y))
+        if move is not None:
+            return move
+        # Si no es un movimiento directo, elegir una dirección aleatoria
+        acciones = [a for a in MOVE_ACTIONS if self._is_valid_and_get_action(a)]
+        return self.azar.choice(acciones) if acciones else CLIMB_OUT
+
+    def _shoot_towards(self, target):
+        """ Código de disparo hacia 'target' si está en la misma fila o columna, o None. """
+        x, y = self.location
+        tx, ty = target
+        if (tx == x) == (ty == y):
+            return None
+        delta = ((tx > x) - (tx < x), (ty > y) - (ty < y))
+        return SHOOT_ACTIONS[MOVE_BY_DELTA[delta]]
+
+    # --- Métodos Ayudantes ---
+
+    def _is_valid_and_get_action(self, action):
+        """ Comprueba si el movimiento 'action' deja al agente dentro del tablero. """
+        x, y = self.location
+        dx, dy = ACTION_DELTA[action]
+        return self.world._is_valid_location(x + dx, y + dy)
+
+    def _get_target_location(self, action):
+        x, y = self.location
+        dx, dy = ACTION_DELTA[action]
+        return (x + dx, y + dy)
+
+    def run_agent(self, max_steps=50, presupuesto_episodio=None):
+        """
+        El ciclo principal del agente: PERCIBE -> PIENSA -> ACTÚA
+        Con presupuesto_episodio (segundos), al agotarlo el agente se retira.
+        Devuelve el número de acciones ejecutadas.
+        """
+        episodio = self.episodio(max_steps, presupuesto_episodio)
+        next(episodio)
+        steps = 0
+        try:
+            action = episodio.send(observacion(self.world, steps, max_steps))
+            while True:
+                result = self.world.execute_action(action)
+                steps += 1
+                action = episodio.send((result, observacion(self.world, steps, max_steps)))
+        except StopIteration as fin:
+            return fin.value
+
+    def episodio(self, max_steps=50, presupuesto_episodio=None):
+        """
+        El ciclo de run_agent como corrutina, sin tocar el mundo: cede cada
+        acción y quien la conduce la ejecuta y le envía el resultado y lo que
+        el agente observa después.
+
+            episodio = agent.episodio(max_steps)
+            next(episodio)
+            action = episodio.send(obs)               # la de la casilla inicial
+            action = episodio.send((resultado, obs))  # tras ejecutar cada acción
+
+        Las observaciones son las de observacion() (con perceptos None si el
+        episodio ya no sigue). Al terminar lanza StopIteration con el número
+        de acciones ejecutadas, como lo que devuelve run_agent.
+
+        El presupuesto_episodio solo cuenta el tiempo del propio agente (de
+        cada reanudación a la siguiente cesión), no el del mundo ni el de
+        otros episodios intercalados con este.
+        """
+        steps = 0
+        reloj = self.reloj
+        consumido = 0.0  # Segundos de razonamiento del agente en el episodio
+        self.log(f"Agente iniciando en {self.location}")
+        obs = yield
+        reanudado = reloj()
+        self.observar(obs)
+
+        for step in range(max_steps):
+            if not self.vivo:
+                self.log("El agente ha muerto. Fin de la simulación.")
+                break
+
+            self.log(f"\n--- Paso {step + 1} ---")
+
+            # 1. PERCIBE
+            percepts = obs.percepts
+            self.visited_squares.add(self.location)
+            self.log(f"Agente está en {self.location}")
+            self.log(f"Agente percibe: {percepts}")
+
+            # 2. PIENSA (TELL e INFERENCIA)
+            # Primero, añade los perceptos actuales a la KB (el brillo incluido)
+            self.procesar_perceptos(percepts)
+
+            if (presupuesto_episodio is not None and self.retirada is None
+                    and consumido + reloj() - reanudado > presupuesto_episodio):
+                self.iniciar_retirada()
+
+            # Segundo, deduce nuevos hechos (seguridad) y 3. DECIDE (ASK)
+            action = self.decidir()
+            self.log(f"Agente decide: {describe_action(action)}")
+
+            # 4. ACTÚA (lo hace quien conduce el episodio)
+            consumido += reloj() - reanudado
+            result, obs = yield action
+            reanudado = reloj()
+            steps += 1
+            self.log(f"Resultado: {result}")
+
+            # El grito y el oro los procesa observar()
+            self.observar(obs)
+            if self.fuera or not self.vivo:
+                break
+        else:
+            self.log("Se alcanzó el límite de pasos.")
+
+        if self.planificador is not None:
+            self.planificador.cerrar()  # Sus procesos no sobreviven al episodio
+        self.log("\n--- Simulación Terminada ---")
+        self.kb.print_facts(self.log)
+        if self.latencias:
+            self.log(f"Latencia por paso: p50 {percentil(self.latencias, 50) * 1000:.2f} ms, "
+                  f"p99 {percentil(self.latencias, 99) * 1000:.2f} ms "
+                  f"({self.pasos_degradados} pasos en modo degradado)")
+        return steps
@@ -0,0 +1,262 @@
+import argparse
+import os
+import random
+import sqlite3
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from wumpus_core import WumpusWorld
+
+# -----------------------------------------------------------------------------
+# CORPUS DE MUNDOS INDEXADO POR DIFICULTAD
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_corpus.py corpus.db --tamanos 4 6 8 --semillas 10000 --procesos 4
+#
+# Cada mundo queda identificado por (size, num_wumpus, pit_probability, semilla):
+# random.seed(semilla) seguido de WumpusWorld(...) lo reconstruye exactamente,
+# así que la base de datos solo guarda la identidad y los rasgos:
+#   pozos           número de pozos
+#   camino_seguro   longitud del camino más corto de (1, 1) al oro sin pisar
+#                   peligros (conociendo el mapa); NULL si no existe
+#   adivinanzas     movimientos arriesgados que necesita un agente de lógica
+#                   perfecta que, cuando no le queda casilla demostrablemente
+#                   segura, se arriesga en una que resulta segura; NULL si el
+#                   oro es inalcanzable
+#   oro_sin_riesgo  1 si el oro se alcanza con 0 adivinanzas
+# Las columnas de rasgos tienen índices, por lo que seleccionar un corte
+# ("todos los 8x8 con exactamente una adivinanza") no recorre el corpus.
+
+
+def _camino_seguro(world):
+    """ Longitud del camino más corto al oro por casillas sin pozo ni Wumpus, o None. """
+    peligros = world.pit_locations | world.wumpus_locations
+    distancias = {(1, 1): 0}
+    cola = deque([(1, 1)])
+    while cola:
+        cell = cola.popleft()
+        if cell == world.gold_location:
+            return distancias[cell]
+        for n in world.get_neighbors(*cell):
+            if n not in peligros and n not in distancias:
+                distancias[n] = distancias[cell] + 1
+                cola.append(n)
+    return None
+
+
+def _puede_cubrir(world, hedores, permitidas, restantes):
+    """ ¿Pueden 'restantes' Wumpus en casillas 'permitidas' explicar todos los 'hedores'? """
+    if not hedores:
+        return True
+    if restantes == 0:
+        return False
+    primero = next(iter(hedores))
+    for n in world.get_neighbors(*primero):
+        if n in permitidas:
+            cubiertos = {h for h in hedores if n in world.get_neighbors(*h)}
+            if _puede_cubrir(world, hedores - cubiertos, permitidas - {n}, restantes - 1):
+                return True
+    return False
+
+
+def _demostrablemente_seguras(world, visitadas, percepciones, candidatas):
+    """
+    Casillas de 'candidatas' que son seguras en todos los mundos compatibles con
+    lo percibido en 'visitadas'. Los pozos son independientes, así que una
+    casilla está libre de pozo solo si es vecina de una casilla sin brisa. Para
+    los Wumpus (hay num_wumpus) se comprueba si algún reparto compatible con
+    los hedores puede poner uno en la casilla.
+    """
+    sin_pozo = set()
+    prohibidas = set(visitadas)  # Casillas donde no puede haber Wumpus
+    hedores = set()
+    for cell in visitadas:
+        breeze, stench = percepciones[cell]
+        if not breeze:
+            sin_pozo.update(world.get_neighbors(*cell))
+        if stench:
+            hedores.add(cell)
+        else:
+            prohibidas.update(world.get_neighbors(*cell))
+
+    num_wumpus = len(world.wumpus_locations)
+    permitidas = {c for c in world.board if c not in prohibidas}
+    seguras = set()
+    for c in candidatas:
+        if c not in sin_pozo:
+            continue
+        if c in prohibidas:
+            seguras.add(c)
+            continue
+        restantes = {h for h in hedores if c not in world.get_neighbors(*h)}
+        if not _puede_cubrir(world, restantes, permitidas - {c}, num_wumpus - 1):
+            seguras.add(c)
+    return seguras
+
+
+def _adivinanzas(world):
+    """ Adivinanzas del agente de lógica perfecta hasta llegar al oro, o None si no llega. """
+    peligros = world.pit_locations | world.wumpus_locations
+    visitadas = set()
+    percepciones = {}
+    pendientes = [(1, 1)]
+    adivinanzas = 0
+    while True:
+        # Explorar todo lo demostrablemente seguro y alcanzable
+        while pendientes:
+            cell = pendientes.pop()
+            if cell in visitadas:
+                continue
+            if cell == world.gold_location:
+                return adivinanzas
+            visitadas.add(cell)
+            p = world.get_percepts_at(cell)
+            percepciones[cell] = (p['breeze'], p['stench'])
+            frontera = {n for v in visitadas for n in world.get_neighbors(*v)} - visitadas
+            pendientes = list(_demostrablemente_seguras(world, visitadas, percepciones, frontera))
+
+        # Sin casillas seguras: arriesgarse en una de la frontera que resulte segura
+        frontera = sorted({n for v in visitadas for n in world.get_neighbors(*v)} - visitadas)
+        salvables = [n for n in frontera if n not in peligros]
+        if not salvables:
+            return None
+        adivinanzas += 1
+        pendientes = [salvables[0]]
+
+
+def rasgos_mundo(world):
+    """ Rasgos de dificultad de un mundo (ver la cabecera del módulo). """
+    adivinanzas = _adivinanzas(world)
+    return {'pozos': len(world.pit_locations),
+            'camino_seguro': _camino_seguro(world),
+            'adivinanzas': adivinanzas,
+            'oro_sin_riesgo': int(adivinanzas == 0)}
+
+
+def crear_mundo(size, num_wumpus, pit_probability, semilla):
+    """ Reconstruye el mundo de una entrada del corpus. """
+    random.seed(semilla)
+    return WumpusWorld(size, num_wumpus=num_wumpus, pit_probability=pit_probability)
+
+
+def _rasgos_de(clave):
+    """ Trabajo de un proceso: rasgos del mundo identificado por 'clave'. """
+    rasgos = rasgos_mundo(crear_mundo(*clave))
+    return clave + (rasgos['pozos'], rasgos['camino_seguro'], rasgos['adivinanzas'],
+                    rasgos['oro_sin_riesgo'])
+
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS mundos (
+    size INTEGER NOT NULL,
+    num_wumpus INTEGER NOT NULL,
+    pit_probability REAL NOT NULL,
+    semilla INTEGER NOT NULL,
+    pozos INTEGER NOT NULL,
+    camino_seguro INTEGER,
+    adivinanzas INTEGER,
+    oro_sin_riesgo INTEGER NOT NULL,
+    PRIMARY KEY (size, num_wumpus, pit_probability, semilla)
+);
+CREATE INDEX IF NOT EXISTS mundos_adivinanzas ON mundos (size, adivinanzas);
+CREATE INDEX IF NOT EXISTS mundos_pozos ON mundos (size, pozos);
+CREATE INDEX IF NOT EXISTS mundos_camino ON mundos (size, camino_seguro);
+CREATE INDEX IF NOT EXISTS mundos_sin_riesgo ON mundos (size, oro_sin_riesgo);
+"""
+
+_FILTROS = ('size', 'num_wumpus', 'pit_probability', 'pozos', 'camino_seguro',
+            'adivinanzas', 'oro_sin_riesgo')
+
+
+class Corpus:
+    """ Corpus de mundos en una base SQLite con sus rasgos indexados. """
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.conexion = sqlite3.connect(ruta)
+        self.conexion.row_factory = sqlite3.Row
+        self.conexion.executescript(_ESQUEMA)
+
+    def construir(self, tamanos, num_semillas, num_wumpus=1, pit_probability=0.20,
+                  semilla_inicial=0, procesos=1, bloque=500):
+        """
+        Calcula en paralelo los rasgos de los mundos que falten y los guarda.
+        Devuelve cuántos mundos se han añadido.
+        """
+        hechas = {(f['size'], f['semilla']) for f in self.conexion.execute(
+            "SELECT size, semilla FROM mundos WHERE num_wumpus = ? AND pit_probability = ?",
+            (num_wumpus, pit_probability))}
+        claves = [(size, num_wumpus, pit_probability, s) for size in tamanos
+                  for s in range(semilla_inicial, semilla_inicial + num_semillas)
+                  if (size, s) not in hechas]
+
+        pool = ProcessPoolExecutor(max_workers=procesos) if procesos > 1 else None
+        try:
+            filas = (pool.map(_rasgos_de, claves, chunksize=max(1, bloque // (4 * procesos)))
+                     if pool is not None else map(_rasgos_de, claves))
+            lote = []
+            for fila in filas:
+                lote.append(fila)
+                if len(lote) >= bloque:
+                    self._guardar(lote)
+                    lote = []
+            self._guardar(lote)
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return len(claves)
+
+    def _guardar(self, filas):
+        if filas:
+            with self.conexion:
+                self.conexion.executemany("INSERT OR REPLACE INTO mundos VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                          filas)
+
+    def seleccionar(self, limite=None, **filtros):
+        """
+        Filas del corpus que cumplen los filtros por igualdad, p. ej.
+        seleccionar(size=8, adivinanzas=1). Un filtro a None selecciona NULL.
+        """
+        condiciones, valores = [], []
+        for nombre, valor in filtros.items():
+            if nombre not in _FILTROS:
+                raise ValueError(f"Filtro desconocido: {nombre}")
+            if valor is None:
+                condiciones.append(f"{nombre} IS NULL")
+            else:
+                condiciones.append(f"{nombre} = ?")
+                valores.append(valor)
+        consulta = "SELECT * FROM mundos"
+        if condiciones:
+            consulta += " WHERE " + " AND ".join(condiciones)
+        consulta += " ORDER BY semilla"
+        if limite is not None:
+            consulta += f" LIMIT {int(limite)}"
+        return [dict(f) for f in self.conexion.execute(consulta, valores)]
+
+    def mundo(self, fila):
+        """ WumpusWorld de una fila devuelta por seleccionar(). """
+        return crear_mundo(fila['size'], fila['num_wumpus'], fila['pit_probability'], fila['semilla'])
+
+    def cerrar(self):
+        self.conexion.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construye un corpus de mundos indexado por dificultad")
+    parser.add_argument('ruta', help="fichero SQLite del corpus")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[4])
+    parser.add_argument('--semillas', type=int, default=1000)
+    parser.add_argument('--semilla-inicial', type=int, default=0)
+    parser.add_argument('--wumpus', type=int, default=1)
+    parser.add_argument('--pit-probability', type=float, default=0.20)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    corpus = Corpus(args.ruta)
+    nuevos = corpus.construir(args.tamanos, args.semillas, args.wumpus, args.pit_probability,
+                              args.semilla_inicial, args.procesos)
+    print(f"Mundos añadidos: {nuevos}")
+    for fila in corpus.conexion.execute(
+            "SELECT size, adivinanzas, COUNT(*) AS n FROM mundos GROUP BY size, adivinanzas"):
+        print(f"{fila['size']}x{fila['size']}  adivinanzas {fila['adivinanzas']}: {fila['n']}")
+    corpus.cerrar()
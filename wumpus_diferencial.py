@@ -0,0 +1,284 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+import wumpus_referencia as referencia
+from wumpus_acciones import (ACTION_DELTA, ACTION_DIRECTION, ACTION_NAMES, CLIMB_OUT, DIRECTIONS, GRAB_GOLD,
+                             MOVE_ACTIONS, SHOOT_ACTIONS)
+from wumpus_core import KnowledgeBase, LogicalAgent, WumpusWorld, observacion
+
+# -----------------------------------------------------------------------------
+# PRUEBAS DIFERENCIALES: IMPLEMENTACIONES RÁPIDAS CONTRA LA DE REFERENCIA
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_diferencial.py --casos 100000 --procesos 4 --implementaciones motor local
+#   python wumpus_diferencial.py --caso fallo.json --implementaciones motor
+#
+# Cada caso (generado a partir de una semilla) es un mundo explícito (tamaño,
+# oro, Wumpus y pozos) y una secuencia de acciones. Se juega con la
+# implementación de referencia congelada (wumpus_referencia.py, la versión
+# base) y con cada candidata de wumpus_core, incluido el bucle de reglas por
+# defecto: en cada paso el agente percibe, guarda los perceptos e infiere
+# (inferir_seguridad), y después el mundo ejecuta la acción. Se comparan paso
+# a paso los perceptos, el resultado de la acción, el estado del mundo y los
+# hechos de la KB.
+#
+# Un caso que diverge se reduce (quitando acciones, pozos y Wumpus, y
+# encogiendo el tablero mientras siga divergiendo) y se guarda en JSON para
+# reproducirlo con --caso.
+#
+# Para probar una implementación nueva basta con añadirla a IMPLEMENTACIONES:
+# 'lazy' elige el modo del mundo, 'kb' la clase de la KB y el resto son
+# argumentos de LogicalAgent.
+
+IMPLEMENTACIONES = {
+    'bucle': {},
+    'perezoso': {'lazy': True},
+    'motor': {'motor_reglas': True},
+    'local': {'inferencia_local': True},
+    'compactada': {'compactar_kb': True},
+}
+
+
+def generar_caso(semilla, max_size=8, max_acciones=60):
+    """ Caso aleatorio reproducible: mundo explícito y acciones. """
+    rng = random.Random(semilla)
+    size = rng.randint(2, max_size)
+    libres = [(x, y) for x in range(1, size + 1) for y in range(1, size + 1) if (x, y) != (1, 1)]
+    oro = rng.choice(libres)
+    restantes = [c for c in libres if c != oro]
+    wumpus = rng.sample(restantes, min(len(restantes), rng.randint(0, 1)))  # La referencia admite uno
+    probabilidad = rng.uniform(0.0, 0.35)
+    pozos = [c for c in restantes if c not in wumpus and rng.random() < probabilidad]
+
+    # Sobre todo movimientos, casi siempre a casillas sin peligro para llegar lejos
+    peligros = set(wumpus) | set(pozos)
+    acciones, (x, y) = [], (1, 1)
+    for _ in range(rng.randint(1, max_acciones)):
+        r = rng.random()
+        if r < 0.05:
+            acciones.append(rng.choice(SHOOT_ACTIONS))
+        elif r < 0.08:
+            acciones.append(GRAB_GOLD)
+        elif r < 0.10:
+            acciones.append(CLIMB_OUT)
+        else:
+            movimientos = list(MOVE_ACTIONS)
+            rng.shuffle(movimientos)
+            if rng.random() < 0.9:
+                movimientos.sort(key=lambda a: (x + ACTION_DELTA[a][0], y + ACTION_DELTA[a][1]) in peligros)
+            accion = movimientos[0]
+            acciones.append(accion)
+            nx, ny = x + ACTION_DELTA[accion][0], y + ACTION_DELTA[accion][1]
+            if 1 <= nx <= size and 1 <= ny <= size:
+                x, y = nx, ny
+    return {'size': size, 'oro': oro, 'wumpus': wumpus, 'pozos': pozos, 'acciones': acciones}
+
+
+def _crear(caso, implementacion):
+    opciones = dict(implementacion)
+    lazy = opciones.pop('lazy', False)
+    kb = opciones.pop('kb', KnowledgeBase)()
+    world = WumpusWorld.from_layout(caso['size'], tuple(caso['oro']), [tuple(c) for c in caso['wumpus']],
+                                    [tuple(c) for c in caso['pozos']], lazy=lazy)
+    return world, LogicalAgent(world, kb, **opciones)
+
+
+def jugar_caso(caso, nombre):
+    """ Traza del caso con una implementación: un diccionario por paso jugado. """
+    world, agent = _crear(caso, IMPLEMENTACIONES[nombre])
+    traza = []
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        _jugar(world, agent, caso['acciones'], traza)
+    return traza
+
+
+def jugar_referencia(caso):
+    """ Traza del caso con la implementación de referencia congelada. """
+    wumpus = [tuple(c) for c in caso['wumpus']]
+    if len(wumpus) > 1:
+        raise ValueError("La referencia solo admite un Wumpus")
+    world = referencia.mundo_con(caso['size'], tuple(caso['oro']), wumpus[0] if wumpus else None,
+                                 [tuple(c) for c in caso['pozos']])
+    agent = referencia.LogicalAgent(world, referencia.KnowledgeBase())
+    traza, fuera = [], False
+    for action in caso['acciones']:
+        if not world.agent_is_alive or fuera:
+            break
+        agent.location = world.agent_location
+        agent.visited_squares.add(agent.location)
+        percepts = world.get_percepts_at(agent.location)
+        agent.procesar_perceptos(percepts)
+        agent.inferir_seguridad()
+        hechos = frozenset(agent.kb.facts)
+        if action in SHOOT_ACTIONS:
+            resultado = world.execute_action('shoot_arrow', DIRECTIONS[ACTION_DIRECTION[action]])
+        else:
+            resultado = world.execute_action(ACTION_NAMES[action])
+        agent.tras_accion(resultado)
+        fuera = "escapó" in resultado
+        vivos = (world.wumpus_location,) if world.wumpus_location and world.wumpus_is_alive else ()
+        traza.append({'perceptos': percepts, 'hechos': hechos, 'resultado': resultado,
+                      'estado': (world.agent_location, world.agent_is_alive, world.agent_has_gold,
+                                 world.agent_has_arrow, fuera, vivos)})
+    return traza
+
+
+def _jugar(world, agent, acciones, traza):
+    for action in acciones:
+        if not world.agent_is_alive or world.agent_has_exited:
+            break
+        # Como en run_agent: percibir, guardar los perceptos e inferir
+        agent.location = world.agent_location
+        agent.visited_squares.add(agent.location)
+        percepts = world.get_percepts_at(agent.location)
+        agent.procesar_perceptos(percepts)
+        agent.inferir_seguridad()
+        hechos = frozenset(agent.kb.facts)
+        resultado = world.execute_action(action)
+        agent.observar(observacion(world))
+        traza.append({'perceptos': percepts, 'hechos': hechos, 'resultado': resultado,
+                      'estado': (world.agent_location, world.agent_is_alive, world.agent_has_gold,
+                                 world.agent_has_arrow, world.agent_has_exited,
+                                 tuple(sorted(world.wumpus_locations)))})
+
+
+def diferencia(caso, nombre, esperada=None):
+    """
+    Primera divergencia entre la referencia y la implementación 'nombre' en
+    el caso, como diccionario (paso, campo y valores), o None si coinciden.
+    'esperada' es la traza de la referencia si ya se tiene.
+    """
+    if esperada is None:
+        try:
+            esperada = jugar_referencia(caso)
+        except Exception as e:
+            return {'paso': None, 'campo': 'excepcion en la referencia', 'referencia': repr(e)}
+    try:
+        obtenida = jugar_caso(caso, nombre)
+    except Exception as e:
+        return {'paso': None, 'campo': 'excepcion', 'referencia': None, nombre: repr(e)}
+
+    for paso, (a, b) in enumerate(zip(esperada, obtenida)):
+        for campo in ('perceptos', 'resultado', 'estado', 'hechos'):
+            if a[campo] != b[campo]:
+                if campo == 'hechos':
+                    return {'paso': paso, 'campo': campo, 'solo_referencia': sorted(a[campo] - b[campo]),
+                            'solo_' + nombre: sorted(b[campo] - a[campo])}
+                return {'paso': paso, 'campo': campo, 'referencia': a[campo], nombre: b[campo]}
+    if len(esperada) != len(obtenida):
+        return {'paso': min(len(esperada), len(obtenida)), 'campo': 'pasos',
+                'referencia': len(esperada), nombre: len(obtenida)}
+    return None
+
+
+def reducir(caso, nombre):
+    """ Caso mínimo (localmente) que sigue divergiendo. """
+    def falla(c):
+        return diferencia(c, nombre) is not None
+
+    caso = dict(caso)
+    cambiado = True
+    while cambiado:
+        cambiado = False
+        d = diferencia(caso, nombre)
+        if d['paso'] is not None and d['paso'] + 1 < len(caso['acciones']):
+            caso['acciones'] = caso['acciones'][:d['paso'] + 1]
+            cambiado = True
+
+        for clave in ('acciones', 'pozos', 'wumpus'):
+            i = len(caso[clave]) - 1
+            while i >= 0:
+                prueba = dict(caso, **{clave: caso[clave][:i] + caso[clave][i + 1:]})
+                if falla(prueba):
+                    caso = prueba
+                    cambiado = True
+                i -= 1
+
+        # Encoger el tablero si los peligros caben en uno menor (llevando el oro a
+        # la primera casilla libre si se sale)
+        size = caso['size'] - 1
+        peligros = [tuple(c) for c in caso['wumpus']] + [tuple(c) for c in caso['pozos']]
+        if size >= 2 and all(max(c) <= size for c in peligros):
+            oro = tuple(caso['oro'])
+            if max(oro) > size:
+                oro = next((c for c in ((x, y) for y in range(1, size + 1) for x in range(1, size + 1))
+                            if c != (1, 1) and c not in peligros), None)
+            prueba = dict(caso, size=size, oro=oro)
+            if oro is not None and falla(prueba):
+                caso = prueba
+                cambiado = True
+    return caso
+
+
+def probar_bloque(semillas, nombres, max_size=8, max_acciones=60):
+    """ Trabajo de un proceso: (semilla, nombre, diferencia) de los casos que divergen. """
+    fallos = []
+    for semilla in semillas:
+        caso = generar_caso(semilla, max_size, max_acciones)
+        esperada = jugar_referencia(caso)
+        for nombre in nombres:
+            d = diferencia(caso, nombre, esperada)
+            if d is not None:
+                fallos.append((semilla, nombre, d))
+    return fallos
+
+
+def probar(casos, nombres, semilla=0, procesos=1, bloque=200, max_fallos=10, **opciones):
+    """ Prueba 'casos' casos desde 'semilla' y devuelve hasta max_fallos fallos. """
+    bloques = [range(s, min(s + bloque, semilla + casos)) for s in range(semilla, semilla + casos, bloque)]
+    fallos = []
+    if procesos <= 1:
+        for semillas in bloques:
+            fallos.extend(probar_bloque(semillas, nombres, **opciones))
+            if len(fallos) >= max_fallos:
+                break
+        return fallos[:max_fallos]
+
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        futuros = [pool.submit(probar_bloque, semillas, nombres, **opciones) for semillas in bloques]
+        for futuro in futuros:
+            fallos.extend(futuro.result())
+            if len(fallos) >= max_fallos:
+                for pendiente in futuros:
+                    pendiente.cancel()
+                break
+    return fallos[:max_fallos]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compara implementaciones con la de referencia en casos aleatorios")
+    parser.add_argument('--implementaciones', nargs='+', default=list(IMPLEMENTACIONES),
+                        choices=list(IMPLEMENTACIONES))
+    parser.add_argument('--casos', type=int, default=10000)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--max-size', type=int, default=8)
+    parser.add_argument('--max-acciones', type=int, default=60)
+    parser.add_argument('--max-fallos', type=int, default=10)
+    parser.add_argument('--caso', help="reproduce el caso guardado en este fichero JSON")
+    parser.add_argument('--salida', default='fallos', help="directorio de los casos reducidos")
+    args = parser.parse_args()
+
+    if args.caso:
+        with open(args.caso) as f:
+            caso = json.load(f)
+        for nombre in args.implementaciones:
+            print(f"{nombre}: {diferencia(caso, nombre) or 'coincide con la referencia'}")
+    else:
+        fallos = probar(args.casos, args.implementaciones, args.semilla, args.procesos,
+                        max_fallos=args.max_fallos, max_size=args.max_size, max_acciones=args.max_acciones)
+        if not fallos:
+            print(f"{args.casos} casos sin divergencias en {', '.join(args.implementaciones)}")
+        else:
+            os.makedirs(args.salida, exist_ok=True)
+        for semilla, nombre, _ in fallos:
+            caso = reducir(generar_caso(semilla, args.max_size, args.max_acciones), nombre)
+            ruta = os.path.join(args.salida, f"{nombre}_{semilla}.json")
+            with open(ruta, 'w') as f:
+                json.dump(caso, f)
+            print(f"{nombre}, semilla {semilla}: {diferencia(caso, nombre)}")
+            print(f"  caso reducido ({caso['size']}x{caso['size']}, {len(caso['acciones'])} acciones) en {ruta}")
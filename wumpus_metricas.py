@@ -0,0 +1,346 @@
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# -----------------------------------------------------------------------------
+# MÉTRICAS EN VIVO DE LAS EJECUCIONES LARGAS
+# -----------------------------------------------------------------------------
+# Uso (con wumpus_barrido.py o wumpus_comparacion.py):
+#   python wumpus_barrido.py barrido.json --metricas-puerto 9100 --metricas-json metricas.json
+#   curl localhost:9100/metrics
+#
+# Un Registro guarda contadores, indicadores e histogramas. El Exportador los
+# sirve en formato de texto de Prometheus por HTTP (solo en 127.0.0.1) y
+# escribe cada 'intervalo' segundos una instantánea JSON, sustituyendo el
+# fichero de una vez para que nunca se lea a medias.
+#
+# Las métricas se actualizan en el proceso principal cuando llega cada lote de
+# episodios, a partir de los resultados que ya devuelven los trabajadores: el
+# bucle de run_agent no hace nada extra. Las latencias llegan ya agrupadas en
+# un HistogramaLatencias por episodio, no como la lista de cada paso.
+
+
+def _escapar(texto, comillas=False):
+    """
+    Escapa un texto para el formato de Prometheus: la barra y el salto de
+    línea (en HELP) y además las comillas (en valores de etiqueta).
+    """
+    texto = str(texto).replace('\\', '\\\\').replace('\n', '\\n')
+    return texto.replace('"', '\\"') if comillas else texto
+
+
+class Contador:
+    """ Valor que solo crece (episodios, victorias...). """
+    tipo = 'counter'
+    __slots__ = ('nombre', 'ayuda', 'valor')
+
+    def __init__(self, nombre, ayuda):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.valor = 0
+
+    def inc(self, n=1):
+        self.valor += n
+
+    def lineas(self):
+        return [f"{self.nombre} {self.valor}"]
+
+    def instantanea(self):
+        return self.valor
+
+
+class Indicador:
+    """ Valor que sube y baja (tasas, utilización). """
+    tipo = 'gauge'
+    __slots__ = ('nombre', 'ayuda', 'valor')
+
+    def __init__(self, nombre, ayuda):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.valor = 0.0
+
+    def set(self, valor):
+        self.valor = valor
+
+    def lineas(self):
+        return [f"{self.nombre} {self.valor}"]
+
+    def instantanea(self):
+        return self.valor
+
+
+class Histograma:
+    """ Cuentas por intervalos de límites dados, con suma y total. """
+    tipo = 'histogram'
+    __slots__ = ('nombre', 'ayuda', 'limites', 'cuentas', 'suma', 'n')
+
+    def __init__(self, nombre, ayuda, limites):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.limites = tuple(sorted(limites))
+        self.cuentas = [0] * (len(self.limites) + 1)  # La última, por encima de todos
+        self.suma = 0.0
+        self.n = 0
+
+    def observar(self, valor):
+        self.cuentas[bisect_left(self.limites, valor)] += 1
+        self.suma += valor
+        self.n += 1
+
+    def observar_muchos(self, valores):
+        limites, cuentas = self.limites, self.cuentas
+        for valor in valores:
+            cuentas[bisect_left(limites, valor)] += 1
+        self.suma += sum(valores)
+        self.n += len(valores)
+
+    def observar_histograma(self, histograma):
+        """ Añade un HistogramaLatencias (cada intervalo, por su valor representativo). """
+        limites, cuentas = self.limites, self.cuentas
+        for valor, cuenta in histograma.valores():
+            cuentas[bisect_left(limites, valor)] += cuenta
+        self.suma += histograma.suma
+        self.n += histograma.n
+
+    def lineas(self):
+        lineas, acumulado = [], 0
+        for limite, cuenta in zip(self.limites, self.cuentas):
+            acumulado += cuenta
+            lineas.append(f'{self.nombre}_bucket{{le="{_escapar(limite, True)}"}} {acumulado}')
+        lineas.append(f'{self.nombre}_bucket{{le="+Inf"}} {self.n}')
+        lineas.append(f"{self.nombre}_sum {self.suma}")
+        lineas.append(f"{self.nombre}_count {self.n}")
+        return lineas
+
+    def instantanea(self):
+        return {'limites': list(self.limites), 'cuentas': list(self.cuentas),
+                'suma': self.suma, 'n': self.n}
+
+
+class HistogramaLatencias:
+    """
+    Latencias agrupadas en intervalos logarítmicos [BASE**i, BASE**(i + 1)):
+    un diccionario disperso índice -> cuenta que ocupa lo mismo con 50 pasos
+    que con 5000, se suma sin perder nada y da percentiles con un error
+    relativo menor del 5 %. Es lo que envían los trabajadores en lugar de la
+    lista de latencias de cada paso.
+    """
+    BASE = 1.1
+    MINIMO = 1e-9  # Las latencias menores (o cero) cuentan en el intervalo de esta
+    __slots__ = ('cuentas', 'suma', 'n')
+
+    def __init__(self, latencias=()):
+        self.cuentas = {}
+        self.suma = 0.0
+        self.n = 0
+        for valor in latencias:
+            self.observar(valor)
+
+    def observar(self, valor):
+        i = math.floor(math.log(max(valor, self.MINIMO), self.BASE))
+        self.cuentas[i] = self.cuentas.get(i, 0) + 1
+        self.suma += valor
+        self.n += 1
+
+    def sumar(self, otro):
+        for i, cuenta in otro.cuentas.items():
+            self.cuentas[i] = self.cuentas.get(i, 0) + cuenta
+        self.suma += otro.suma
+        self.n += otro.n
+
+    def valores(self):
+        """ Pares (valor representativo, cuenta) de menor a mayor. """
+        return [(self.BASE ** (i + 0.5), self.cuentas[i]) for i in sorted(self.cuentas)]
+
+    def percentil(self, p):
+        """ Percentil p (0-100) por rango más cercano, como wumpus_core.percentil; None si está vacío. """
+        if not self.n:
+            return None
+        rango = max(1, math.ceil(p / 100.0 * self.n))
+        acumulado = 0
+        for valor, cuenta in self.valores():
+            acumulado += cuenta
+            if acumulado >= rango:
+                return valor
+
+
+class Registro:
+    """
+    Métricas por nombre. Las actualizaciones de un lote se hacen dentro de
+    'cerrojo', y el texto y las instantáneas se leen con él, así que el
+    servidor nunca ve un lote a medias.
+    """
+    def __init__(self):
+        self._metricas = {}
+        self.cerrojo = threading.Lock()
+
+    def _registrar(self, metrica):
+        if metrica.nombre in self._metricas:
+            raise ValueError(f"Métrica repetida: {metrica.nombre}")
+        self._metricas[metrica.nombre] = metrica
+        return metrica
+
+    def contador(self, nombre, ayuda):
+        return self._registrar(Contador(nombre, ayuda))
+
+    def indicador(self, nombre, ayuda):
+        return self._registrar(Indicador(nombre, ayuda))
+
+    def histograma(self, nombre, ayuda, limites):
+        return self._registrar(Histograma(nombre, ayuda, limites))
+
+    def texto_prometheus(self):
+        """ Todas las métricas en el formato de texto de Prometheus. """
+        lineas = []
+        with self.cerrojo:
+            for m in self._metricas.values():
+                lineas.append(f"# HELP {m.nombre} {_escapar(m.ayuda)}")
+                lineas.append(f"# TYPE {m.nombre} {m.tipo}")
+                lineas.extend(m.lineas())
+        return "\n".join(lineas) + "\n"
+
+    def instantanea(self):
+        """ Diccionario nombre -> valor (o histograma) listo para JSON. """
+        with self.cerrojo:
+            return {nombre: m.instantanea() for nombre, m in self._metricas.items()}
+
+
+class MetricasEpisodios:
+    """
+    Métricas estándar de una ejecución por lotes: se alimentan con los
+    resultados de wumpus_barrido.jugar_lote según llegan.
+    """
+    LIMITES_LATENCIA = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3,
+                        1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+    LIMITES_HECHOS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 50000)
+
+    def __init__(self, registro, procesos=1):
+        self.registro = registro
+        self.procesos = max(1, procesos)
+        self.inicio = time.perf_counter()
+        r = registro
+        self.episodios = r.contador('wumpus_episodios_total', "Episodios terminados")
+        self.victorias = r.contador('wumpus_victorias_total', "Episodios ganados (fuera con el oro)")
+        self.muertes = r.contador('wumpus_muertes_total', "Episodios con el agente muerto")
+        self.pasos = r.contador('wumpus_pasos_total', "Acciones ejecutadas")
+        self.trabajo = r.contador('wumpus_trabajo_segundos_total', "Segundos de trabajo de los procesos")
+        self.latencia = r.histograma('wumpus_latencia_paso_segundos', "Razonamiento por paso",
+                                     self.LIMITES_LATENCIA)
+        self.hechos = r.histograma('wumpus_hechos_kb', "Hechos en la KB al terminar el episodio",
+                                   self.LIMITES_HECHOS)
+        self.por_segundo = r.indicador('wumpus_episodios_por_segundo', "Episodios por segundo desde el inicio")
+        self.tasa_victoria = r.indicador('wumpus_tasa_victoria', "Fracción de episodios ganados")
+        self.tasa_muerte = r.indicador('wumpus_tasa_muerte', "Fracción de episodios con muerte")
+        self.utilizacion = r.indicador('wumpus_utilizacion_procesos',
+                                       "Trabajo de los procesos entre su tiempo disponible")
+
+    def anotar(self, resultados):
+        """ Añade un lote de resultados de jugar_episodio. """
+        with self.registro.cerrojo:
+            for puntuacion, victoria, muerte, pasos, latencias, degradados, hechos, segundos in resultados:
+                self.episodios.inc()
+                self.victorias.inc(victoria)
+                self.muertes.inc(muerte)
+                self.pasos.inc(pasos)
+                self.trabajo.inc(segundos)
+                self.latencia.observar_histograma(latencias)
+                self.hechos.observar(hechos)
+            transcurrido = max(time.perf_counter() - self.inicio, 1e-9)
+            n = self.episodios.valor
+            self.por_segundo.set(n / transcurrido)
+            self.tasa_victoria.set(self.victorias.valor / n if n else 0.0)
+            self.tasa_muerte.set(self.muertes.valor / n if n else 0.0)
+            self.utilizacion.set(min(1.0, self.trabajo.valor / (transcurrido * self.procesos)))
+
+
+class Exportador:
+    """
+    Sirve el registro por HTTP en /metrics y escribe instantáneas JSON
+    periódicas, cada cosa en su hilo. Se usa como contexto (with).
+    """
+    def __init__(self, registro, puerto=None, ruta_json=None, intervalo=10.0, host='127.0.0.1'):
+        self.registro = registro
+        self.puerto = puerto
+        self.ruta_json = ruta_json
+        self.intervalo = intervalo
+        self.host = host
+        self._servidor = None
+        self._parar = threading.Event()
+        self._hilos = []
+
+    def iniciar(self):
+        if self.puerto is not None:
+            registro = self.registro
+
+            class Manejador(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split('?')[0] != '/metrics':
+                        self.send_error(404)
+                        return
+                    cuerpo = registro.texto_prometheus().encode()
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                    self.send_header('Content-Length', str(len(cuerpo)))
+                    self.end_headers()
+                    self.wfile.write(cuerpo)
+
+                def log_message(self, *args):
+                    pass
+
+            self._servidor = ThreadingHTTPServer((self.host, self.puerto), Manejador)
+            self.puerto = self._servidor.server_address[1]  # Con puerto 0, el asignado
+            self._hilos.append(threading.Thread(target=self._servidor.serve_forever, daemon=True))
+        if self.ruta_json is not None:
+            self._hilos.append(threading.Thread(target=self._escribir_periodicamente, daemon=True))
+        for hilo in self._hilos:
+            hilo.start()
+        return self
+
+    def _escribir_periodicamente(self):
+        while not self._parar.wait(self.intervalo):
+            self.escribir_instantanea()
+
+    def escribir_instantanea(self):
+        """ Escribe la instantánea JSON sustituyendo el fichero de una vez. """
+        datos = {'tiempo': time.time(), 'metricas': self.registro.instantanea()}
+        temporal = f"{self.ruta_json}.tmp"
+        with open(temporal, 'w') as f:
+            json.dump(datos, f)
+        os.replace(temporal, self.ruta_json)
+
+    def detener(self):
+        self._parar.set()
+        if self._servidor is not None:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+        for hilo in self._hilos:
+            hilo.join()
+        if self.ruta_json is not None:
+            self.escribir_instantanea()  # La última, con los resultados finales
+
+    def __enter__(self):
+        return self.iniciar()
+
+    def __exit__(self, *exc):
+        self.detener()
+
+
+def agregar_argumentos(parser):
+    """ Opciones de línea de órdenes comunes para activar las métricas. """
+    parser.add_argument('--metricas-puerto', type=int, help="sirve /metrics (Prometheus) en este puerto")
+    parser.add_argument('--metricas-json', help="fichero de instantáneas JSON periódicas")
+    parser.add_argument('--metricas-intervalo', type=float, default=10.0,
+                        help="segundos entre instantáneas JSON")
+
+
+def desde_argumentos(args, procesos):
+    """ (MetricasEpisodios, Exportador) según las opciones, o (None, None) si no se piden. """
+    if args.metricas_puerto is None and args.metricas_json is None:
+        return None, None
+    registro = Registro()
+    exportador = Exportador(registro, args.metricas_puerto, args.metricas_json, args.metricas_intervalo)
+    return MetricasEpisodios(registro, procesos), exportador
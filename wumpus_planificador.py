@@ -0,0 +1,496 @@
+import math
+import random
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from wumpus_acciones import ACTION_DELTA, CLIMB_OUT, MOVE_ACTIONS, SHOOT_ACTIONS
+
+# -----------------------------------------------------------------------------
+# PLANIFICADOR MONTE CARLO (MCTS) PARA DECISIONES ARRIESGADAS
+# -----------------------------------------------------------------------------
+# Cuando el agente no tiene ningún movimiento seguro sin visitar, este módulo
+# decide entre arriesgarse, disparar la flecha, retroceder o salir. Para ello
+# muestrea mundos ocultos consistentes con los perceptos de la KB y evalúa las
+# acciones con UCT dentro de un presupuesto de tiempo por jugada.
+
+# Puntuación clásica del Mundo de Wumpus (normalizada por ESCALA en el árbol)
+RECOMPENSA_ORO = 1000
+PENALIZACION_MUERTE = -1000
+COSTE_PASO = -1
+COSTE_FLECHA = -10
+ESCALA = 1000.0
+
+
+def _vecinos(size, cell):
+    x, y = cell
+    return [(x + dx, y + dy) for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0))
+            if 1 <= x + dx <= size and 1 <= y + dy <= size]
+
+
+def _distancia(size, origen, destino, transitables):
+    """
+    Longitud del camino más corto de 'origen' a 'destino' pasando solo por
+    casillas transitables (el destino puede no serlo). None si no hay camino.
+    """
+    if origen == destino:
+        return 0
+    visitadas = {origen}
+    cola = deque([(origen, 0)])
+    while cola:
+        cell, d = cola.popleft()
+        for n in _vecinos(size, cell):
+            if n == destino:
+                return d + 1
+            if n in transitables and n not in visitadas:
+                visitadas.add(n)
+                cola.append((n, d + 1))
+    return None
+
+
+def _mas_cercana(size, origen, objetivos, transitables):
+    """ Devuelve (casilla, distancia) del objetivo más cercano por BFS, o None. """
+    if origen in objetivos:
+        return origen, 0
+    visitadas = {origen}
+    cola = deque([(origen, 0)])
+    while cola:
+        cell, d = cola.popleft()
+        for n in _vecinos(size, cell):
+            if n in objetivos:
+                return n, d + 1
+            if n in transitables and n not in visitadas:
+                visitadas.add(n)
+                cola.append((n, d + 1))
+    return None
+
+
+class Creencia:
+    """
+    Lo que el agente sabe realmente del mundo: casillas visitadas, perceptos
+    observados en ellas y el estado de oro/flecha/Wumpus.
+    Solo se usan perceptos (hechos seguros), nunca las conclusiones de las
+    reglas, que pueden ser heurísticas.
+    """
+    def __init__(self, size, location, visited, observations, has_gold=False,
+                 has_arrow=True, wumpus_alive=True, gold_location=None, pit_probability=0.20):
+        self.size = size
+        self.location = location
+        self.visited = frozenset(visited)
+        self.observations = dict(observations)  # casilla -> (brisa, hedor)
+        self.has_gold = has_gold
+        self.has_arrow = has_arrow
+        self.wumpus_alive = wumpus_alive
+        self.gold_location = gold_location
+        self.pit_probability = pit_probability
+        self.safe = self._celdas_seguras()
+
+    def clave(self):
+        """ Lo que se sabe, sin la casilla ni la flecha (que van en cada nodo del árbol). """
+        return (self.visited, frozenset(self.observations.items()), self.has_gold,
+                self.wumpus_alive, self.gold_location)
+
+    @classmethod
+    def desde_agente(cls, agent, pit_probability=0.20):
+        """ Construye la creencia a partir de la KB y el estado del agente. """
+        kb = agent.kb
+        observations = {}
+        for prefix, breeze in (("Breeze at", True), ("No Breeze at", False)):
+            for fact in kb.get_facts_starting_with(prefix):
+                cell = eval(fact.split(' at ')[1])
+                observations[cell] = (breeze, observations.get(cell, (False, False))[1])
+        for prefix, stench in (("Stench at", True), ("No Stench at", False)):
+            for fact in kb.get_facts_starting_with(prefix):
+                cell = eval(fact.split(' at ')[1])
+                observations[cell] = (observations.get(cell, (False, False))[0], stench)
+
+        gold_location = None
+        if not agent.tiene_oro:
+            for fact in kb.get_facts_starting_with("Glitter at"):
+                gold_location = eval(fact.split(' at ')[1])
+
+        return cls(agent.world.size, agent.location, agent.visited_squares, observations,
+                   has_gold=agent.tiene_oro,
+                   has_arrow=agent.tiene_flecha,
+                   wumpus_alive=agent.quedan_wumpus,
+                   gold_location=gold_location,
+                   pit_probability=pit_probability)
+
+    def _celdas_seguras(self):
+        """ Casillas demostrablemente seguras según los perceptos. """
+        safe = set(self.visited)
+        for cell, (breeze, stench) in self.observations.items():
+            if not breeze and (not stench or not self.wumpus_alive):
+                safe.update(_vecinos(self.size, cell))
+        return safe
+
+    def muestrear_mundo(self, rng, intentos=50):
+        """ Genera un mundo oculto consistente con los perceptos observados. """
+        for _ in range(intentos):
+            mundo = self._intentar_muestra(rng)
+            if mundo is not None:
+                return mundo
+        # Sin muestra exacta (p. ej. KB inconsistente): se relajan las restricciones de brisa
+        return self._intentar_muestra(rng, forzar=True)
+
+    def _intentar_muestra(self, rng, forzar=False):
+        size = self.size
+        wumpus = self._muestrear_wumpus(rng) if self.wumpus_alive else None
+        gold = self.gold_location
+        if gold is None and not self.has_gold:
+            gold = self._muestrear_libre(rng, excluir={wumpus})
+
+        no_pit = set(self.visited)
+        no_pit.update(c for c in (wumpus, gold, (1, 1)) if c is not None)
+        for cell, (breeze, _) in self.observations.items():
+            if not breeze:
+                no_pit.update(_vecinos(size, cell))
+
+        pits = {cell: False for cell in no_pit}
+        for cell, (breeze, _) in self.observations.items():
+            if not breeze:
+                continue
+            candidatas = [n for n in _vecinos(size, cell) if n not in no_pit]
+            if not candidatas:
+                if not forzar:
+                    return None
+                continue
+            for n in candidatas:
+                if n not in pits:
+                    pits[n] = rng.random() < self.pit_probability
+            if not any(pits[n] for n in candidatas):
+                if not forzar:
+                    return None
+                pits[rng.choice(candidatas)] = True
+        return _MundoMuestreado(size, pits, wumpus, gold, self.pit_probability, rng)
+
+    def _muestrear_wumpus(self, rng):
+        size = self.size
+        con_hedor = [c for c, (_, stench) in self.observations.items() if stench]
+        sin_hedor = set()
+        for cell, (_, stench) in self.observations.items():
+            if not stench:
+                sin_hedor.update(_vecinos(size, cell))
+        if con_hedor:
+            candidatas = set(_vecinos(size, con_hedor[0]))
+            for cell in con_hedor[1:]:
+                candidatas.intersection_update(_vecinos(size, cell))
+            candidatas = [c for c in candidatas
+                          if c not in self.visited and c not in sin_hedor and c != (1, 1)]
+            return rng.choice(candidatas) if candidatas else None
+        return self._muestrear_libre(rng, excluir=sin_hedor)
+
+    def _muestrear_libre(self, rng, excluir, intentos=200):
+        """ Casilla aleatoria no visitada, distinta de (1, 1) y fuera de 'excluir'. """
+        for _ in range(intentos):
+            cell = (rng.randint(1, self.size), rng.randint(1, self.size))
+            if cell != (1, 1) and cell not in self.visited and cell not in excluir:
+                return cell
+        return None
+
+
+class _MundoMuestreado:
+    """
+    Mundo hipotético. Las casillas no restringidas por los perceptos deciden
+    si tienen pozo solo cuando se consultan, así que el coste no depende del
+    tamaño del tablero.
+    """
+    def __init__(self, size, pits, wumpus, gold, pit_probability, rng):
+        self.size = size
+        self.pits = pits
+        self.wumpus = wumpus
+        self.gold = gold
+        self.pit_probability = pit_probability
+        self.rng = rng
+
+    def hay_pozo(self, cell):
+        pit = self.pits.get(cell)
+        if pit is None:
+            pit = self.pits[cell] = self.rng.random() < self.pit_probability
+        return pit
+
+    def perceptos(self, cell, wumpus_alive):
+        vecinos = _vecinos(self.size, cell)
+        breeze = any(self.hay_pozo(n) for n in vecinos)
+        stench = wumpus_alive and self.wumpus in vecinos
+        return breeze, stench
+
+
+class _Simulacion:
+    """ Estado del agente dentro de un mundo muestreado durante la búsqueda. """
+    def __init__(self, creencia, mundo):
+        self.size = creencia.size
+        self.mundo = mundo
+        self.location = creencia.location
+        self.has_gold = creencia.has_gold
+        self.has_arrow = creencia.has_arrow
+        self.wumpus_alive = creencia.wumpus_alive
+        self.visited = set(creencia.visited)
+        self.observations = dict(creencia.observations)
+        self.safe = set(creencia.safe)
+        self.done = False
+        self.reward = 0
+
+    def acciones(self):
+        """ Acciones legales en el estado actual. """
+        x, y = self.location
+        acciones = [a for a in MOVE_ACTIONS
+                    if 1 <= x + ACTION_DELTA[a][0] <= self.size and 1 <= y + ACTION_DELTA[a][1] <= self.size]
+        if self.has_arrow:
+            acciones.extend(SHOOT_ACTIONS)
+        if self.location == (1, 1):
+            acciones.append(CLIMB_OUT)
+        return acciones
+
+    def aplicar(self, action):
+        if action in SHOOT_ACTIONS:
+            self._disparar(action)
+        elif action == CLIMB_OUT:
+            self._salir()
+        elif action in MOVE_ACTIONS:
+            dx, dy = ACTION_DELTA[action]
+            x, y = self.location
+            target = (x + dx, y + dy)
+            if 1 <= target[0] <= self.size and 1 <= target[1] <= self.size:
+                self._entrar(target, 1)
+            else:
+                self.reward += COSTE_PASO
+
+    def _entrar(self, cell, pasos):
+        self.reward += COSTE_PASO * pasos
+        self.location = cell
+        if (self.wumpus_alive and cell == self.mundo.wumpus) or self.mundo.hay_pozo(cell):
+            self.reward += PENALIZACION_MUERTE
+            self.done = True
+            return
+        if cell not in self.visited:
+            self.visited.add(cell)
+            self.safe.add(cell)
+            self.observations[cell] = self.mundo.perceptos(cell, self.wumpus_alive)
+            self._deducir(cell)
+        if cell == self.mundo.gold and not self.has_gold:
+            self.has_gold = True
+            self.reward += COSTE_PASO
+
+    def _deducir(self, cell):
+        breeze, stench = self.observations[cell]
+        if not breeze and (not stench or not self.wumpus_alive):
+            self.safe.update(_vecinos(self.size, cell))
+
+    def _disparar(self, action):
+        self.reward += COSTE_FLECHA
+        if not self.has_arrow:
+            return
+        self.has_arrow = False
+        dx, dy = ACTION_DELTA[action]
+        wx, wy = self.mundo.wumpus or (0, 0)
+        x, y = self.location
+        if self.wumpus_alive and ((dx == 0 and wx == x and (wy - y) * dy > 0) or
+                                  (dy == 0 and wy == y and (wx - x) * dx > 0)):
+            self.wumpus_alive = False
+            for visited in self.observations:
+                self._deducir(visited)
+
+    def _salir(self):
+        if self.location == (1, 1):
+            if self.has_gold:
+                self.reward += RECOMPENSA_ORO
+            self.done = True
+        else:
+            self.reward += COSTE_PASO
+
+    def _volver_y_salir(self):
+        d = _distancia(self.size, self.location, (1, 1), self.safe)
+        self.reward += COSTE_PASO * (d or 0)
+        self.location = (1, 1)
+        self._salir()
+
+    def rollout(self, rng, limite, prob_riesgo):
+        """
+        Política por defecto con el conocimiento propio de la simulación:
+        explora la casilla segura sin visitar más cercana, vuelve a casa con
+        el oro y, si está atascada, se arriesga con probabilidad 'prob_riesgo'.
+        """
+        for _ in range(limite):
+            if self.done:
+                return
+            if self.has_gold:
+                self._volver_y_salir()
+                return
+            frontera = self.safe - self.visited
+            objetivo = _mas_cercana(self.size, self.location, frontera, self.safe) if frontera else None
+            if objetivo is None:
+                if rng.random() >= prob_riesgo:
+                    self._volver_y_salir()
+                    return
+                inciertas = {n for c in self.visited for n in _vecinos(self.size, c)
+                             if n not in self.safe}
+                objetivo = _mas_cercana(self.size, self.location, inciertas, self.safe)
+                if objetivo is None:
+                    self._volver_y_salir()
+                    return
+            self._entrar(objetivo[0], objetivo[1])
+
+
+class _Nodo:
+    """ Nodo del árbol de búsqueda (UCT de lazo abierto sobre acciones). """
+    __slots__ = ('visitas', 'total', 'hijos', 'clave')
+
+    def __init__(self, clave=None):
+        self.visitas = 0
+        self.total = 0.0
+        self.hijos = {}
+        self.clave = clave
+
+
+def _buscar_en_proceso(creencia, candidatas, segundos, semilla, opciones):
+    """ Búsqueda independiente en un proceso trabajador; devuelve las estadísticas de la raíz. """
+    planificador = PlanificadorMCTS(tiempo_limite=segundos, semilla=semilla, **opciones)
+    raiz = _Nodo()
+    planificador._buscar(creencia, candidatas, raiz, time.perf_counter() + segundos)
+    return {a: (h.visitas, h.total) for a, h in raiz.hijos.items()}
+
+
+class PlanificadorMCTS:
+    """
+    Decide jugadas arriesgadas y disparos con búsqueda Monte Carlo en árbol.
+
+    - Cada iteración muestrea un mundo oculto consistente con la creencia.
+    - El árbol se conserva entre jugadas: si la acción elegida lleva al estado
+      esperado y lo que se sabe no ha cambiado desde que se construyó, su
+      subárbol pasa a ser la nueva raíz.
+    - Con procesos > 1 se lanzan búsquedas paralelas en otros procesos y sus
+      estadísticas de raíz se suman a las locales.
+    - Nunca se excede 'tiempo_limite' (segundos) por jugada: los resultados de
+      trabajadores que no terminan a tiempo se descartan.
+    - cerrar() (o salir de un 'with') libera los procesos y el árbol; el
+      agente lo llama al terminar cada episodio.
+    """
+    def __init__(self, tiempo_limite=0.1, exploracion=1.4, procesos=1, limite_rollout=200,
+                 prob_riesgo=0.5, semilla=None):
+        self.tiempo_limite = tiempo_limite
+        self.exploracion = exploracion
+        self.procesos = procesos
+        self.limite_rollout = limite_rollout
+        self.prob_riesgo = prob_riesgo
+        self.rng = random.Random(semilla)
+        self.raiz = None
+        self._clave_raiz = None  # Creencia.clave() con la que se construyó el árbol
+        self._ultima_accion = None
+        self._pool = None
+
+    def elegir_para(self, agent, candidatas):
+        """ Elige una de las acciones 'candidatas' para el estado actual del agente. """
+        return self.elegir(Creencia.desde_agente(agent, agent.world.pit_probability), candidatas)
+
+    def elegir(self, creencia, candidatas):
+        if len(candidatas) == 1:
+            return candidatas[0]
+        deadline = time.perf_counter() + self.tiempo_limite
+        raiz = self._raiz_para(creencia)
+
+        futuros = []
+        if self.procesos > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.procesos - 1)
+            opciones = {'exploracion': self.exploracion, 'limite_rollout': self.limite_rollout,
+                        'prob_riesgo': self.prob_riesgo}
+            segundos = self.tiempo_limite * 0.8
+            futuros = [self._pool.submit(_buscar_en_proceso, creencia, candidatas, segundos,
+                                         self.rng.getrandbits(32), opciones)
+                       for _ in range(self.procesos - 1)]
+
+        self._buscar(creencia, candidatas, raiz, deadline)
+
+        if futuros:
+            terminados, pendientes = wait(futuros, timeout=max(0.0, deadline - time.perf_counter()))
+            for futuro in pendientes:
+                futuro.cancel()
+            for futuro in terminados:
+                if futuro.exception() is not None:
+                    continue
+                for accion, (visitas, total) in futuro.result().items():
+                    hijo = raiz.hijos.setdefault(accion, _Nodo())
+                    hijo.visitas += visitas
+                    hijo.total += total
+
+        visitadas = [a for a in candidatas if a in raiz.hijos]
+        if not visitadas:
+            accion = self.rng.choice(candidatas)
+        else:
+            accion = max(visitadas, key=lambda a: (raiz.hijos[a].visitas,
+                                                   raiz.hijos[a].total / raiz.hijos[a].visitas))
+        self._ultima_accion = accion
+        return accion
+
+    def cerrar(self):
+        """ Libera los procesos trabajadores, si los hay, y olvida el árbol. """
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+        self.raiz = None
+        self._clave_raiz = None
+        self._ultima_accion = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+    def _raiz_para(self, creencia):
+        """
+        Reutiliza el subárbol de la última acción si el estado coincide y la
+        creencia es la misma con la que se construyó el árbol: si no, sus
+        estadísticas corresponden a otra creencia y se empieza de cero.
+        """
+        clave = (creencia.location, creencia.has_arrow)
+        clave_creencia = creencia.clave()
+        if (self.raiz is not None and self._ultima_accion is not None
+                and self._clave_raiz == clave_creencia):
+            hijo = self.raiz.hijos.get(self._ultima_accion)
+            if hijo is not None and hijo.clave == clave:
+                self.raiz = hijo
+                return hijo
+        self.raiz = _Nodo(clave)
+        self._clave_raiz = clave_creencia
+        return self.raiz
+
+    def _buscar(self, creencia, candidatas, raiz, deadline):
+        rng = self.rng
+        while time.perf_counter() < deadline:
+            sim = _Simulacion(creencia, creencia.muestrear_mundo(rng))
+            nodo = raiz
+            camino = [raiz]
+            acciones = candidatas
+            while not sim.done:
+                sin_probar = [a for a in acciones if a not in nodo.hijos]
+                if sin_probar:
+                    accion = rng.choice(sin_probar)
+                    sim.aplicar(accion)
+                    hijo = _Nodo(None if sim.done else (sim.location, sim.has_arrow))
+                    nodo.hijos[accion] = hijo
+                    camino.append(hijo)
+                    break
+                accion = self._ucb(nodo, acciones)
+                sim.aplicar(accion)
+                nodo = nodo.hijos[accion]
+                camino.append(nodo)
+                acciones = sim.acciones()
+            if not sim.done:
+                sim.rollout(rng, self.limite_rollout, self.prob_riesgo)
+            valor = sim.reward / ESCALA
+            for n in camino:
+                n.visitas += 1
+                n.total += valor
+        return raiz
+
+    def _ucb(self, nodo, acciones):
+        log_n = math.log(max(1, nodo.visitas))
+        mejor, mejor_valor = None, -math.inf
+        for accion in acciones:
+            hijo = nodo.hijos[accion]
+            valor = hijo.total / hijo.visitas + self.exploracion * math.sqrt(log_n / hijo.visitas)
+            if valor > mejor_valor:
+                mejor, mejor_valor = accion, valor
+        return mejor
@@ -0,0 +1,426 @@
+import argparse
+import gzip
+import json
+import time
+
+from wumpus_acciones import DELTAS, MOVE_BY_DELTA, SHOOT_ACTIONS
+
+# -----------------------------------------------------------------------------
+# SOLUCIÓN EXACTA DE TABLEROS PEQUEÑOS Y TABLA DE POLÍTICA ÓPTIMA
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_politica.py politica4.json.gz --size 4
+#
+# Enumera todos los mundos de un tablero pequeño (oro, un Wumpus y pozos con
+# probabilidad pit_probability, como WumpusWorld) y calcula la política que
+# maximiza la probabilidad de salir con el oro. El resultado es la tasa de
+# victoria óptima (el techo contra el que comparar agentes) y una tabla
+# creencia -> acción que LogicalAgent consulta con PoliticaOptima.
+#
+# Reducciones que lo hacen abordable (4x4 se resuelve en segundos; 5x5 ya no):
+#   - El oro no influye en ningún percepto salvo en su casilla, así que se
+#     suma de forma analítica: cada "clase" de mundos es (Wumpus, pozos) y el
+#     oro está repartido por igual entre sus casillas libres.
+#   - Solo importa ganar, no los pasos: moverse por casillas visitadas es
+#     gratis y entrar en una casilla segura nunca empeora, así que mientras
+#     haya alguna demostrablemente segura se entra en ella sin ramificar.
+#   - Las creencias se memorizan por (casillas visitadas con sus perceptos,
+#     uso de la flecha), identificando cada una con su reflejo sobre la
+#     diagonal que pasa por (1, 1).
+#   - Las acciones arriesgadas se exploran de mayor a menor cota superior
+#     (masa que sobrevive) y se descartan las que no pueden mejorar.
+#
+# Las casillas se numeran como en TablaCeldas: (y - 1) * size + (x - 1).
+# Acciones de la tabla: 0..n-1 entrar en esa casilla (yendo por visitadas),
+# n + 4 * casilla + d disparar desde la casilla en la dirección DELTAS[d], y
+# SALIR volver a (1, 1) y salir.
+
+SALIR = -1
+
+
+class _Tablero:
+    """ Geometría de un tablero en máscaras de bits y codificación de las creencias. """
+
+    def __init__(self, size):
+        self.size = size
+        n = self.n = size * size
+        self.celdas = [(i % size + 1, i // size + 1) for i in range(n)]
+        indice = {c: i for i, c in enumerate(self.celdas)}
+
+        self.vecinos = []
+        for x, y in self.celdas:
+            mascara = 0
+            for dx, dy in DELTAS:
+                if (x + dx, y + dy) in indice:
+                    mascara |= 1 << indice[x + dx, y + dy]
+            self.vecinos.append(mascara)
+        self.espejo = [indice[y, x] for x, y in self.celdas]
+        self.direccion_espejo = [DELTAS.index((dy, dx)) for dx, dy in DELTAS]
+        self.pot5 = [5 ** i for i in range(n)]
+        # Casillas más allá de cada una en cada dirección (línea de tiro)
+        self.lineas = []
+        for x, y in self.celdas:
+            por_direccion = []
+            for dx, dy in DELTAS:
+                mascara, cx, cy = 0, x + dx, y + dy
+                while (cx, cy) in indice:
+                    mascara |= 1 << indice[cx, cy]
+                    cx, cy = cx + dx, cy + dy
+                por_direccion.append(mascara)
+            self.lineas.append(por_direccion)
+
+    def indice(self, location):
+        return (location[1] - 1) * self.size + (location[0] - 1)
+
+    def espejar_mascara(self, mascara):
+        resultado = 0
+        for i in range(self.n):
+            if mascara >> i & 1:
+                resultado |= 1 << self.espejo[i]
+        return resultado
+
+    def espejar_accion(self, accion):
+        if accion == SALIR:
+            return SALIR
+        if accion < self.n:
+            return self.espejo[accion]
+        casilla, d = divmod(accion - self.n, 4)
+        return self.n + 4 * self.espejo[casilla] + self.direccion_espejo[d]
+
+    def digito(self, breeze, stench):
+        """ Dígito en base 5 de una casilla visitada (0 = sin visitar). """
+        return 1 + breeze + 2 * stench
+
+    def clave_flecha(self, grito, linea, visitadas):
+        """
+        Código del disparo hecho (0 con la flecha sin usar): si hubo grito, la
+        línea sin las casillas ya visitadas y las visitadas al disparar (los
+        hedores anotados antes del grito siguen siendo información).
+        """
+        return 1 + grito + 2 * (linea | visitadas << self.n)
+
+    def clave(self, codigo, flecha):
+        """ Clave de una creencia: perceptos de las visitadas (base 5) y disparo. """
+        return codigo << (2 * self.n + 2) | flecha
+
+
+class _Solucionador(_Tablero):
+    """ Programación dinámica sobre creencias con memoria (ver la cabecera). """
+
+    def __init__(self, size, pit_probability):
+        super().__init__(size)
+        n = self.n
+        self.bits = n.bit_length()  # Bits del Wumpus en la codificación de una clase
+
+        # Peso de ganar al entrar en la casilla del oro en una clase con k pozos:
+        # 1/(N(N-1)) por la elección de oro y Wumpus, y p^k (1-p)^(N-2-k) por los pozos
+        otras = n - 1
+        self.oro = [pit_probability ** k * (1 - pit_probability) ** (otras - 2 - k) / (otras * (otras - 1))
+                    for k in range(otras - 1)]
+
+        # Clases: Wumpus w en los bits bajos y la máscara de pozos encima
+        self.clases = []
+        for w in range(1, n):
+            libres = [i for i in range(1, n) if i != w]
+            for m in range((1 << len(libres)) - 1):  # Con todo pozos no cabría el oro
+                pozos = 0
+                for j, i in enumerate(libres):
+                    if m >> j & 1:
+                        pozos |= 1 << i
+                self.clases.append(pozos << self.bits | w)
+
+        self.memoria = {}  # clave canónica -> (masa ganadora, mejor acción en el marco canónico)
+
+    def resolver(self):
+        """ Masa ganadora de la creencia inicial: la tasa de victoria óptima. """
+        # En (1, 1) no hay peligro ni oro: la creencia inicial son sus perceptos
+        _, hijos = self._tras_entrar((0, 0, 0, 0, 0, True, self.clases), 0)
+        return sum(self._valor(hijo) for hijo in hijos)
+
+    def politica(self):
+        """
+        Acciones de las creencias alcanzables siguiendo la política óptima,
+        por clave canónica (tras resolver()).
+        """
+        acciones = {}
+        _, pendientes = self._tras_entrar((0, 0, 0, 0, 0, True, self.clases), 0)
+        while pendientes:
+            creencia = pendientes.pop()
+            clave, clave_espejo = self._claves(creencia)
+            canonica = min(clave, clave_espejo)
+            if canonica in acciones:
+                continue
+            accion = acciones[canonica] = self.memoria[canonica][1]
+            if clave_espejo < clave:
+                accion = self.espejar_accion(accion)
+            if accion == SALIR:
+                continue
+            if accion < self.n:
+                pendientes.extend(self._tras_entrar(creencia, accion)[1])
+            else:
+                casilla, d = divmod(accion - self.n, 4)
+                pendientes.extend(self._tras_disparar(creencia, self.lineas[casilla][d] & ~creencia[0]))
+        return acciones
+
+    # Una creencia es (visitadas, codigo, espejo, flecha, flecha_espejo, vivo, clases):
+    # máscara de visitadas, código base 5 de sus perceptos y el de su reflejo,
+    # código del disparo y el de su reflejo, si el Wumpus vive y las clases compatibles.
+
+    def _claves(self, creencia):
+        return self.clave(creencia[1], creencia[3]), self.clave(creencia[2], creencia[4])
+
+    def _valor(self, creencia):
+        clave, clave_espejo = self._claves(creencia)
+        memorizado = self.memoria.get(min(clave, clave_espejo))
+        if memorizado is not None:
+            return memorizado[0]
+
+        visitadas, vivo, clases = creencia[0], creencia[5], creencia[6]
+        bits, wmask = self.bits, (1 << self.bits) - 1
+        frontera = 0
+        for i in range(self.n):
+            if visitadas >> i & 1:
+                frontera |= self.vecinos[i]
+        frontera &= ~visitadas
+
+        # Casillas que pueden tener peligro en alguna clase
+        peligro = 0
+        for c in clases:
+            peligro |= c >> bits
+            if vivo:
+                peligro |= 1 << (c & wmask)
+
+        seguras = frontera & ~peligro
+        if seguras:
+            f = (seguras & -seguras).bit_length() - 1
+            mejor_valor, mejor_accion = self._entrar(creencia, f), f
+        else:
+            mejor_valor, mejor_accion = 0.0, SALIR
+            for cota, accion, evaluar in self._arriesgadas(creencia, frontera):
+                if cota <= mejor_valor:
+                    break
+                valor = evaluar()
+                if valor > mejor_valor:
+                    mejor_valor, mejor_accion = valor, accion
+
+        if clave_espejo < clave:
+            mejor_accion = self.espejar_accion(mejor_accion)
+        self.memoria[min(clave, clave_espejo)] = (mejor_valor, mejor_accion)
+        return mejor_valor
+
+    def _tras_entrar(self, creencia, f):
+        """
+        Masa ganada al encontrar el oro en 'f' y creencias tras entrar en 'f'
+        sin morir ni encontrarlo, agrupando las clases por el percepto en 'f'.
+        """
+        visitadas, codigo, espejo, flecha, flecha_espejo, vivo, clases = creencia
+        bits, wmask = self.bits, (1 << self.bits) - 1
+        vecinos_f = self.vecinos[f]
+        grupos = ([], [], [], [])
+        ganado = 0.0
+        for c in clases:
+            pozos, w = c >> bits, c & wmask
+            if pozos >> f & 1 or (vivo and w == f):
+                continue
+            if w != f:
+                # El oro está en f en 1 de cada 'libres' mundos de la clase
+                ganado += self.oro[pozos.bit_count()]
+            grupos[(pozos & vecinos_f != 0) + 2 * (vivo and vecinos_f >> w & 1)].append(c)
+
+        visitadas |= 1 << f
+        hijos = []
+        for percepto, grupo in enumerate(grupos):
+            if grupo:
+                hijos.append((visitadas, codigo + (1 + percepto) * self.pot5[f],
+                              espejo + (1 + percepto) * self.pot5[self.espejo[f]],
+                              flecha, flecha_espejo, vivo, grupo))
+        return ganado, hijos
+
+    def _tras_disparar(self, creencia, linea):
+        """ Creencias tras disparar a lo largo de 'linea': con grito el Wumpus muere. """
+        visitadas, codigo, espejo, _, _, _, clases = creencia
+        wmask = (1 << self.bits) - 1
+        con_grito, sin_grito = [], []
+        for c in clases:
+            (con_grito if linea >> (c & wmask) & 1 else sin_grito).append(c)
+        linea_espejo, visitadas_espejo = self.espejar_mascara(linea), self.espejar_mascara(visitadas)
+        return [(visitadas, codigo, espejo, self.clave_flecha(grito, linea, visitadas),
+                 self.clave_flecha(grito, linea_espejo, visitadas_espejo), not grito, grupo)
+                for grito, grupo in ((1, con_grito), (0, sin_grito)) if grupo]
+
+    def _entrar(self, creencia, f):
+        ganado, hijos = self._tras_entrar(creencia, f)
+        return ganado + sum(self._valor(hijo) for hijo in hijos)
+
+    def _masa(self, visitadas, vivo, c):
+        """ Masa de la clase 'c' que sigue en juego (oro aún sin encontrar). """
+        pozos, w = c >> self.bits, c & ((1 << self.bits) - 1)
+        k = pozos.bit_count()
+        libres = self.n - 2 - k - (visitadas.bit_count() - 1)
+        if not vivo and visitadas >> w & 1:
+            libres += 1  # El Wumpus muerto visitado no ocupaba una casilla libre
+        return self.oro[k] * libres
+
+    def _arriesgadas(self, creencia, frontera):
+        """ (cota superior, acción, evaluar) de cada acción con riesgo, de mayor a menor cota. """
+        visitadas, _, _, flecha, _, vivo, clases = creencia
+        bits, wmask = self.bits, (1 << self.bits) - 1
+        masas = [self._masa(visitadas, vivo, c) for c in clases]
+        candidatas = []
+
+        while frontera:
+            f = (frontera & -frontera).bit_length() - 1
+            frontera &= frontera - 1
+            cota = sum(m for c, m in zip(clases, masas)
+                       if not ((c >> bits) >> f & 1 or (vivo and c & wmask == f)))
+            if cota > 0:
+                candidatas.append((cota, f, lambda f=f: self._entrar(creencia, f)))
+
+        if flecha == 0 and vivo:
+            vistas = set()
+            total = sum(masas)
+            for v in range(self.n):
+                if not visitadas >> v & 1:
+                    continue
+                for d in range(4):
+                    linea = self.lineas[v][d] & ~visitadas
+                    if not linea or linea in vistas:
+                        continue
+                    vistas.add(linea)
+                    if not any(linea >> (c & wmask) & 1 for c in clases):
+                        continue  # Seguro que no hay Wumpus en la línea: no aporta nada
+                    candidatas.append((total, self.n + 4 * v + d, lambda linea=linea: sum(
+                        self._valor(hijo) for hijo in self._tras_disparar(creencia, linea))))
+
+        candidatas.sort(key=lambda t: -t[0])
+        return candidatas
+
+
+# -----------------------------------------------------------------------------
+# TABLA DE POLÍTICA Y CONSULTA DESDE EL AGENTE
+# -----------------------------------------------------------------------------
+class TablaPolitica:
+    """ Tabla creencia -> acción de un tamaño y probabilidad de pozo, con su tasa óptima. """
+
+    def __init__(self, size, pit_probability, tasa_victoria, acciones):
+        self.size = size
+        self.pit_probability = pit_probability
+        self.tasa_victoria = tasa_victoria
+        self.acciones = acciones  # clave canónica -> acción
+
+    def guardar(self, ruta):
+        with gzip.open(ruta, 'wt') as f:
+            json.dump({'size': self.size, 'pit_probability': self.pit_probability,
+                       'tasa_victoria': self.tasa_victoria,
+                       'acciones': sorted(self.acciones.items())}, f, separators=(',', ':'))
+
+    @classmethod
+    def cargar(cls, ruta):
+        with gzip.open(ruta, 'rt') as f:
+            datos = json.load(f)
+        return cls(datos['size'], datos['pit_probability'], datos['tasa_victoria'],
+                   dict(datos['acciones']))
+
+
+def resolver(size=4, pit_probability=0.20):
+    """ Resuelve el tablero y devuelve su TablaPolitica. """
+    solucionador = _Solucionador(size, pit_probability)
+    tasa = solucionador.resolver()
+    return TablaPolitica(size, pit_probability, tasa, solucionador.politica())
+
+
+class PoliticaOptima:
+    """
+    Consulta una TablaPolitica desde LogicalAgent (un objeto por agente). La
+    tabla supone un solo Wumpus, como el mundo por defecto.
+
+    Lleva la clave de la creencia del agente (y la de su reflejo), que se
+    actualiza en O(1) al visitar una casilla nueva o disparar, así que cada
+    decisión es un acceso al diccionario. Devuelve None si la creencia no
+    está en la tabla (otro tamaño, o el agente se ha salido de la política)
+    para que el agente decida con su propia lógica.
+    """
+
+    def __init__(self, tabla):
+        self.tabla = tabla
+        self.tablero = _Tablero(tabla.size)
+        self.visitadas = 0
+        self.codigo = 0
+        self.espejo = 0
+        self.flecha = 0
+        self.flecha_espejo = 0
+        self._disparo = None  # (línea, visitadas) del disparo aún sin resultado
+
+    def _anotar(self, agent):
+        """
+        Añade a la creencia las casillas visitadas desde la última consulta
+        (normalmente solo la actual) y el resultado del último disparo.
+        """
+        tablero = self.tablero
+        hecho = agent.world.celdas.hecho
+        for location in agent.visited_squares:
+            i = tablero.indice(location)
+            if self.visitadas >> i & 1:
+                continue
+            digito = tablero.digito(agent.kb.ask(hecho("Breeze", location)),
+                                    agent.kb.ask(hecho("Stench", location)))
+            self.visitadas |= 1 << i
+            self.codigo += digito * tablero.pot5[i]
+            self.espejo += digito * tablero.pot5[tablero.espejo[i]]
+        if self._disparo is not None:
+            linea, visitadas = self._disparo
+            grito = int(agent.wumpus_killed)
+            self.flecha = tablero.clave_flecha(grito, linea, visitadas)
+            self.flecha_espejo = tablero.clave_flecha(grito, tablero.espejar_mascara(linea),
+                                                      tablero.espejar_mascara(visitadas))
+            self._disparo = None
+
+    def elegir_para(self, agent):
+        """ Acción de la política para la creencia actual del agente, o None. """
+        world = agent.world
+        if world.size != self.tabla.size or world.pit_probability != self.tabla.pit_probability:
+            return None
+        self._anotar(agent)
+        if self.flecha == 0 and not agent.tiene_flecha:
+            return None  # El agente disparó por su cuenta: la creencia ya no es de la tabla
+        tablero = self.tablero
+        clave = tablero.clave(self.codigo, self.flecha)
+        clave_espejo = tablero.clave(self.espejo, self.flecha_espejo)
+        accion = self.tabla.acciones.get(min(clave, clave_espejo))
+        if accion is None:
+            return None
+        if clave_espejo < clave:
+            accion = tablero.espejar_accion(accion)
+
+        if accion == SALIR:
+            agent.iniciar_retirada("La política no ve forma de ganar")
+            return agent._accion_retirada()
+        if accion < tablero.n:
+            return self._hacia(agent, tablero.celdas[accion])
+        casilla, d = divmod(accion - tablero.n, 4)
+        if agent.location != tablero.celdas[casilla]:
+            return self._hacia(agent, tablero.celdas[casilla])
+        self._disparo = (tablero.lineas[casilla][d] & ~self.visitadas, self.visitadas)
+        return SHOOT_ACTIONS[d]
+
+    def _hacia(self, agent, destino):
+        """ Siguiente movimiento hacia 'destino' por casillas visitadas. """
+        camino = agent._camino_por_visitadas(destino)
+        if not camino:
+            return None
+        (x, y), (tx, ty) = agent.location, camino[-1]
+        return MOVE_BY_DELTA[(tx - x, ty - y)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resuelve un tablero pequeño y guarda su política óptima")
+    parser.add_argument('ruta', help="fichero de salida (JSON comprimido con gzip)")
+    parser.add_argument('--size', type=int, default=4)
+    parser.add_argument('--pit-probability', type=float, default=0.20)
+    args = parser.parse_args()
+
+    inicio = time.perf_counter()
+    tabla = resolver(args.size, args.pit_probability)
+    tabla.guardar(args.ruta)
+    print(f"Tasa de victoria óptima {args.size}x{args.size}: {tabla.tasa_victoria:.4f} "
+          f"({len(tabla.acciones)} creencias en la tabla, {time.perf_counter() - inicio:.1f} s)")
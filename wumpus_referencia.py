@@ -0,0 +1,400 @@
+import random
+
+# -----------------------------------------------------------------------------
+# IMPLEMENTACIÓN DE REFERENCIA CONGELADA (ORÁCULO DE LAS PRUEBAS DIFERENCIALES)
+# -----------------------------------------------------------------------------
+# Copia del mundo, la KB y la inferencia de la versión base (wumpus_GUI.py del
+# commit e48261d), sin pygame ni la interfaz. wumpus_diferencial.py compara
+# con ella todas las implementaciones de wumpus_core.py. No importa nada de
+# wumpus_core ni se optimiza: así un error que compartan las implementaciones
+# rápidas (el mundo perezoso, la KB con justificaciones, el mapa de
+# seguridad, las tablas de celdas...) no pasa desapercibido.
+#
+# El mundo y la KB están tal cual. Del agente solo se conservan la percepción
+# y la inferencia, con los cambios de semántica que se han hecho después a
+# propósito, marcados con "Cambio:" donde se aplican:
+#   - los hechos de seguridad son "No Pit at" y "No Wumpus at" por separado,
+#     en lugar de "Safe at", y cada regla mira solo el peligro que le toca;
+#   - tras el grito desaparece también el "Danger at" que se deducía del
+#     hedor (el de los pozos se queda);
+#   - al coger el oro se olvida el brillo.
+# La versión base solo admite un Wumpus, así que los casos tienen como mucho uno.
+
+# -----------------------------------------------------------------------------
+# CLASE 1: EL MUNDO DE WUMPUS (EL SIMULADOR)
+#MODIFICADA PARA INCLUIR FLECHAS -
+# -----------------------------------------------------------------------------
+class WumpusWorld:
+    """
+    Simula el entorno del Mundo de Wumpus.
+    Maneja el tablero, la ubicación de los peligros y las percepciones.
+    """
+    def __init__(self, size=4):
+        self.size = size
+        self.agent_location = (1, 1)
+        self.agent_has_gold = False
+        self.agent_is_alive = True
+        self.agent_has_arrow = True  # El agente comienza con una flecha
+        self.wumpus_is_alive = True  # El Wumpus comienza vivo
+
+        # Inicializa un tablero vacío
+        self.board = { (x,y): [] for x in range(1, size+1) for y in range(1, size+1) }
+
+        # Colocar Oro
+        self.gold_location = self._get_random_empty_cell()
+        self.board[self.gold_location].append('G')
+
+        # Colocar Wumpus
+        self.wumpus_location = self._get_random_empty_cell()
+        self.board[self.wumpus_location].append('W')
+
+        # Colocar Pozos 20% de probabilidad por casilla
+        for x in range(1, size + 1):
+            for y in range(1, size + 1):
+                if (x, y) != (1, 1) and (x, y) not in [self.gold_location, self.wumpus_location]:
+                    if random.random() < 0.20:
+                        self.board[(x, y)].append('P')
+
+    def _get_random_empty_cell(self):
+        """ Obtiene una celda aleatoria que no sea (1,1). """
+        while True:
+            x, y = random.randint(1, self.size), random.randint(1, self.size)
+            if (x, y) != (1, 1) and not self.board[(x, y)]:
+                return (x, y)
+
+    def _is_valid_location(self, x, y):
+        """ Comprueba si una coordenada está dentro del tablero. """
+        return 1 <= x <= self.size and 1 <= y <= self.size
+
+    def get_neighbors(self, x, y):
+        """ Obtiene los vecinos válidos de una casilla. """
+        neighbors = []
+        for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
+            nx, ny = x + dx, y + dy
+            if self._is_valid_location(nx, ny):
+                neighbors.append((nx, ny))
+        return neighbors
+
+    def get_percepts_at(self, location):
+        """ Devuelve lo que el agente percibe en una ubicación. """
+        x, y = location
+        percepts = {
+            'stench': False, # Hedor (Wumpus)
+            'breeze': False, # Brisa (Pozo)
+            'glitter': False # Brillo (Oro)
+        }
+
+        # Comprobar si hay Oro
+        if 'G' in self.board[location]:
+            percepts['glitter'] = True
+
+        # Comprobar si hay peligros adyacentes (solo si el Wumpus está vivo)
+        if self.wumpus_is_alive:
+            for nx, ny in self.get_neighbors(x, y):
+                if 'W' in self.board[(nx, ny)]:
+                    percepts['stench'] = True
+        for nx, ny in self.get_neighbors(x, y):
+            if 'P' in self.board[(nx, ny)]:
+                percepts['breeze'] = True
+
+        return percepts
+
+    def execute_action(self, action, direction=None):
+        """ Ejecuta la acción del agente y devuelve el estado. """
+        if not self.agent_is_alive:
+            return "El agente está muerto."
+
+        x, y = self.agent_location
+
+        if action == 'move_up':
+            self.agent_location = (x, y + 1) if self._is_valid_location(x, y + 1) else (x, y)
+        elif action == 'move_down':
+            self.agent_location = (x, y - 1) if self._is_valid_location(x, y - 1) else (x, y)
+        elif action == 'move_left':
+            self.agent_location = (x - 1, y) if self._is_valid_location(x - 1, y) else (x, y)
+        elif action == 'move_right':
+            self.agent_location = (x + 1, y) if self._is_valid_location(x + 1, y) else (x, y)
+        elif action == 'grab_gold':
+            if 'G' in self.board[self.agent_location]:
+                self.agent_has_gold = True
+                self.board[self.agent_location].remove('G')
+                return "¡El agente encontró el oro!"
+            else:
+                return "No hay oro aquí."
+        elif action == 'climb_out':
+            if self.agent_location == (1, 1):
+                if self.agent_has_gold:
+                    return "¡VICTORIA! El agente escapó con el oro."
+                else:
+                    return "El agente escapó sin el oro."
+            else:
+                return "Solo se puede salir desde (1, 1)."
+        elif action == 'shoot_arrow':
+            if not self.agent_has_arrow:
+                return "No tienes flechas."
+            
+            self.agent_has_arrow = False
+            # Determinar la dirección del disparo
+            if direction == 'up':
+                target_cells = [(x, y + i) for i in range(1, self.size + 1) if self._is_valid_location(x, y + i)]
+            elif direction == 'down':
+                target_cells = [(x, y - i) for i in range(1, self.size + 1) if self._is_valid_location(x, y - i)]
+            elif direction == 'left':
+                target_cells = [(x - i, y) for i in range(1, self.size + 1) if self._is_valid_location(x - i, y)]
+            elif direction == 'right':
+                target_cells = [(x + i, y) for i in range(1, self.size + 1) if self._is_valid_location(x + i, y)]
+            else:
+                return "Dirección de disparo no válida."
+            
+            # Verificar si el Wumpus está en alguna de las celdas objetivo
+            for cell in target_cells:
+                if cell == self.wumpus_location and self.wumpus_is_alive:
+                    self.wumpus_is_alive = False
+                    self.board[cell].remove('W')
+                    return "¡Escuchas un grito! Has matado al Wumpus."
+            
+            return "La flecha no golpeó nada."
+
+        # Comprobar si el agente muere después de moverse
+        if 'W' in self.board[self.agent_location] and self.wumpus_is_alive:
+            self.agent_is_alive = False
+            return "¡MUERTE! El agente fue comido por el Wumpus."
+        if 'P' in self.board[self.agent_location]:
+            self.agent_is_alive = False
+            return "¡MUERTE! El agente cayó en un pozo."
+
+        return f"Agente se movió a {self.agent_location}"
+
+# -----------------------------------------------------------------------------
+# CLASE 2: LA BASE DE CONOCIMIENTO (KB)
+# - NO MODIFICAR ESTA CLASE -
+# -----------------------------------------------------------------------------
+class KnowledgeBase:
+    """
+    Una Base de Conocimiento (KB) simple basada en hechos.
+    Almacena 'hechos' (oraciones) como cadenas de texto.
+    """
+    def __init__(self):
+        self.facts = set()
+
+    def tell(self, fact):
+        """ Añade un nuevo hecho a la KB. (Diapositiva 6: Representación) """
+        self.facts.add(fact)
+
+    def ask(self, fact):
+        """ Comprueba si un hecho ya existe en la KB. (Diapositiva 6: Razonamiento) """
+        return fact in self.facts
+
+    def get_facts_starting_with(self, prefix):
+        """ Devuelve una lista de hechos que comienzan con un prefijo. """
+        return [f for f in self.facts if f.startswith(prefix)]
+
+    def print_facts(self):
+        """ Imprime todos los hechos conocidos. """
+        print("--- Hechos Conocidos (KB) ---")
+        for f in sorted(list(self.facts)):
+            print(f)
+        print("-------------------------------")
+
+
+# -----------------------------------------------------------------------------
+# CLASE 3: EL AGENTE LÓGICO (SOLO PERCEPCIÓN E INFERENCIA)
+# -----------------------------------------------------------------------------
+class LogicalAgent:
+    """
+    Percepción e inferencia del agente de la versión base. Las decisiones
+    las da el caso de prueba, así que no se copia elegir_accion.
+    """
+    def __init__(self, world, kb):
+        self.world = world
+        self.kb = kb
+        self.location = (1, 1) # El agente siempre empieza en (1, 1)
+        self.visited_squares = set() # Un conjunto de tuplas (x, y)
+        self.wumpus_killed = False  # Para saber si el Wumpus fue eliminado
+
+        # El agente sabe que la casilla (1, 1) es segura al empezar
+        # Cambio: sin pozo y sin Wumpus, en lugar de "Safe at"
+        self.kb.tell("No Pit at (1, 1)")
+        self.kb.tell("No Wumpus at (1, 1)")
+        self.visited_squares.add((1, 1))
+
+    def procesar_perceptos(self, percepts):
+        """
+        Procesa los perceptos de la casilla actual y actualiza la KB.
+        Este es el paso 'TELL'.
+        """
+        x, y = self.location
+
+        # Solo registrar brisa/hedor si no los hemos registrado antes
+        current_breeze = f"Breeze at ({x}, {y})"
+        current_no_breeze = f"No Breeze at ({x}, {y})"
+        current_stench = f"Stench at ({x}, {y})"
+        current_no_stench = f"No Stench at ({x}, {y})"
+
+        if percepts['breeze']:
+            if not self.kb.ask(current_breeze):
+                self.kb.tell(current_breeze)
+        else:
+            if not self.kb.ask(current_no_breeze):
+                self.kb.tell(current_no_breeze)
+
+        if percepts['stench']:
+            if not self.kb.ask(current_stench):
+                self.kb.tell(current_stench)
+        else:
+            if not self.kb.ask(current_no_stench):
+                self.kb.tell(current_no_stench)
+
+        # Siempre registrar brillo si está presente
+        if percepts['glitter']:
+            self.kb.tell(f"Glitter at ({x}, {y})")
+
+    def inferir_seguridad(self):
+        """
+        Aplica reglas lógicas simples para deducir qué casillas son seguras.
+        Este es el paso de 'INFERENCIA'.
+        """
+
+        # Regla 1: Las casillas visitadas son seguras
+        # Cambio: no tienen pozo ni Wumpus
+        for location in self.visited_squares:
+            if self.world.agent_is_alive:
+                self.kb.tell(f"No Pit at {location}")
+                self.kb.tell(f"No Wumpus at {location}")
+
+        # Regla 2: Si no hay hedor, los vecinos son seguros del Wumpus
+        # Cambio: solo sin Wumpus (pueden tener pozo), aunque haya peligro
+        no_stench_facts = self.kb.get_facts_starting_with("No Stench at")
+        for fact in no_stench_facts:
+            x, y = eval(fact.split(' at ')[1])
+            for nx, ny in self.world.get_neighbors(x, y):
+                self.kb.tell(f"No Wumpus at ({nx}, {ny})")
+
+        # Regla 3: Si hay brisa, algun vecino tiene pozo
+        breeze_facts = self.kb.get_facts_starting_with("Breeze at")
+        breeze_locations = [eval(fact.split(' at ')[1]) for fact in breeze_facts]
+
+        for breeze_loc in breeze_locations:
+            x, y = breeze_loc
+            neighbors = self.world.get_neighbors(x, y)
+
+            # Filtrar vecinos que ya sabemos que son seguros
+            # Cambio: los que no tienen pozo
+            unsafe_neighbors = [n for n in neighbors if not self.kb.ask(f"No Pit at {n}")]
+
+            # Si solo hay un vecino no seguro, debe ser un pozo
+            if len(unsafe_neighbors) == 1:
+                dangerous = unsafe_neighbors[0]
+                self.kb.tell(f"Danger at {dangerous}")
+                self.kb.tell(f"Pit at {dangerous}")
+
+        # Regla 4: Inferencia mejorada para múltiples brisas
+        if len(breeze_locations) >= 2:
+            possible_pit_locations = set()
+
+            for i, loc1 in enumerate(breeze_locations):
+                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
+                for j, loc2 in enumerate(breeze_locations):
+                    if i != j:
+                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
+                        intersection = neighbors1.intersection(neighbors2)
+                        # Cambio: solo las que pueden tener pozo
+                        intersection = [loc for loc in intersection if not self.kb.ask(f"No Pit at {loc}")]
+                        possible_pit_locations.update(intersection)
+
+            # Si hay una única ubicación posible para el pozo, inferirla
+            if len(possible_pit_locations) == 1:
+                pit_loc = list(possible_pit_locations)[0]
+                self.kb.tell(f"Danger at {pit_loc}")
+                self.kb.tell(f"Pit at {pit_loc}")
+
+        # Regla 5: Si hay hedor, algun vecino tiene Wumpus
+        stench_facts = self.kb.get_facts_starting_with("Stench at")
+        for fact in stench_facts:
+            x, y = eval(fact.split(' at ')[1])
+            neighbors = self.world.get_neighbors(x, y)
+
+            # Si todos los vecinos excepto uno son seguros, el restante tiene Wumpus
+            # Cambio: seguros frente al Wumpus
+            safe_neighbors = [n for n in neighbors if self.kb.ask(f"No Wumpus at {n}")]
+            if len(safe_neighbors) == len(neighbors) - 1:
+                wumpus_location = [n for n in neighbors if n not in safe_neighbors][0]
+                self.kb.tell(f"Wumpus at {wumpus_location}")
+                self.kb.tell(f"Danger at {wumpus_location}")
+
+        # Regla 6: Inferencia mejorada para múltiples hedores
+        if len(stench_facts) >= 2:
+            stench_locations = [eval(fact.split(' at ')[1]) for fact in stench_facts]
+            possible_wumpus_locations = set()
+
+            for i, loc1 in enumerate(stench_locations):
+                neighbors1 = set(self.world.get_neighbors(loc1[0], loc1[1]))
+                for j, loc2 in enumerate(stench_locations):
+                    if i != j:
+                        neighbors2 = set(self.world.get_neighbors(loc2[0], loc2[1]))
+                        intersection = neighbors1.intersection(neighbors2)
+                        possible_wumpus_locations.update(intersection)
+
+            # Si solo hay una ubicación posible, es el Wumpus
+            # Cambio: descartando las que no tienen Wumpus
+            possible_wumpus_locations = [loc for loc in possible_wumpus_locations
+                                    if not self.kb.ask(f"No Wumpus at {loc}")]
+
+            if len(possible_wumpus_locations) == 1:
+                wumpus_loc = possible_wumpus_locations[0]
+                self.kb.tell(f"Wumpus at {wumpus_loc}")
+                self.kb.tell(f"Danger at {wumpus_loc}")
+
+        # Regla 7: Si no hay brisa, todos los vecinos son seguros de pozos
+        # Cambio: sin pozo, aunque haya peligro
+        no_breeze_facts = self.kb.get_facts_starting_with("No Breeze at")
+        for fact in no_breeze_facts:
+            x, y = eval(fact.split(' at ')[1])
+            for nx, ny in self.world.get_neighbors(x, y):
+                self.kb.tell(f"No Pit at ({nx}, {ny})")
+
+    def tras_accion(self, result):
+        """ Lo que hacía run_agent con el resultado de cada acción. """
+        # Actualizar estado si el Wumpus fue eliminado
+        if "grito" in result.lower() or "matado" in result.lower():
+            self.wumpus_killed = True
+            # Limpiar hechos relacionados con el Wumpus
+            wumpus_facts = self.kb.get_facts_starting_with("Wumpus at")
+            for fact in wumpus_facts:
+                self.kb.facts.remove(fact)
+            # Actualizar percepciones de hedor
+            stench_facts = self.kb.get_facts_starting_with("Stench at")
+            for fact in stench_facts:
+                self.kb.facts.remove(fact)
+                self.kb.tell(fact.replace("Stench", "No Stench"))
+            # Cambio: el peligro deducido del hedor también desaparece
+            for fact in self.kb.get_facts_starting_with("Danger at"):
+                if not self.kb.ask(fact.replace("Danger", "Pit")):
+                    self.kb.facts.remove(fact)
+
+        # Cambio: el oro ya no está, ni su brillo
+        if result == "¡El agente encontró el oro!":
+            self.kb.facts.discard(f"Glitter at {self.world.agent_location}")
+
+
+def mundo_con(size, gold, wumpus=None, pits=()):
+    """
+    Mundo de la versión base con el oro, el Wumpus (o ninguno) y los pozos
+    dados, sin azar: los mismos atributos que deja su __init__.
+    """
+    world = WumpusWorld.__new__(WumpusWorld)
+    world.size = size
+    world.agent_location = (1, 1)
+    world.agent_has_gold = False
+    world.agent_is_alive = True
+    world.agent_has_arrow = True
+    world.wumpus_is_alive = True
+    world.board = { (x,y): [] for x in range(1, size+1) for y in range(1, size+1) }
+    world.gold_location = gold
+    world.board[gold].append('G')
+    world.wumpus_location = wumpus
+    if wumpus is not None:
+        world.board[wumpus].append('W')
+    for cell in pits:
+        world.board[cell].append('P')
+    return world
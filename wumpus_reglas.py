@@ -0,0 +1,338 @@
+import re
+
+# -----------------------------------------------------------------------------
+# MOTOR DE REGLAS DECLARATIVO PARA LA INFERENCIA DEL AGENTE
+# -----------------------------------------------------------------------------
+# Las reglas se escriben en un pequeño lenguaje y se compilan en una red de
+# nodos con memorias compartidas:
+#   - memorias alfa: casillas donde se cumple cada predicado ("No Pit", ...)
+#   - memorias beta: número de vecinos con un predicado, para las reglas que
+#     cruzan pares de premisas (intersecciones de vecindarios).
+# Cada hecho nuevo o retirado de la KB solo activa las reglas que mencionan su
+# predicado, y cada regla reevalúa únicamente las casillas afectadas.
+# Las conclusiones se añaden justificadas por sus premisas (en las reglas de
+# vecino único, también por las guardas de los vecinos descartados), así que
+# la KB las retira si estas desaparecen.
+#
+# inferir() aplica las reglas una vez y en orden, igual que el bucle de
+# LogicalAgent.inferir_seguridad, por lo que ambos llegan a la misma KB.
+#
+# Formas admitidas (c: casilla con la premisa, n: casilla vecina):
+#   P at c => C at c [while alive]
+#   P at c => C1 at n[, C2 at n] for n in N(c) [unless G at n]
+#   P at c => C1 at n[, ...] if unique n in N(c) not F at n
+#   P at c, P at c' => C1 at n[, ...] if unique n in N(c) & N(c') not F at n
+
+REGLAS_AGENTE = """
+R1: Visited at c => No Pit at c, No Wumpus at c while alive
+R2: No Stench at c => No Wumpus at n for n in N(c)
+R3: Breeze at c => Danger at n, Pit at n if unique n in N(c) not No Pit at n
+R4: Breeze at c, Breeze at c' => Danger at n, Pit at n if unique n in N(c) & N(c') not No Pit at n
+R5: Stench at c => Wumpus at n, Danger at n if unique n in N(c) not No Wumpus at n
+R6: Stench at c, Stench at c' => Wumpus at n, Danger at n if unique n in N(c) & N(c') not No Wumpus at n
+R7: No Breeze at c => No Pit at n for n in N(c)
+"""
+
+
+def _conclusiones(var):
+    return r"(?P<concl>[^,]+? at " + var + r"(?:, [^,]+? at " + var + r")*)"
+
+
+_FORMAS = [
+    ('propia', re.compile(r"^(?P<p>[^,]+?) at c => " + _conclusiones('c') + r"(?P<vivo> while alive)?$")),
+    ('propagacion', re.compile(r"^(?P<p>[^,]+?) at c => " + _conclusiones('n') +
+                               r" for n in N\(c\)(?: unless (?P<g>.+?) at n)?$")),
+    ('unica', re.compile(r"^(?P<p>[^,]+?) at c => " + _conclusiones('n') +
+                         r" if unique n in N\(c\) not (?P<g>.+?) at n$")),
+    ('par', re.compile(r"^(?P<p>[^,]+?) at c, (?P=p) at c' => " + _conclusiones('n') +
+                       r" if unique n in N\(c\) & N\(c'\) not (?P<g>.+?) at n$")),
+]
+
+VISITED = "Visited"
+
+
+class ErrorRegla(ValueError):
+    """ Regla que no se ajusta a ninguna de las formas del lenguaje. """
+
+
+def parse_fact(fact):
+    """ Divide 'Pred at (x, y)' en ('Pred', (x, y)); None si no tiene esa forma. """
+    pred, sep, coords = fact.partition(' at (')
+    if not sep:
+        return None
+    x, _, y = coords.rstrip(')').partition(',')
+    return pred, (int(x), int(y))
+
+
+def parse_reglas(texto):
+    """ Traduce el texto de reglas a una lista de (nombre, forma, datos). """
+    reglas = []
+    for linea in texto.strip().splitlines():
+        linea = linea.strip()
+        if not linea or linea.startswith('#'):
+            continue
+        nombre, _, cuerpo = linea.partition(':')
+        cuerpo = cuerpo.strip()
+        for forma, patron in _FORMAS:
+            m = patron.match(cuerpo)
+            if m:
+                datos = m.groupdict()
+                datos['concl'] = [c.rsplit(' at ', 1)[0] for c in datos['concl'].split(', ')]
+                reglas.append((nombre.strip(), forma, datos))
+                break
+        else:
+            raise ErrorRegla(f"Regla no reconocida: {linea}")
+    return reglas
+
+
+# -----------------------------------------------------------------------------
+# NODOS DE LA RED
+# -----------------------------------------------------------------------------
+class _Regla:
+    """ Nodo base: una regla compilada con su agenda de casillas pendientes. """
+    def __init__(self, motor, nombre, premisa, conclusiones, guarda=None):
+        self.motor = motor
+        self.nombre = nombre
+        self.premisa = premisa
+        self.conclusiones = conclusiones
+        self.guarda = guarda
+        self.agenda = set()
+
+    def predicados(self):
+        """ Pares (predicado, papel) a los que está suscrita la regla. """
+        roles = [(self.premisa, 'premisa')]
+        if self.guarda:
+            roles.append((self.guarda, 'guarda'))
+        roles.extend((c, 'conclusion') for c in self.conclusiones)
+        return roles
+
+    def activar(self, papel, added, cell):
+        """ Encola las casillas cuya evaluación puede cambiar por el evento. """
+        if papel == 'premisa':
+            if added:
+                self.agenda.add(cell)
+            return
+        premisas = self.motor.alfa(self.premisa)
+        for n in self.motor.vecinos(cell):
+            if n in premisas:
+                self.agenda.add(n)
+
+    def ejecutar(self):
+        agenda, self.agenda = self.agenda, set()
+        premisas = self.motor.alfa(self.premisa)
+        for cell in agenda:
+            if cell in premisas:
+                self.evaluar(cell)
+
+    def concluir(self, cell, premisas=None):
+        """ Añade las conclusiones en 'cell', justificadas por 'premisas' (hechos) si se dan. """
+        hecho = self.motor.world.celdas.hecho
+        for pred in self.conclusiones:
+            self.motor.kb.tell(hecho(pred, cell), premisas)
+
+
+class _ReglaPropia(_Regla):
+    """ P at c => C at c. La premisa 'Visited' son las casillas visitadas del agente. """
+    def __init__(self, motor, nombre, premisa, conclusiones, solo_vivo):
+        super().__init__(motor, nombre, premisa, conclusiones)
+        self.solo_vivo = solo_vivo
+
+    def activar(self, papel, added, cell):
+        if papel == 'premisa' and added or papel == 'conclusion' and not added:
+            self.agenda.add(cell)
+
+    def ejecutar(self):
+        if self.solo_vivo and not self.motor.vivo:
+            return
+        super().ejecutar()
+
+    def evaluar(self, cell):
+        self.concluir(cell)
+
+
+class _ReglaPropagacion(_Regla):
+    """ P at c => C at n para cada vecino n, salvo que G at n. """
+    def activar(self, papel, added, cell):
+        # Añadir la guarda no retira conclusiones ya hechas (igual que el bucle original)
+        if papel == 'guarda' and added or papel == 'conclusion' and added:
+            return
+        super().activar(papel, added, cell)
+
+    def evaluar(self, cell):
+        guardas = self.motor.alfa(self.guarda) if self.guarda else ()
+        premisas = (self.motor.world.celdas.hecho(self.premisa, cell),)
+        for n in self.motor.vecinos(cell):
+            if n not in guardas:
+                self.concluir(n, premisas)
+
+
+class _ReglaUnica(_Regla):
+    """ P at c => C at n si n es el único vecino de c sin F. """
+    def activar(self, papel, added, cell):
+        if papel == 'conclusion' and added:
+            return
+        super().activar(papel, added, cell)
+
+    def evaluar(self, cell):
+        filtro = self.motor.alfa(self.guarda)
+        vecinos = self.motor.vecinos(cell)
+        candidatas = [n for n in vecinos if n not in filtro]
+        if len(candidatas) == 1:
+            hecho = self.motor.world.celdas.hecho
+            premisas = [hecho(self.premisa, cell)] + [hecho(self.guarda, n) for n in vecinos
+                                                      if n != candidatas[0]]
+            self.concluir(candidatas[0], premisas)
+
+
+class _MemoriaVecinos:
+    """
+    Memoria beta compartida: para un predicado P, cuántos vecinos con P tiene
+    cada casilla, y el conjunto de casillas con al menos dos (las que están en
+    la intersección de los vecindarios de algún par de premisas).
+    """
+    def __init__(self, motor):
+        self.motor = motor
+        self.cuenta = {}
+        self.multiples = set()
+        self.observadores = []
+
+    def actualizar(self, added, cell):
+        delta = 1 if added else -1
+        for n in self.motor.vecinos(cell):
+            cuenta = self.cuenta.get(n, 0) + delta
+            self.cuenta[n] = cuenta
+            if cuenta >= 2 and n not in self.multiples:
+                self.multiples.add(n)
+                for observador in self.observadores:
+                    observador(True, n)
+            elif cuenta < 2 and n in self.multiples:
+                self.multiples.discard(n)
+                for observador in self.observadores:
+                    observador(False, n)
+
+
+class _ReglaPar(_Regla):
+    """
+    P at c, P at c' => C at n si n es la única casilla sin F en la unión de
+    las intersecciones N(c) & N(c') de todos los pares de premisas.
+    """
+    def __init__(self, motor, nombre, premisa, conclusiones, guarda):
+        super().__init__(motor, nombre, premisa, conclusiones, guarda)
+        self.memoria = motor.memoria_vecinos(premisa)
+        self.memoria.observadores.append(self._cambio_multiple)
+        self.posibles = set()
+        self.pendiente = False
+
+    def _cambio_multiple(self, added, cell):
+        if added and cell not in self.motor.alfa(self.guarda):
+            self.posibles.add(cell)
+        elif not added:
+            self.posibles.discard(cell)
+        self.pendiente = True
+
+    def activar(self, papel, added, cell):
+        if papel == 'guarda':
+            if cell in self.memoria.multiples:
+                if added:
+                    self.posibles.discard(cell)
+                else:
+                    self.posibles.add(cell)
+                self.pendiente = True
+        elif papel == 'conclusion' and not added:
+            self.pendiente = True
+
+    def ejecutar(self):
+        if not self.pendiente:
+            return
+        self.pendiente = False
+        if len(self.posibles) == 1:
+            hecho = self.motor.world.celdas.hecho
+            self.concluir(next(iter(self.posibles)),
+                          [hecho(self.premisa, c) for c in self.motor.alfa(self.premisa)])
+
+
+# -----------------------------------------------------------------------------
+# MOTOR
+# -----------------------------------------------------------------------------
+class MotorReglas:
+    """
+    Red de reglas compilada y enganchada a una KnowledgeBase.
+
+    Escucha los cambios de la KB (tell, retract y rollback), los reparte a las
+    reglas suscritas a cada predicado y, en inferir(), ejecuta una pasada de
+    las reglas en orden procesando solo sus casillas pendientes.
+    """
+    def __init__(self, kb, world, visitadas, reglas=REGLAS_AGENTE):
+        self.kb = kb
+        self.world = world
+        self.visitadas = visitadas
+        self.vivo = True
+        self._alfa = {VISITED: visitadas}
+        self._beta = {}
+        self._red = {}  # predicado -> [(regla, papel)]
+        self.reglas = [self._compilar(*r) for r in parse_reglas(reglas)]
+        for regla in self.reglas:
+            for pred, papel in regla.predicados():
+                self._alfa.setdefault(pred, set())
+                self._red.setdefault(pred, []).append((regla, papel))
+
+        for fact in list(kb.facts):
+            self._al_cambiar(True, fact)
+        for cell in visitadas:
+            self._notificar(VISITED, True, cell)
+        kb.subscribe(self._al_cambiar)
+
+    def _compilar(self, nombre, forma, datos):
+        premisa, conclusiones, guarda = datos['p'], datos['concl'], datos.get('g')
+        if forma == 'propia':
+            return _ReglaPropia(self, nombre, premisa, conclusiones, bool(datos['vivo']))
+        if forma == 'propagacion':
+            return _ReglaPropagacion(self, nombre, premisa, conclusiones, guarda)
+        if forma == 'unica':
+            return _ReglaUnica(self, nombre, premisa, conclusiones, guarda)
+        return _ReglaPar(self, nombre, premisa, conclusiones, guarda)
+
+    def alfa(self, pred):
+        """ Memoria alfa: casillas donde se cumple 'pred'. """
+        return self._alfa[pred]
+
+    def memoria_vecinos(self, pred):
+        """ Memoria beta de recuento de vecinos para 'pred', compartida entre reglas. """
+        memoria = self._beta.get(pred)
+        if memoria is None:
+            memoria = self._beta[pred] = _MemoriaVecinos(self)
+        return memoria
+
+    def vecinos(self, cell):
+        return self.world.get_neighbors(cell[0], cell[1])
+
+    def _al_cambiar(self, added, fact):
+        parsed = parse_fact(fact)
+        if parsed is None or parsed[0] not in self._red:
+            return
+        pred, cell = parsed
+        memoria = self._alfa[pred]
+        if added:
+            memoria.add(cell)
+        else:
+            memoria.discard(cell)
+        beta = self._beta.get(pred)
+        if beta is not None:
+            beta.actualizar(added, cell)
+        self._notificar(pred, added, cell)
+
+    def _notificar(self, pred, added, cell):
+        for regla, papel in self._red.get(pred, ()):
+            regla.activar(papel, added, cell)
+
+    def inferir(self, location, alive=True, omitir=()):
+        """
+        Una pasada de inferencia tras percibir en 'location'. Las reglas se
+        ejecutan en orden y cada una ve lo que dedujeron las anteriores.
+        Las reglas de 'omitir' (por nombre) conservan su agenda para más tarde.
+        """
+        self.vivo = alive
+        self._notificar(VISITED, True, location)
+        for regla in self.reglas:
+            if regla.nombre not in omitir:
+                regla.ejecutar()
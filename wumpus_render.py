@@ -0,0 +1,123 @@
+import argparse
+import contextlib
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from wumpus_barrido import crear_partida
+
+# -----------------------------------------------------------------------------
+# RENDERIZADO SIN VENTANA DE EPISODIOS A IMÁGENES
+# -----------------------------------------------------------------------------
+# Uso:
+#   python wumpus_render.py capturas --semillas 0 1000 --modo hoja --procesos 4
+#
+# Cada episodio (una semilla, ver wumpus_barrido.crear_partida) se juega con
+# un WumpusGUI en modo headless y cada paso se dibuja en su superficie en
+# memoria. Con modo 'png' se guarda un PNG por paso; con modo 'hoja', una
+# hoja de contactos por episodio con las miniaturas de todos los pasos.
+#
+# Cada proceso trabajador conserva su interfaz (superficie y fuentes), la
+# miniatura y la hoja, y las reutiliza en todos los episodios que renderiza.
+
+_GUIS = {}         # size -> WumpusGUI headless del proceso
+_SUPERFICIES = {}  # (uso, ancho, alto) -> superficie auxiliar reutilizable
+
+
+def _iniciar_trabajador():
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+
+def _gui_para(world, agent):
+    """ Interfaz headless reutilizable de este proceso, cargada con la partida dada. """
+    from wumpus_GUI import WumpusGUI
+    gui = _GUIS.get(world.size)
+    if gui is None:
+        gui = _GUIS[world.size] = WumpusGUI(world, agent, headless=True)
+    gui.cargar(world, agent)
+    return gui
+
+
+def _superficie(pygame, uso, ancho, alto):
+    superficie = _SUPERFICIES.get((uso, ancho, alto))
+    if superficie is None:
+        superficie = _SUPERFICIES[uso, ancho, alto] = pygame.Surface((ancho, alto))
+    return superficie
+
+
+def renderizar_episodio(semilla, destino, config=None, modo='hoja', max_steps=50,
+                        escala=0.25, columnas=10):
+    """
+    Juega y dibuja el episodio de 'semilla' en 'destino'. Devuelve el número
+    de fotogramas dibujados.
+    """
+    config = config or {}
+    world, agent = crear_partida(config, semilla)
+    gui = _gui_para(world, agent)
+    from wumpus_GUI import pygame
+
+    if modo == 'hoja':
+        miniatura = (max(1, int(gui.width * escala)), max(1, int(gui.height * escala)))
+        filas = math.ceil((max_steps + 1) / columnas)
+        hoja = _superficie(pygame, 'hoja', miniatura[0] * columnas, miniatura[1] * filas)
+        hoja.fill(gui.BLACK)
+        celda = _superficie(pygame, 'miniatura', *miniatura)
+
+    fotogramas = 0
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        while True:
+            gui.draw_board()
+            gui.draw_info_panel()
+            if modo == 'hoja':
+                pygame.transform.smoothscale(gui.screen, miniatura, celda)
+                fila, columna = divmod(fotogramas, columnas)
+                hoja.blit(celda, (columna * miniatura[0], fila * miniatura[1]))
+            else:
+                pygame.image.save(gui.screen, os.path.join(destino, f"ep{semilla:06d}_{fotogramas:03d}.png"))
+            fotogramas += 1
+
+            if gui.game_state != "Ejecutando" or world.agent_has_exited or gui.current_step >= max_steps:
+                break
+            paso = gui.current_step
+            gui.run_step()
+            if gui.current_step == paso:
+                # Ya había terminado (muerte, o en (1, 1) con el oro) y no hay paso
+                # nuevo: el tablero final con su mensaje sustituye al último fotograma
+                fotogramas -= 1
+
+    if modo == 'hoja':
+        usadas = math.ceil(fotogramas / columnas) * miniatura[1]
+        pygame.image.save(hoja.subsurface((0, 0, hoja.get_width(), usadas)),
+                          os.path.join(destino, f"ep{semilla:06d}.png"))
+    return fotogramas
+
+
+def renderizar(semillas, destino, config=None, modo='hoja', procesos=1, **opciones):
+    """ Renderiza los episodios de 'semillas' en paralelo; devuelve el total de fotogramas. """
+    os.makedirs(destino, exist_ok=True)
+    trabajo = partial(renderizar_episodio, destino=destino, config=config, modo=modo, **opciones)
+    if procesos <= 1:
+        _iniciar_trabajador()
+        return sum(map(trabajo, semillas))
+    with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar_trabajador) as pool:
+        return sum(pool.map(trabajo, semillas, chunksize=max(1, len(semillas) // (8 * procesos))))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Renderiza episodios a PNG sin abrir ventana")
+    parser.add_argument('destino', help="directorio de salida")
+    parser.add_argument('--semillas', type=int, nargs=2, default=[0, 10], metavar=('DESDE', 'HASTA'))
+    parser.add_argument('--modo', choices=('png', 'hoja'), default='hoja')
+    parser.add_argument('--size', type=int, default=4)
+    parser.add_argument('--max-steps', type=int, default=50)
+    parser.add_argument('--escala', type=float, default=0.25)
+    parser.add_argument('--columnas', type=int, default=10)
+    parser.add_argument('--procesos', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    total = renderizar(range(*args.semillas), args.destino, {'size': args.size}, args.modo,
+                       args.procesos, max_steps=args.max_steps, escala=args.escala,
+                       columnas=args.columnas)
+    print(f"Fotogramas renderizados: {total}")